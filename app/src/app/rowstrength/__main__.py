@@ -1,5 +1,31 @@
-from .app import main
+import sys
+
+from .timing import start_import_profile, report_imports_if_enabled
 
 if __name__ == "__main__":
+    # рабочий процесс пула отчёта, запущенный собранным приложением вместо python.exe
+    if "--multiprocessing-fork" in sys.argv:
+        from .report import spawned_child
+        if spawned_child():
+            sys.exit(0)
+
+    # ROWSTRENGTH_IMPORT_TIMING=1 (всё дерево) или =N (N самых долгих) — профиль импортов в stderr
+    start_import_profile()
+
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from .batch import main as batch_main
+        rc = batch_main(sys.argv[2:])
+        report_imports_if_enabled()
+        sys.exit(rc)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "report":
+        from .report import main as report_main
+        sys.exit(report_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from .serve import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+
+    from .app import main
     app = main()
     app.main_loop()
@@ -1,23 +1,35 @@
+import os
 import sys
-import re
-import json
 import asyncio
-from importlib import resources
+
+from .timing import PhaseTimer, report_imports_if_enabled  # до toga: точка отсчёта времени запуска
+
+# Бэкенд известен заранее: без TOGA_BACKEND toga ищет его перебором entry points всех dist-info
+if sys.platform == "win32":
+    os.environ.setdefault("TOGA_BACKEND", "toga_winforms")
 
 import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 
+from .compiled import mmss_to_sec
+from .history import open_history
+from .roster import ROSTER_ACCESSORS, SORT_KEYS, PagedSource, HistoryProvider
+from .chart import ProgressChart
+from .i18n import LANGS, LANG_LABEL, LANG_BY_LABEL, catalog
+from .layout import transaction, install_incremental, enable_deferred_layout, flush_layout
+from .sources import install_range_listeners
+from . import tracing
+from .report import erg_distance_rows, erg_kilo_rows, bar_rows
+from .engine import (
+    DISTANCES, SHOW_DISTANCES, EXERCISE_KEYS, REPS_TABLE, CalcError, get_split_500m, get_tables,
+    erg_equivalents, bar_equivalents,
+)
+
 # -------- Константы/настройки --------
-DISTANCES = [500, 1000, 1500, 2000, 2500, 3000, 4000, 5000, 6000, 8000, 10000]
-SHOW_DISTANCES = [500, 1000, 2000, 3000, 5000, 6000, 10000]  # 7 строк
-REPS_TABLE = {
-    1: 100, 2: 97, 3: 94, 4: 92, 5: 89, 6: 86, 7: 83, 8: 81, 9: 78, 10: 75,
-    11: 73, 12: 71, 13: 70, 14: 68, 15: 67, 16: 65, 17: 64, 18: 63, 19: 61,
-    20: 60, 21: 59, 22: 58, 23: 57, 24: 56, 25: 55, 26: 54, 27: 53, 28: 52,
-    29: 51, 30: 50
-}
 WINDOW_SIZE = (1000, 750)
+# минимальное время показа сплэша (сек); UI строится, как только загружены данные
+SPLASH_MIN_SEC = float(os.environ.get("ROWSTRENGTH_SPLASH_MIN_SEC", "0") or 0)
 
 IS_IOS = (sys.platform == "ios")
 F_HEAD = 22 if IS_IOS else 18
@@ -53,104 +65,7 @@ def S_INP(w=None): return Pack(font_size=F_INPUT, padding_right=10, width=w if w
 def S_BTN():   return Pack(padding_top=10, padding_bottom=10, padding_left=12, padding_right=12, flex=1)
 
 
-# -------- Локализация --------
-LANGS = ["en", "de", "fr", "es", "ru"]
-LANG_LABEL = {"en": "English", "de": "Deutsch", "fr": "Français", "es": "Español", "ru": "Русский"}
-T = {
-    "splash": {l: "Dev by Dudhen: @arseny.dudchenko" for l in LANGS},
-    "title": {l: "RowStrength by Dudhen" for l in LANGS},
-    "mode_erg": {"en": "Ergometer", "de": "Ergometer", "fr": "Ergomètre", "es": "Ergómetro", "ru": "Эргометр"},
-    "mode_bar": {"en": "Barbell", "de": "Langhantel", "fr": "Barre", "es": "Barra", "ru": "Штанга"},
-    "language": {"en": "Language", "de": "Sprache", "fr": "Langue", "es": "Idioma", "ru": "Язык"},
-    "gender": {"en": "Gender", "de": "Geschlecht", "fr": "Sexe", "es": "Sexo", "ru": "Пол"},
-    "female": {"en": "Female", "de": "Weiblich", "fr": "Femme", "es": "Mujer", "ru": "Жен"},
-    "male": {"en": "Male", "de": "Männlich", "fr": "Homme", "es": "Hombre", "ru": "Муж"},
-    "weight": {"en": "Body weight (kg)", "de": "Körpergewicht (kg)", "fr": "Poids (kg)", "es": "Peso corporal (kg)",
-               "ru": "Вес (кг)"},
-    "distance": {"en": "Distance", "de": "Distanz", "fr": "Distance", "es": "Distancia", "ru": "Дистанция"},
-    "minutes": {"en": "Min", "de": "Min", "fr": "Min", "es": "Min", "ru": "Мин"},
-    "seconds": {"en": "Sec", "de": "Sek", "fr": "Sec", "es": "Seg", "ru": "Сек"},
-    "centis": {"en": "Tenths", "de": "Zehntel", "fr": "Dixièmes", "es": "Décimas", "ru": "Миллисекунды"},
-    "exercise": {"en": "Exercise", "de": "Übung", "fr": "Exercice", "es": "Ejercicio", "ru": "Упражнение"},
-    "bar_weight": {"en": "Bar weight (kg)", "de": "Hantelgewicht (kg)", "fr": "Charge (kg)", "es": "Peso en barra (kg)",
-                   "ru": "Вес на штанге (кг)"},
-    "reps": {"en": "Reps", "de": "Wdh.", "fr": "Répétitions", "es": "Reps", "ru": "Повторы"},
-    "calc": {"en": "Calculate", "de": "Berechnen", "fr": "Calculer", "es": "Calcular", "ru": "Рассчитать"},
-    # Заголовки таблиц
-    "erg_tbl1_title": {
-        "en": "Results across distances",
-        "de": "Ergebnisse über Distanzen",
-        "fr": "Résultats par distances",
-        "es": "Resultados por distancias",
-        "ru": "Результаты по дистанциям",
-    },
-    "erg_tbl2_title": {
-        "en": "Barbell equivalents (bodyweight {w} kg)",
-        "de": "Hantel-Äquivalente (Körpergewicht {w} kg)",
-        "fr": "Équivalents barre (poids du corps {w} kg)",
-        "es": "Equivalentes con barra (peso corporal {w} kg)",
-        "ru": "Эквивалент в штанге с весом {w} кг",
-    },
-    "bar_tbl_title": {
-        "en": "One-rep max\nand 2k ergometer equivalent",
-        "de": "1RM\nund 2-km-Ergometer-Äquivalent",
-        "fr": "1 RM\net équivalent ergomètre 2 km",
-        "es": "1RM\ny equivalente de ergómetro 2 km",
-        "ru": "Разовый максимум\nи эквивалент на эргометре 2км",
-    },
-    # Табличные подписи
-    "tbl_1rm": {"en": "1 rep max", "de": "1RM", "fr": "1 RM", "es": "1RM", "ru": "Разовый максимум"},
-    "tbl_2k": {"en": "2k ergometer", "de": "2 km Ergo", "fr": "Ergo 2 km", "es": "Ergo 2 km", "ru": "2км эргометр"},
-    # Упражнения
-    "ex_bench": {"en": "Bench press", "de": "Bankdrücken", "fr": "Développé couché", "es": "Press banca", "ru": "Жим"},
-    "ex_squat": {"en": "Squat", "de": "Kniebeuge", "fr": "Squat", "es": "Sentadilla", "ru": "Присед"},
-    "ex_deadlift": {"en": "Deadlift", "de": "Kreuzheben", "fr": "Soulevé de terre", "es": "Peso muerto",
-                    "ru": "Становая тяга"},
-    # Ошибки
-    "err_title": {"en": "Notice", "de": "Hinweis", "fr": "Avis", "es": "Aviso", "ru": "Упс"},
-    "err_weight": {"en": "Body weight must be between 40 and 140 kg.",
-                   "de": "Körpergewicht muss zwischen 40 und 140 kg liegen.",
-                   "fr": "Le poids doit être entre 40 et 140 kg.",
-                   "es": "El peso corporal debe estar entre 40 y 140 kg.",
-                   "ru": "Упс: вес тела должен быть от 40 до 140"},
-    "err_reps": {"en": "Supported reps: 1..30.",
-                 "de": "Unterstützte Wiederholungen: 1..30.",
-                 "fr": "Répétitions prises en charge : 1..30.",
-                 "es": "Repeticiones soportadas: 1..30.",
-                 "ru": "Поддерживаются повторы: 1..30."},
-    "err_bar_weight": {"en": "Bar weight must be between 1 and 700 kg.",
-                       "de": "Hantelgewicht muss zwischen 1 und 700 kg liegen.",
-                       "fr": "La charge doit être entre 1 et 700 kg.",
-                       "es": "El peso en barra debe estar entre 1 y 700 kg.",
-                       "ru": "Вес на штанге должен быть от 1 до 700"},
-    "err_no_data": {"en": "No data for the selected distance/gender.",
-                    "de": "Keine Daten für die gewählte Distanz/Geschlecht.",
-                    "fr": "Pas de données pour cette distance/genre.",
-                    "es": "No hay datos para esta distancia/sexo.",
-                    "ru": "Нет данных по выбранной дистанции и полу."},
-    "err_time_range": {"en": "Time is out of range.", "de": "Zeit außerhalb des Bereichs.",
-                       "fr": "Temps hors plage.", "es": "Tiempo fuera de rango.", "ru": "Время вне диапазона."},
-    "err_no_strength": {"en": "No strength data for this body weight.",
-                        "de": "Keine Kraftdaten für dieses Körpergewicht.",
-                        "fr": "Pas de données de force pour ce poids.",
-                        "es": "No hay datos de fuerza para este peso.",
-                        "ru": "Нет силовых данных для указанного веса."},
-    "err_1rm_map": {"en": "Unable to estimate 1RM percent for these inputs.",
-                    "de": "Prozentsatz zum 1RM konnte nicht ermittelt werden.",
-                    "fr": "Impossible d'estimer le pourcentage de 1RM.",
-                    "es": "No se puede estimar el porcentaje de 1RM.",
-                    "ru": "Не удалось сопоставить процент к 1ПМ для этих данных."},
-}
-EX_UI_TO_KEY = {
-    lang: {
-        T["ex_bench"][lang]: "bench-press",
-        T["ex_squat"][lang]: "squat",
-        T["ex_deadlift"][lang]: "deadlift",
-    } for lang in LANGS
-}
-EX_KEY_TO_LABEL = {lang: {v: k for k, v in EX_UI_TO_KEY[lang].items()} for lang in LANGS}
-GENDER_LABELS = {lang: [T["female"][lang], T["male"][lang]] for lang in LANGS}
-GENDER_MAP = {lang: {GENDER_LABELS[lang][0]: "female", GENDER_LABELS[lang][1]: "male"} for lang in LANGS}
+def S_TITLE(): return Pack(font_size=F_LABEL, color=CLR_ACCENT, padding_top=6, padding_bottom=2)
 
 
 # -------- Утилиты расчёта/таблиц --------
@@ -158,70 +73,62 @@ def _two(n: int) -> str:
     return f"{n:02d}"
 
 
-def get_split_500m(distance_m: int, time_mmss: str) -> str:
-    m = re.fullmatch(r'\s*(\d{1,2}):(\d{2})\s*', time_mmss)
-    mm, ss = int(m.group(1)), int(m.group(2))
-    total_sec = mm * 60 + ss
-    tenths_total = round(total_sec * 10 / (distance_m / 500))
-    mins = tenths_total // 600
-    sec_tenths = tenths_total % 600
-    secs = sec_tenths // 10
-    tenth = sec_tenths % 10
-    return f"{mins:02d}:{secs:02d}.{tenth}/500m"
-
-
-def load_json_from_package(filename: str):
-    pkg = __package__ or "rowstrength"
-    with resources.files(pkg).joinpath("data").joinpath(filename).open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def get_distance_data(gender, distance, data):
-    return data.get(gender, {}).get(str(distance), {})
-
-
-def get_strength_data(gender, bw, data):
-    return data.get(gender, {}).get(str(int(bw)), {})
-
-
-def parse_available_times(distance_data):
-    mins = {}
-    for key in distance_data.keys():
-        m = re.fullmatch(r'\s*(\d{1,2}):(\d{2})\s*', key)
-        if not m:
-            continue
-        mm, ss = _two(int(m.group(1))), _two(int(m.group(2)))
-        mins.setdefault(mm, set()).add(ss)
-    minutes_sorted = sorted(mins.keys(), key=lambda x: int(x))
-    seconds_for_minute = {mm: sorted(list(sset), key=lambda x: int(x)) for mm, sset in mins.items()}
-    return minutes_sorted, seconds_for_minute
-
-
-def meters_from_key(k) -> int:
-    m = re.search(r"\d+", str(k))
-    return int(m.group()) if m else 0
-
-
-def make_table(rows, col_flex=None):
-    if not rows:
-        return toga.Box(style=S_COL())
-    cols = max(len(r) for r in rows)
-    col_flex = col_flex or [1] * cols
-    table = toga.Box(style=S_COL())
-    for r in rows:
-        row = toga.Box(style=Pack(direction=ROW, background_color=CLR_TABLE_BG, padding=6))
-        for i in range(cols):
-            text = r[i] if i < len(r) else ""
-            lbl = toga.Label(text, style=Pack(flex=col_flex[i], font_size=F_INPUT))
-            row.add(lbl)
-        table.add(row)
-    return table
+class ResultTable:
+    """Постоянная таблица результатов: ячейки создаются один раз, дальше меняется только текст."""
+
+    def __init__(self, cols: int, col_flex=None, max_rows: int = 0, title: str = ""):
+        self.col_flex = col_flex or [1] * cols
+        self.title_label = toga.Label(title, style=S_TITLE())
+        self.box = toga.Box(children=[toga.Box(children=[self.title_label], style=S_ROW())], style=S_COL())
+        self._rows = []     # (row_box, labels, тексты)
+        self._shown = 0     # сколько строк сейчас прикреплено к box
+        for _ in range(max_rows):
+            self._new_row()
+
+    def _new_row(self):
+        cells = [toga.Label("", style=Pack(flex=f, font_size=F_INPUT)) for f in self.col_flex]
+        row = toga.Box(children=cells, style=Pack(direction=ROW, background_color=CLR_TABLE_BG, padding=6))
+        self._rows.append((row, cells, [""] * len(cells)))
+
+    def update(self, rows, title=None):
+        # тексты и строки меняются в одной транзакции: ярлыки пересчитывают только свой размер,
+        # дерево перекладывается один раз в конце (вложенная транзакция — вместе с внешней)
+        with transaction():
+            if title is not None:
+                self.title_label.text = title
+            while len(self._rows) < len(rows):
+                self._new_row()
+            for (_, cells, texts), r in zip(self._rows, rows):
+                for i, lbl in enumerate(cells):
+                    text = r[i] if i < len(r) else ""
+                    if texts[i] != text:
+                        texts[i] = lbl.text = text
+
+            # структура меняется, только если изменилось число строк
+            n = len(rows)
+            if n < self._shown:
+                self.box.remove(*(row for row, _, _ in self._rows[n:self._shown]))
+            elif n > self._shown:
+                self.box.add(*(row for row, _, _ in self._rows[self._shown:n]))
+            self._shown = n
+
+
+def _load_data(data_dir):
+    # выполняется в пуле потоков: таблицы + индекс для выбора по умолчанию (муж, 2000) и история
+    rowing, strength = get_tables()
+    rowing.index("male", 2000)
+    try:
+        history = open_history(data_dir)
+    except Exception:
+        history = None
+    return rowing, strength, history
 
 
 # --- вспомогательный форс лэйаута для iOS ---
 def _force_layout_ios(window):
     if sys.platform != "ios":
         return
+    flush_layout()
     try:
         native = window._impl.native
         native.view.setNeedsLayout()
@@ -230,22 +137,59 @@ def _force_layout_ios(window):
         pass
 
 
+# ярлыки и кнопки с постоянным текстом: атрибут приложения -> id сообщения (i18n.MESSAGE_IDS)
+TEXT_BINDINGS = (
+    ("title_lbl", "title"), ("lang_lbl", "language"),
+    ("gender_lbl", "gender"), ("weight_lbl", "weight"), ("distance_lbl", "distance"), ("min_lbl", "minutes"),
+    ("sec_lbl", "seconds"), ("cen_lbl", "centis"), ("btn_erg", "calc"),
+    ("gender_b_lbl", "gender"), ("weight_b_lbl", "weight"), ("ex_lbl", "exercise"), ("bw_lbl", "bar_weight"),
+    ("reps_lbl", "reps"), ("btn_bar", "calc"),
+    ("athlete_lbl", "athlete"), ("filter_lbl", "filter"), ("sort_lbl", "sort"), ("sort_desc", "descending"),
+    ("btn_roster", "refresh"),
+)
+
+
 # -------- Приложение --------
 class RowStrengthApp(toga.App):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # раскладка только изменённых поддеревьев; ROWSTRENGTH_FULL_LAYOUT=1 — всё дерево, как в toga
+        if not os.environ.get("ROWSTRENGTH_FULL_LAYOUT"):
+            install_incremental()
+        install_range_listeners()   # таблицы: один update_data на extend()/replace_all()/batch() источника
         self.lang = "ru"
+        self.tr = catalog(self.lang)   # тексты текущего языка; смена языка — замена ссылки
         self._updating = False
         self._erg_init_done = False
-        self.rowing_data = None
-        self.strength_data_all = None
+        self._second_pass_handle = None   # отложенный повторный проход раскладки (_post_build_fixups)
+        self.rowing_table = None
+        self.strength_table = None
+        # таблицы результатов (создаются при первом расчёте, дальше переиспользуются)
+        self.erg_table1 = None
+        self.erg_table2 = None
+        self.bar_table = None
         # ссылки на заголовки таблиц (создаются только при расчёте)
         self.erg_tbl1_title_label = None
         self.erg_tbl2_title_label = None
         self.bar_tbl_title_label = None
+        self.startup_timer = PhaseTimer()
+        self._data_future = None
+        # история расчётов (SQLite); athlete — кому записывать расчёт (None — без спортсмена)
+        self.history = None
+        self.athlete = None
+        # таблица команды: строки страницами из истории, сортировка/фильтр в пуле потоков
+        self.roster_source = PagedSource()
+        self.roster_table = None
 
     # ---- Сплэш ----
     def startup(self):
+        self.startup_timer.mark("startup")
+        # ROWSTRENGTH_TRACE=trace.json — спаны обработчиков и раскладки (до создания виджетов)
+        tracing.start_if_enabled()
+        # add()/remove()/стили вне транзакций перекладывают окно раз за итерацию цикла, а не на каждый вызов
+        enable_deferred_layout()
+        # данные грузятся в фоне, пока строится и показывается сплэш
+        self._data_future = asyncio.get_event_loop().run_in_executor(None, _load_data, self.paths.data)
         self.main_window = toga.MainWindow(title="RowStrength", size=WINDOW_SIZE)
         for attr in ("resizeable", "resizable"):
             try:
@@ -254,7 +198,7 @@ class RowStrengthApp(toga.App):
             except Exception:
                 pass
 
-        splash = toga.Label(T["splash"][self.lang], style=Pack(font_size=18, text_align="center", color=CLR_ACCENT))
+        splash = toga.Label(self.tr.splash, style=Pack(font_size=18, text_align="center", color=CLR_ACCENT))
         center_row = toga.Box(style=Pack(direction=ROW, flex=1))
         center_row.add(toga.Box(style=Pack(flex=1)))
         center_row.add(splash)
@@ -262,17 +206,35 @@ class RowStrengthApp(toga.App):
         splash_root = toga.Box(children=[toga.Box(style=Pack(flex=1)), center_row, toga.Box(style=Pack(flex=1))],
                                style=Pack(direction=COLUMN, flex=1, padding=24))
         self.main_window.content = splash_root
+        flush_layout()   # сплэш показывается уже разложенным
         self.main_window.show()
+        self.startup_timer.mark("splash_shown")
 
         if sys.platform == "darwin":
             self.on_running = self._after_start
         else:
-            asyncio.get_event_loop().call_later(3.0, self._safe_build_main)
+            asyncio.get_event_loop().create_task(self._build_when_ready())
 
     async def _after_start(self, app):
         await asyncio.sleep(0)
-        await asyncio.sleep(3.0)
+        await self._build_when_ready()
+
+    async def _build_when_ready(self):
+        try:
+            _, _, self.history = await self._data_future
+        except Exception as e:
+            self._info(str(e))
+            return
+        if self.history is not None:
+            self.roster_source.provider = HistoryProvider(self.history, self.tr.ex_key_to_label)
+        loaded = self.startup_timer.mark("data_loaded")
+        remaining = SPLASH_MIN_SEC - (loaded - self.startup_timer.get("splash_shown"))
+        if remaining > 0:
+            await asyncio.sleep(remaining)
         self._safe_build_main()
+        self.startup_timer.mark("interactive")
+        self.startup_timer.report_if_enabled()
+        report_imports_if_enabled()
 
     def _safe_build_main(self):
         try:
@@ -280,9 +242,16 @@ class RowStrengthApp(toga.App):
         except Exception as e:
             self._info(str(e))
 
+    def on_exit(self):
+        # дописать очередь истории на диск перед выходом
+        if self.history is not None:
+            self.history.close()
+        tracing.write_if_enabled()
+        return True
+
     def _info(self, msg: str):
         try:
-            self.main_window.info_dialog(T["err_title"][self.lang], msg)
+            self.main_window.info_dialog(self.tr.err_title, msg)
         except Exception:
             print(msg)
 
@@ -301,40 +270,42 @@ class RowStrengthApp(toga.App):
 
     # ---- Основной UI ----
     def _build_main(self):
-        self.rowing_data = load_json_from_package("data_for_rowing_app.json")
-        self.strength_data_all = load_json_from_package("data_for_strength_app.json")
+        self.rowing_table, self.strength_table = get_tables()
 
         # Шапка
-        title_lbl = toga.Label(T["title"][self.lang], style=Pack(font_size=F_HEAD, color="#501c59", padding=8))
+        self.title_lbl = toga.Label(self.tr.title, style=Pack(font_size=F_HEAD, color="#501c59", padding=8))
         self.lang_sel = toga.Selection(items=[LANG_LABEL[c] for c in LANGS],
                                        value=LANG_LABEL[self.lang],
                                        on_change=self._on_lang_change,
                                        style=S_INP(160))
         header = toga.Box(style=Pack(direction=ROW, background_color=CLR_HEADER_BG, padding_left=8, padding_right=8))
-        header.add(title_lbl)
+        self.lang_lbl = toga.Label(self.tr.language, style=Pack(font_size=F_LABEL, padding_right=6))
+        header.add(self.title_lbl)
         header.add(toga.Box(style=Pack(flex=1)))
-        header.add(toga.Label(T["language"][self.lang], style=Pack(font_size=F_LABEL, padding_right=6)))
+        header.add(self.lang_lbl)
         header.add(self.lang_sel)
 
         # ===== Вкладка Эргометр =====
-        self.gender_lbl = toga.Label(T["gender"][self.lang], style=S_LBL())
-        self.gender = toga.Selection(items=GENDER_LABELS[self.lang], value=GENDER_LABELS[self.lang][1],
+        self.gender_lbl = toga.Label(self.tr.gender, style=S_LBL())
+        self.gender = toga.Selection(items=self.tr.gender_labels, value=self.tr.gender_labels[1],
                                      on_change=self._on_gender_change, style=S_INP(160))
-        self.weight_lbl = toga.Label(T["weight"][self.lang], style=S_LBL())
-        self.weight = toga.NumberInput(step=1, value=80, style=S_INP(160))
+        self.weight_lbl = toga.Label(self.tr.weight, style=S_LBL())
+        self.weight = toga.NumberInput(step=0.1, value=80, on_change=self._on_erg_input_change, style=S_INP(160))
 
-        self.distance_lbl = toga.Label(T["distance"][self.lang], style=S_LBL())
+        self.distance_lbl = toga.Label(self.tr.distance, style=S_LBL())
         self.distance = toga.Selection(items=[str(d) for d in DISTANCES], value="2000",
                                        on_change=self._on_distance_change, style=S_INP(160))
 
-        self.min_lbl = toga.Label(T["minutes"][self.lang], style=S_LBL())
-        self.sec_lbl = toga.Label(T["seconds"][self.lang], style=S_LBL())
-        self.cen_lbl = toga.Label(T["centis"][self.lang], style=S_LBL())
+        self.min_lbl = toga.Label(self.tr.minutes, style=S_LBL())
+        self.sec_lbl = toga.Label(self.tr.seconds, style=S_LBL())
+        self.cen_lbl = toga.Label(self.tr.centis, style=S_LBL())
         self.min_sel = toga.Selection(items=["06"], value="06", on_change=self._on_minute_change, style=S_INP(120))
-        self.sec_sel = toga.Selection(items=[_two(i) for i in range(60)], value="00", style=S_INP(120))
-        self.cen_sel = toga.Selection(items=[str(i) for i in range(10)], value="0", style=S_INP(120))
+        self.sec_sel = toga.Selection(items=[_two(i) for i in range(60)], value="00",
+                                      on_change=self._on_erg_input_change, style=S_INP(120))
+        self.cen_sel = toga.Selection(items=[str(i) for i in range(10)], value="0",
+                                      on_change=self._on_erg_input_change, style=S_INP(120))
 
-        self.btn_erg = toga.Button(T["calc"][self.lang], on_press=self.calculate_erg, style=S_BTN())
+        self.btn_erg = toga.Button(self.tr.calc, on_press=self.calculate_erg, style=S_BTN())
         try:
             self.btn_erg.style.background_color = CLR_BTN_BG
             self.btn_erg.style.color = CLR_BTN_FG
@@ -358,22 +329,22 @@ class RowStrengthApp(toga.App):
         erg_page = toga.ScrollContainer(content=erg_col, horizontal=False)
 
         # ===== Вкладка Штанга ===== (с Полом и Весом)
-        self.gender_b_lbl = toga.Label(T["gender"][self.lang], style=S_LBL())
-        self.gender_b = toga.Selection(items=GENDER_LABELS[self.lang], value=GENDER_LABELS[self.lang][1],
+        self.gender_b_lbl = toga.Label(self.tr.gender, style=S_LBL())
+        self.gender_b = toga.Selection(items=self.tr.gender_labels, value=self.tr.gender_labels[1],
                                        style=S_INP(160))
-        self.weight_b_lbl = toga.Label(T["weight"][self.lang], style=S_LBL())
-        self.weight_b = toga.NumberInput(step=1, value=80, style=S_INP(160))
+        self.weight_b_lbl = toga.Label(self.tr.weight, style=S_LBL())
+        self.weight_b = toga.NumberInput(step=0.1, value=80, style=S_INP(160))
 
-        self.ex_lbl = toga.Label(T["exercise"][self.lang], style=S_LBL())
-        self.exercise = toga.Selection(items=list(EX_UI_TO_KEY[self.lang].keys()),
-                                       value=list(EX_UI_TO_KEY[self.lang].keys())[0],
+        self.ex_lbl = toga.Label(self.tr.exercise, style=S_LBL())
+        self.exercise = toga.Selection(items=self.tr.exercise_labels,
+                                       value=self.tr.exercise_labels[0],
                                        style=S_INP(200))
-        self.bw_lbl = toga.Label(T["bar_weight"][self.lang], style=S_LBL())
+        self.bw_lbl = toga.Label(self.tr.bar_weight, style=S_LBL())
         self.bar_weight = toga.NumberInput(step=1, value=100, style=S_INP(160))
-        self.reps_lbl = toga.Label(T["reps"][self.lang], style=S_LBL())
+        self.reps_lbl = toga.Label(self.tr.reps, style=S_LBL())
         self.reps = toga.NumberInput(step=1, value=5, style=S_INP(120))
 
-        self.btn_bar = toga.Button(T["calc"][self.lang], on_press=self.calculate_bar, style=S_BTN())
+        self.btn_bar = toga.Button(self.tr.calc, on_press=self.calculate_bar, style=S_BTN())
         try:
             self.btn_bar.style.background_color = CLR_BTN_BG
             self.btn_bar.style.color = CLR_BTN_FG
@@ -395,15 +366,52 @@ class RowStrengthApp(toga.App):
         bar_col = toga.Box(children=bar_rows, style=S_COL())
         bar_page = toga.ScrollContainer(content=bar_col, horizontal=False)
 
+        # ===== Вкладка Команда ===== (таблица виртуальная: прокручивается сама, без ScrollContainer)
+        self.athlete_lbl = toga.Label(self.tr.athlete, style=S_LBL())
+        self.athlete_inp = toga.TextInput(value=self.athlete or "", on_change=self._on_athlete_change,
+                                          style=S_INP(200))
+        self.filter_lbl = toga.Label(self.tr.filter, style=S_LBL())
+        self.filter_inp = toga.TextInput(on_change=self._on_roster_query_change, style=S_INP(200))
+        self.sort_lbl = toga.Label(self.tr.sort, style=S_LBL())
+        self.sort_sel = toga.Selection(items=self.tr.roster_headings, value=self.tr.roster_headings[1],
+                                       on_change=self._on_roster_query_change, style=S_INP(200))
+        self.sort_desc = toga.Switch(self.tr.descending, value=True, on_change=self._on_roster_query_change,
+                                     style=Pack(font_size=F_LABEL, padding_right=10))
+        self.btn_roster = toga.Button(self.tr.refresh, on_press=self._on_roster_refresh, style=S_BTN())
+        self.btn_export = toga.Button(self.tr.export, on_press=self._on_export, style=S_BTN())
+        try:
+            for btn in (self.btn_roster, self.btn_export):
+                btn.style.background_color = CLR_BTN_BG
+                btn.style.color = CLR_BTN_FG
+        except Exception:
+            pass
+        self.roster_table = self._make_roster_table()
+        self.roster_box = toga.Box(children=[
+            toga.Box(children=[self.athlete_lbl, self.athlete_inp], style=S_ROW()),
+            toga.Box(children=[self.filter_lbl, self.filter_inp], style=S_ROW()),
+            toga.Box(children=[self.sort_lbl, self.sort_sel, self.sort_desc], style=S_ROW()),
+            toga.Box(children=[self.btn_roster, self.btn_export], style=S_ROW()),
+            self.roster_table,
+        ], style=Pack(direction=COLUMN, flex=1))
+
+        # ===== Вкладка График ===== (следует за вводом на вкладке Эргометр)
+        self.chart = ProgressChart(style=Pack(flex=1), font_size=F_LABEL - 4)
+        chart_page = toga.Box(children=[self.chart.canvas], style=Pack(direction=COLUMN, flex=1, padding=8))
+
         # Tabs
         try:
-            self.tabs = toga.OptionContainer(content=[(T["mode_erg"][self.lang], erg_page),
-                                                      (T["mode_bar"][self.lang], bar_page)],
+            self.tabs = toga.OptionContainer(content=[(self.tr.mode_erg, erg_page),
+                                                      (self.tr.mode_bar, bar_page),
+                                                      (self.tr.mode_roster, self.roster_box),
+                                                      (self.tr.mode_chart, chart_page)],
                                              style=Pack(flex=1))
         except TypeError:
-            self.tabs = toga.OptionContainer(content=[(erg_page, T["mode_erg"][self.lang]),
-                                                      (bar_page, T["mode_bar"][self.lang])],
+            self.tabs = toga.OptionContainer(content=[(erg_page, self.tr.mode_erg),
+                                                      (bar_page, self.tr.mode_bar),
+                                                      (self.roster_box, self.tr.mode_roster),
+                                                      (chart_page, self.tr.mode_chart)],
                                              style=Pack(flex=1))
+        self.tabs.on_select = self._on_tab_select
 
         root = toga.Box(style=Pack(direction=COLUMN, flex=1))
         root.add(header)
@@ -413,68 +421,85 @@ class RowStrengthApp(toga.App):
         # Первичная инициализация таймингов
         self._rebuild_time_selects()
         self._erg_init_done = True
+        self._update_chart()
 
         # Пост-фиксации для iOS/первой отрисовки
         self._post_build_fixups()
 
     # ---- Пост-фиксации для iOS и первой раскладки ----
-    def _post_build_fixups(self):
-        try:
-            self.btn_erg.style.flex = 1
-            self.btn_bar.style.flex = 1
-            self.btn_erg.refresh()
-            self.btn_bar.refresh()
-        except Exception:
-            pass
+    def _post_build_fixups(self, second_pass=True):
+        """second_pass=False — без отложенного повторного прохода (кроме iOS, где он нужен всегда)."""
+        # изменения собираются в одну раскладку окна
+        with self.ui_transaction():
+            try:
+                self.btn_erg.style.flex = 1
+                self.btn_bar.style.flex = 1
+                self.btn_erg.refresh()
+                self.btn_bar.refresh()
+            except Exception:
+                pass
 
-        try:
-            self._rebuild_time_selects()
+            try:
+                self._rebuild_time_selects()
 
-            minutes = list(self.min_sel.items) or []
-            if "06" in minutes:
-                self.min_sel.value = "06"
+                minutes = list(self.min_sel.items) or []
+                if "06" in minutes:
+                    self.min_sel.value = "06"
 
-                g_key = GENDER_MAP[self.lang].get(self.gender.value, "male")
-                dist = int(self.distance.value)
-                dist_data = get_distance_data(g_key, dist, self.rowing_data)
-                _, sec_map = parse_available_times(dist_data)
-                secs = sec_map.get("06", list(self.sec_sel.items) or ["00"])
-                self.sec_sel.items = secs
-                self.sec_sel.value = secs[0]
+                    idx = self._distance_index()
+                    sec_map = idx.seconds_for_minute if idx is not None else {}
+                    secs = sec_map.get("06", list(self.sec_sel.items) or ["00"])
+                    self.sec_sel.items = secs
+                    self.sec_sel.value = secs[0]
 
-            self.min_sel.refresh()
-            self.sec_sel.refresh()
-        except Exception:
-            pass
+                self.min_sel.refresh()
+                self.sec_sel.refresh()
+            except Exception:
+                pass
 
         _force_layout_ios(self.main_window)
 
         def _second_pass():
+            self._second_pass_handle = None
             try:
-                self.main_window.content.refresh()
-                self.min_sel.refresh()
-                self.sec_sel.refresh()
-                self.btn_erg.refresh()
-                self.btn_bar.refresh()
+                with self.ui_transaction():
+                    self.main_window.content.refresh()
+                    self.min_sel.refresh()
+                    self.sec_sel.refresh()
+                    self.btn_erg.refresh()
+                    self.btn_bar.refresh()
                 _force_layout_ios(self.main_window)
             except Exception:
                 pass
 
-        asyncio.get_event_loop().call_later(0.15, _second_pass)
+        # смена языка меняет только тексты: на десктопе окно уже переложено одной раскладкой
+        # транзакции, повторный проход нужен лишь iOS, где нативный вид догоняет с опозданием
+        if not second_pass and sys.platform != "ios":
+            return
+        # несколько изменений подряд — один повторный проход
+        if self._second_pass_handle is not None:
+            self._second_pass_handle.cancel()
+        self._second_pass_handle = asyncio.get_event_loop().call_later(0.15, _second_pass)
+
+    def ui_transaction(self):
+        """with app.ui_transaction(): ... — много изменений виджетов, одна раскладка в конце."""
+        return transaction()
 
     # ---- Минуты/секунды ----
+    def _distance_index(self):
+        g_key = self.tr.gender_map.get(self.gender.value, "male")
+        return self.rowing_table.index(g_key, int(self.distance.value))
+
     def _rebuild_time_selects(self):
-        g_key = GENDER_MAP[self.lang].get(self.gender.value, "male")
-        dist = int(self.distance.value)
-        dist_data = get_distance_data(g_key, dist, self.rowing_data)
-        if not dist_data:
+        idx = self._distance_index()
+        if idx is None:
             self.min_sel.items = ["00"];
             self.min_sel.value = "00"
             self.sec_sel.items = ["00"];
             self.sec_sel.value = "00"
             return
 
-        minutes, sec_map = parse_available_times(dist_data)
+        minutes, sec_map = idx.minutes, idx.seconds_for_minute
         default_min = minutes[1] if len(minutes) >= 2 else minutes[0]
         if self._erg_init_done and self.min_sel.value in minutes:
             default_min = self.min_sel.value
@@ -492,150 +517,233 @@ class RowStrengthApp(toga.App):
     def _update_existing_titles(self):
         # Эргометр
         if self.erg_tbl1_title_label is not None:
-            self.erg_tbl1_title_label.text = T["erg_tbl1_title"][self.lang]
+            self.erg_tbl1_title_label.text = self.tr.erg_tbl1_title
         if self.erg_tbl2_title_label is not None:
             try:
-                w = int(float(self.weight.value or 0))
+                w = float(self.weight.value or 0)
             except Exception:
                 w = 0
-            self.erg_tbl2_title_label.text = T["erg_tbl2_title"][self.lang].format(w=w)
+            self.erg_tbl2_title_label.text = self.tr.erg_tbl2_title.format(w=f"{w:g}")
         # Штанга
         if self.bar_tbl_title_label is not None:
-            self.bar_tbl_title_label.text = T["bar_tbl_title"][self.lang]
+            self.bar_tbl_title_label.text = self.tr.bar_tbl_title
 
     # ---- Handlers ----
     def _on_lang_change(self, widget):
         if self._updating: return
-        inv = {v: k for k, v in LANG_LABEL.items()}
-        self.lang = inv.get(self.lang_sel.value, "ru")
-        self._apply_language_texts()
-        self._rebuild_time_selects()
-        # НЕ рассчитываем автоматически! Только обновляем заголовки уже показанных таблиц (если они есть).
-        self._update_existing_titles()
-        self._post_build_fixups()
+        self.lang = LANG_BY_LABEL.get(self.lang_sel.value, "ru")
+        self.tr = catalog(self.lang)
+        # все подписи, списки и таблица команды меняются за одну раскладку окна
+        with self.ui_transaction():
+            self._apply_language_texts()
+            self._rebuild_time_selects()
+            # НЕ рассчитываем автоматически! Только обновляем заголовки уже показанных таблиц (если они есть).
+            self._update_existing_titles()
+            self._update_chart()
+            self._post_build_fixups(second_pass=False)
 
     def _apply_language_texts(self):
-        header = self.main_window.content.children[0]
-        header.children[0].text = T["title"][self.lang]
-        header.children[-2].text = T["language"][self.lang]
-
-        # Эргометр
-        self.gender_lbl.text = T["gender"][self.lang]
-        self.weight_lbl.text = T["weight"][self.lang]
-        self.distance_lbl.text = T["distance"][self.lang]
-        self.min_lbl.text = T["minutes"][self.lang]
-        self.sec_lbl.text = T["seconds"][self.lang]
-        self.cen_lbl.text = T["centis"][self.lang]
-        self.btn_erg.text = T["calc"][self.lang]
-        # Пол всегда Муж по умолчанию при смене языка
-        self.gender.items = GENDER_LABELS[self.lang]
-        self.gender.value = GENDER_LABELS[self.lang][1]
-
-        # Штанга
-        self.gender_b_lbl.text = T["gender"][self.lang]
-        self.weight_b_lbl.text = T["weight"][self.lang]
-        self.gender_b.items = GENDER_LABELS[self.lang]
-        self.gender_b.value = GENDER_LABELS[self.lang][1]
-
-        self.ex_lbl.text = T["exercise"][self.lang]
-        self.bw_lbl.text = T["bar_weight"][self.lang]
-        self.reps_lbl.text = T["reps"][self.lang]
-        self.btn_bar.text = T["calc"][self.lang]
+        # постоянные подписи — одним проходом без перекладки; окно перекладывается один раз в конце
+        tr = self.tr
+        for attr, msg in TEXT_BINDINGS:
+            getattr(self, attr).text = getattr(tr, msg)
+        if self.btn_export.enabled:
+            self.btn_export.text = tr.export
+
+        # Пол всегда Муж по умолчанию при смене языка; списки времени и график _on_lang_change
+        # перестраивает сам, on_change пола здесь только повторил бы их (и второй проход раскладки)
+        self._updating = True
+        try:
+            self.gender.items = tr.gender_labels
+            self.gender.value = tr.gender_labels[1]
+            self.gender_b.items = tr.gender_labels
+            self.gender_b.value = tr.gender_labels[1]
+        finally:
+            self._updating = False
         self._set_exercise_items()
 
         # Заголовки вкладок
         try:
             items = list(self.tabs.content)
-            items[0].text = T["mode_erg"][self.lang]
-            items[1].text = T["mode_bar"][self.lang]
+            items[0].text = tr.mode_erg
+            items[1].text = tr.mode_bar
+            items[2].text = tr.mode_roster
+            items[3].text = tr.mode_chart
+        except Exception:
+            pass
+
+        # Команда: у toga.Table нет сеттера заголовков — таблица пересоздаётся над тем же источником
+        sort_index = self._roster_sort_index()
+        self._updating = True
+        try:
+            self.sort_sel.items = tr.roster_headings
+            self.sort_sel.value = tr.roster_headings[sort_index]
+        finally:
+            self._updating = False
+        provider = self.roster_source.provider
+        if provider is not None and hasattr(provider, "ex_labels"):
+            provider.ex_labels = tr.ex_key_to_label
+            self.roster_source.invalidate()
+        table = self._make_roster_table()
+        self.roster_box.replace(self.roster_table, table)
+        self.roster_table = table
+        self.main_window.content.refresh()
+
+    # ---- Команда ----
+    def _make_roster_table(self):
+        return toga.Table(headings=self.tr.roster_headings, accessors=ROSTER_ACCESSORS, data=self.roster_source,
+                          missing_value="", style=Pack(flex=1, font_size=F_INPUT))
+
+    def _roster_sort_index(self) -> int:
+        try:
+            return list(self.sort_sel.items).index(self.sort_sel.value)
+        except ValueError:
+            return 1
+
+    def reload_roster(self):
+        """Перечитать таблицу команды; сортировка и фильтр считаются в пуле потоков."""
+        return asyncio.get_event_loop().create_task(self._reload_roster())
+
+    async def _reload_roster(self):
+        try:
+            await self.roster_source.reload((self.filter_inp.value or "").strip(),
+                                            SORT_KEYS[self._roster_sort_index()], bool(self.sort_desc.value))
+        except Exception as e:
+            self._info(str(e))
+
+    def _on_athlete_change(self, widget):
+        self.athlete = (widget.value or "").strip() or None
+
+    def _on_roster_query_change(self, widget):
+        if self._updating: return
+        self.reload_roster()
+
+    def _on_roster_refresh(self, widget):
+        self.reload_roster()
+
+    def _on_export(self, widget):
+        if self.history is None or not len(self.roster_source):
+            return
+        asyncio.get_event_loop().create_task(self._export_report())
+
+    async def _export_report(self):
+        """Отчёт по строкам таблицы команды (текущие фильтр и сортировка) в каталог данных.
+
+        Страницы рисуются в пуле процессов (report.export_report), которым управляет поток
+        из пула потоков: GUI не блокируется, прогресс — в тексте кнопки.
+        """
+        from datetime import datetime
+        from .report import export_report, history_blocks
+        loop = asyncio.get_running_loop()
+        tr = self.tr
+        keys = self.roster_source.keys
+        out_dir = self.paths.data / "reports" / datetime.now().strftime("%Y%m%d-%H%M%S")
+
+        def progress(n):
+            loop.call_soon_threadsafe(setattr, self.btn_export, "text", tr.exporting.format(n=n))
+
+        self.btn_export.enabled = False
+        try:
+            res = await loop.run_in_executor(None, lambda: export_report(
+                history_blocks(self.history, keys, tr), out_dir, header=tr.report_title, progress=progress))
+            self.main_window.info_dialog(tr.export, tr.export_done.format(n=res["pages"], path=res["pdf"]))
+        except Exception as e:
+            self._info(str(e))
+        finally:
+            self.btn_export.enabled = True
+            # кнопка остаётся в окне — подпись на текущем языке (пока шёл экспорт, его могли сменить)
+            self.btn_export.text = self.tr.export
+
+    def _on_tab_select(self, widget):
+        # новые расчёты появляются в таблице при каждом открытии вкладки
+        try:
+            if widget.current_tab.index == 2:
+                self.reload_roster()
         except Exception:
             pass
 
     def _set_exercise_items(self):
         current = self.exercise.value
-        items = list(EX_UI_TO_KEY[self.lang].keys())
+        items = self.tr.exercise_labels
         self.exercise.items = items
         self.exercise.value = current if current in items else items[0]
 
     def _on_gender_change(self, widget):
         if self._updating: return
-        self._rebuild_time_selects()
-        self._post_build_fixups()
+        with self.ui_transaction():
+            self._rebuild_time_selects()
+            self._update_chart()
+            self._post_build_fixups()
 
     def _on_distance_change(self, widget):
         if self._updating: return
-        self._rebuild_time_selects()
-        self._post_build_fixups()
+        with self.ui_transaction():
+            self._rebuild_time_selects()
+            self._update_chart()
+            self._post_build_fixups()
 
     def _on_minute_change(self, widget):
         if self._updating: return
-        g_key = GENDER_MAP[self.lang].get(self.gender.value, "male")
-        dist = int(self.distance.value)
-        dist_data = get_distance_data(g_key, dist, self.rowing_data)
-        minutes, sec_map = parse_available_times(dist_data)
+        idx = self._distance_index()
+        sec_map = idx.seconds_for_minute if idx is not None else {}
         seconds = sec_map.get(self.min_sel.value, ["00"])
         self.sec_sel.items = seconds
         self.sec_sel.value = seconds[0]
+        self._update_chart()
+
+    def _on_erg_input_change(self, widget):
+        if self._updating or not self._erg_init_done: return
+        self._update_chart()
+
+    # ---- График ----
+    def _update_chart(self):
+        # кривая берётся из кэша графика; при вводе времени/веса перестраивается только точка
+        try:
+            g_key = self.tr.gender_map.get(self.gender.value, "male")
+            distance = int(self.distance.value)
+            self.chart.show_curve(g_key, distance, self.rowing_table.index(g_key, distance))
+            bw = float(self.weight.value or 0)
+            time_mmss, tenths = f"{self.min_sel.value}:{self.sec_sel.value}", int(self.cen_sel.value or 0)
+            res = erg_equivalents(g_key, bw, distance, time_mmss, tenths)
+        except (CalcError, ValueError, TypeError):
+            self.chart.clear_point()
+            return
+        labels = self.tr.ex_key_to_label
+        lines = [f"{distance} m  {time_mmss}.{tenths}  {res.percent}%"]
+        lines += [f"{labels[ex_key]}: {kilo} kg" for ex_key, kilo in res.kilos]
+        self.chart.show_point(mmss_to_sec(time_mmss) + tenths / 10, float(res.percent), lines)
 
     # ---- Расчёты ----
     def calculate_erg(self, widget):
         self._dismiss_ios_inputs()
         try:
             bw = float(self.weight.value or 0)
-            if not (40 <= bw <= 140):
-                self._info(T["err_weight"][self.lang]);
+            g_key = self.tr.gender_map.get(self.gender.value, "male")
+            time_mmss, tenths = f"{self.min_sel.value}:{self.sec_sel.value}", int(self.cen_sel.value or 0)
+            try:
+                res = erg_equivalents(g_key, bw, int(self.distance.value), time_mmss, tenths)
+            except CalcError as e:
+                self._info(self.tr.message(e.key));
                 return
-
-            g_key = GENDER_MAP[self.lang].get(self.gender.value, "male")
-            dist = int(self.distance.value)
-            dist_data = get_distance_data(g_key, dist, self.rowing_data)
-            if not dist_data: self._info(T["err_no_data"][self.lang]); return
-
-            t_norm = f"{self.min_sel.value}:{self.sec_sel.value}"
-            dist_data_time = dist_data.get(t_norm) or dist_data.get(t_norm.lstrip("0"))
-            if not dist_data_time: self._info(T["err_time_range"][self.lang]); return
-
-            percent = dist_data_time.get("percent")
-            strength = get_strength_data(g_key, bw, self.strength_data_all)
-            if not strength: self._info(T["err_no_strength"][self.lang]); return
+            if self.history is not None:
+                self.history.record_erg(self.athlete, g_key, bw, int(self.distance.value), time_mmss, tenths, res)
 
             # Таблица 1 (7x3)
-            rows1, keys = [], [k for k in dist_data_time.keys() if k != "percent"]
-            kmap = {meters_from_key(k): dist_data_time[k] for k in keys}
-            for m in SHOW_DISTANCES:
-                if m in kmap:
-                    t = kmap[m]
-                    rows1.append([f"{m} m", f"{t}.00", get_split_500m(m, t)])
+            rows1 = erg_distance_rows(res)
 
             # Таблица 2 (3x2)
-            rows2, labels = [], EX_KEY_TO_LABEL[self.lang]
-            for ex_key, ui_label in labels.items():
-                kilo = strength.get(ex_key, {}).get(percent)
-                if kilo == "1":
-                    vmap = strength.get(ex_key, {})
-                    kilo = round((float(kilo) + float(vmap.get("1"))) / 2, 2)
-                rows2.append([ui_label, f"{kilo} kg"])
-
-            # Показать заголовки + таблицы (только сейчас)
-            self.erg_results_holder.children.clear()
-
-            # Заголовок 1
-            self.erg_tbl1_title_label = toga.Label(
-                T["erg_tbl1_title"][self.lang],
-                style=Pack(font_size=F_LABEL, color=CLR_ACCENT, padding_top=6, padding_bottom=2)
-            )
-            self.erg_results_holder.add(toga.Box(children=[self.erg_tbl1_title_label], style=S_ROW()))
-            # Таблица 1
-            self.erg_results_holder.add(make_table(rows1, col_flex=[1, 1, 1]))
-
-            # Заголовок 2 (с весом)
-            self.erg_tbl2_title_label = toga.Label(
-                T["erg_tbl2_title"][self.lang].format(w=int(bw)),
-                style=Pack(font_size=F_LABEL, color=CLR_ACCENT, padding_top=6, padding_bottom=2)
-            )
-            self.erg_results_holder.add(toga.Box(children=[self.erg_tbl2_title_label], style=S_ROW()))
-            # Таблица 2
-            self.erg_results_holder.add(make_table(rows2, col_flex=[1, 1]))
+            rows2 = erg_kilo_rows(res, self.tr.ex_key_to_label)
+
+            # Показать заголовки + таблицы: при первом расчёте создаём, дальше только меняем текст
+            with self.ui_transaction():
+                if self.erg_table1 is None:
+                    self.erg_table1 = ResultTable(3, col_flex=[1, 1, 1], max_rows=len(SHOW_DISTANCES))
+                    self.erg_table2 = ResultTable(2, col_flex=[1, 1], max_rows=len(EXERCISE_KEYS))
+                    self.erg_tbl1_title_label = self.erg_table1.title_label
+                    self.erg_tbl2_title_label = self.erg_table2.title_label
+                    self.erg_results_holder.add(self.erg_table1.box, self.erg_table2.box)
+                self.erg_table1.update(rows1, self.tr.erg_tbl1_title)
+                self.erg_table2.update(rows2, self.tr.erg_tbl2_title.format(w=f"{bw:g}"))
 
         except Exception as e:
             self._info(str(e))
@@ -644,57 +752,26 @@ class RowStrengthApp(toga.App):
         self._dismiss_ios_inputs()
         try:
             bw = float(self.weight_b.value or 0)
-            if not (40 <= bw <= 140):
-                self._info(T["err_weight"][self.lang]);
-                return
-
             bar_w = float(self.bar_weight.value or 0)
-            if not (1 <= bar_w <= 700):
-                self._info(T["err_bar_weight"][self.lang]);
-                return
-
             reps = int(self.reps.value or 0)
-            if not (1 <= reps <= 30):
-                self._info(T["err_reps"][self.lang]);
+            g_key = self.tr.gender_map.get(self.gender_b.value, "male")
+            ex_key = self.tr.ex_ui_to_key[self.exercise.value]
+            try:
+                res = bar_equivalents(g_key, bw, ex_key, bar_w, reps)
+            except CalcError as e:
+                self._info(self.tr.message(e.key));
                 return
-
-            rep_max = round((bar_w / REPS_TABLE[reps]) * 100, 2)
-
-            g_key = GENDER_MAP[self.lang].get(self.gender_b.value, "male")
-            strength_for_user = get_strength_data(g_key, bw, self.strength_data_all)
-            if not strength_for_user: self._info(T["err_no_strength"][self.lang]); return
-
-            ex_key = EX_UI_TO_KEY[self.lang][self.exercise.value]
-            ex_table = strength_for_user.get(ex_key, {})
-            i_percent = None
-            for pct_str, val in ex_table.items():
-                if float(val) <= rep_max:
-                    i_percent = float(pct_str)
-                else:
-                    break
-            if i_percent is None: self._info(T["err_1rm_map"][self.lang]); return
-
-            distance_data = get_distance_data(g_key, 2000, self.rowing_data)
-            km2_res = None
-            for k, v in distance_data.items():
-                km2_res = k
-                if float(v.get("percent")) < i_percent:
-                    break
-
-            rows = [
-                [T["tbl_1rm"][self.lang], f"{rep_max} кг" if self.lang == "ru" else f"{rep_max} kg"],
-                [T["tbl_2k"][self.lang], km2_res],
-            ]
-
-            # Показать заголовок + таблицу (только сейчас)
-            self.bar_results_holder.children.clear()
-
-            self.bar_tbl_title_label = toga.Label(
-                T["bar_tbl_title"][self.lang],
-                style=Pack(font_size=F_LABEL, color=CLR_ACCENT, padding_top=6, padding_bottom=2)
-            )
-            self.bar_results_holder.add(toga.Box(children=[self.bar_tbl_title_label], style=S_ROW()))
-            self.bar_results_holder.add(make_table(rows, col_flex=[1, 1]))
+            if self.history is not None:
+                self.history.record_bar(self.athlete, g_key, bw, ex_key, bar_w, reps, res)
+            rows = bar_rows(res, self.tr.tbl_1rm, self.tr.tbl_2k, self.tr.kg)
+
+            # Показать заголовок + таблицу: при первом расчёте создаём, дальше только меняем текст
+            with self.ui_transaction():
+                if self.bar_table is None:
+                    self.bar_table = ResultTable(2, col_flex=[1, 1], max_rows=len(rows))
+                    self.bar_tbl_title_label = self.bar_table.title_label
+                    self.bar_results_holder.add(self.bar_table.box)
+                self.bar_table.update(rows, self.tr.bar_tbl_title)
 
         except Exception as e:
             self._info(str(e))
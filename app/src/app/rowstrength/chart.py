@@ -0,0 +1,177 @@
+from collections import OrderedDict
+
+import toga
+from toga.fonts import Font, SYSTEM
+from toga.widgets.canvas import Context, StrokeContext, FillContext, MoveTo, LineTo, Rect, Ellipse, WriteText
+
+from .compiled import FIXED, sec_to_mmss
+
+# -------- График: процент от времени на дистанции --------
+# Три слоя в корневом контексте Canvas:
+#   frame   — рамка области графика (зависит только от размера);
+#   curve   — кривая и оси выбранной (пол, дистанция): геометрия кэшируется, пока не изменится размер;
+#   overlay — точка спортсмена и его эквиваленты в штанге: единственный слой, который
+#             перестраивается при вводе времени/веса.
+MARGIN_LEFT, MARGIN_TOP, MARGIN_RIGHT, MARGIN_BOTTOM = 48, 12, 16, 28
+CURVE_CACHE = 32   # (пол, дистанция) x 2 пола x 11 дистанций помещаются целиком
+CLR_FRAME = "#B8B0D8"
+CLR_CURVE = "#6A5ACD"
+CLR_POINT = "#C0392B"
+CLR_TEXT = "#2B1C7A"
+
+
+def _nice_step(span: float, target: int, steps) -> float:
+    # шаг делений из steps, дающий не больше target делений
+    for s in steps:
+        if span / s <= target:
+            return s
+    return steps[-1]
+
+
+class _Frame:
+    # преобразование (сек, процент) -> пиксели для текущего размера и диапазонов кривой
+    __slots__ = ("x0", "x1", "y0", "y1", "t0", "t1", "p0", "p1")
+
+    def __init__(self, size, t0, t1, p0, p1):
+        w, h = size
+        self.x0, self.x1 = MARGIN_LEFT, max(MARGIN_LEFT + 1, w - MARGIN_RIGHT)
+        self.y0, self.y1 = MARGIN_TOP, max(MARGIN_TOP + 1, h - MARGIN_BOTTOM)
+        self.t0, self.t1 = t0, t1 if t1 > t0 else t0 + 1
+        self.p0, self.p1 = p0, p1 if p1 > p0 else p0 + 1
+
+    def x(self, t: float) -> float:
+        return self.x0 + (t - self.t0) * (self.x1 - self.x0) / (self.t1 - self.t0)
+
+    def y(self, p: float) -> float:
+        return self.y1 - (p - self.p0) * (self.y1 - self.y0) / (self.p1 - self.p0)
+
+
+class ProgressChart:
+    """toga.Canvas с кривой процент/время выбранной дистанции и точкой спортсмена."""
+
+    def __init__(self, style=None, font_size: int = 10):
+        self.canvas = toga.Canvas(style=style, on_resize=self._on_resize)
+        self.font = Font(SYSTEM, font_size)
+        self.frame = Context(canvas=self.canvas)
+        self.curve = Context(canvas=self.canvas)
+        self.overlay = Context(canvas=self.canvas)
+        # слои ставятся списком: append() перерисовывал бы Canvas на каждый объект
+        self.canvas.context.drawing_objects[:] = [self.frame, self.curve, self.overlay]
+        self.size = (0, 0)
+        self._paths = OrderedDict()  # (пол, дистанция) -> (_Frame, объекты слоя curve)
+        self._key = None
+        self._index = None
+        self._point = None           # (сек, процент, [строки подписи])
+        self.stats = {"hits": 0, "misses": 0}
+
+    # ---- Входы ----
+    def show_curve(self, gender: str, distance: int, idx):
+        """Кривая для tables.DistanceIndex; повторный выбор берёт геометрию из кэша."""
+        key = (gender, int(distance))
+        if key == self._key:
+            return
+        self._key, self._index = key, idx
+        self._point = None
+        self._draw_curve()
+        self.overlay.drawing_objects.clear()
+        self.canvas.redraw()
+
+    def show_point(self, seconds: float, percent: float, lines=()):
+        """Точка спортсмена и подписи; перестраивается только слой overlay."""
+        self._point = (seconds, percent, list(lines))
+        self._draw_overlay()
+        self.canvas.redraw()
+
+    def clear_point(self):
+        if self._point is not None:
+            self._point = None
+            self.overlay.drawing_objects.clear()
+            self.canvas.redraw()
+
+    def _on_resize(self, widget, width, height, **kwargs):
+        size = (int(width), int(height))
+        if size == self.size:
+            return
+        self.size = size
+        self._paths.clear()   # геометрия — в пикселях, для нового размера считается заново
+        self._draw_frame()
+        self._draw_curve()
+        self._draw_overlay()
+        self.canvas.redraw()
+
+    # ---- Слои ----
+    def _draw_frame(self):
+        w, h = self.size
+        objs = []
+        if w > MARGIN_LEFT + MARGIN_RIGHT and h > MARGIN_TOP + MARGIN_BOTTOM:
+            frame = StrokeContext(self.canvas, color=CLR_FRAME, line_width=1.0)
+            frame.drawing_objects.append(Rect(MARGIN_LEFT, MARGIN_TOP, w - MARGIN_LEFT - MARGIN_RIGHT,
+                                              h - MARGIN_TOP - MARGIN_BOTTOM))
+            objs.append(frame)
+        self.frame.drawing_objects[:] = objs
+
+    def _draw_curve(self):
+        cached = self._geometry()
+        self.curve.drawing_objects[:] = cached[1] if cached else []
+
+    def _geometry(self):
+        if self._key is None or self._index is None or not len(self._index) or 0 in self.size:
+            return None
+        cached = self._paths.get(self._key)
+        if cached is not None:
+            self._paths.move_to_end(self._key)
+            self.stats["hits"] += 1
+            return cached
+        self.stats["misses"] += 1
+        cached = self._paths[self._key] = self._build_curve(self._index)
+        if len(self._paths) > CURVE_CACHE:
+            self._paths.popitem(last=False)
+        return cached
+
+    def _build_curve(self, idx):
+        times, percents = idx.times, idx.percents
+        p_lo, p_hi = min(percents) / FIXED, max(percents) / FIXED
+        f = _Frame(self.size, times[0], times[-1], (p_lo // 10) * 10, (p_hi // 10 + 1) * 10)
+        # не больше ~1200 точек на кривую: прореживать по пикселям нечего
+        points = [(f.x(t), f.y(p / FIXED)) for t, p in zip(times, percents)]
+
+        line = StrokeContext(self.canvas, color=CLR_CURVE, line_width=2.0)
+        line.drawing_objects.append(MoveTo(*points[0]))
+        line.drawing_objects.extend(LineTo(x, y) for x, y in points[1:])
+
+        ticks = StrokeContext(self.canvas, color=CLR_FRAME, line_width=1.0)
+        labels = FillContext(self.canvas, color=CLR_TEXT)
+        t_step = _nice_step(f.t1 - f.t0, 8, (10, 15, 30, 60, 120, 300, 600))
+        t = -(-f.t0 // t_step) * t_step
+        while t <= f.t1:
+            x = f.x(t)
+            ticks.drawing_objects += [MoveTo(x, f.y1), LineTo(x, f.y1 + 4)]
+            labels.drawing_objects.append(WriteText(sec_to_mmss(int(t)), x - 14, f.y1 + 18, self.font))
+            t += t_step
+        p_step = _nice_step(f.p1 - f.p0, 8, (5, 10, 20, 25, 50))
+        p = f.p0
+        while p <= f.p1:
+            y = f.y(p)
+            ticks.drawing_objects += [MoveTo(f.x0 - 4, y), LineTo(f.x0, y)]
+            labels.drawing_objects.append(WriteText(f"{p:g}%", 4, y + 4, self.font))
+            p += p_step
+        return f, [ticks, line, labels]
+
+    def _draw_overlay(self):
+        cached = self._geometry()
+        if cached is None or self._point is None:
+            self.overlay.drawing_objects.clear()
+            return
+        f = cached[0]
+        seconds, percent, lines = self._point
+        x, y = f.x(seconds), f.y(percent)
+        guide = StrokeContext(self.canvas, color=CLR_POINT, line_width=1.0, line_dash=[4, 4])
+        guide.drawing_objects += [MoveTo(f.x0, y), LineTo(x, y), LineTo(x, f.y1)]
+        dot = FillContext(self.canvas, color=CLR_POINT)
+        dot.drawing_objects.append(Ellipse(x, y, 5, 5))
+        text = FillContext(self.canvas, color=CLR_TEXT)
+        # подпись — в правом верхнем углу, чтобы не закрывать кривую (она идёт вниз слева направо)
+        tx = max(f.x0 + 8, f.x1 - 220)
+        for i, line in enumerate(lines):
+            text.drawing_objects.append(WriteText(line, tx, f.y0 + 16 + 16 * i, self.font))
+        self.overlay.drawing_objects[:] = [guide, dot, text]
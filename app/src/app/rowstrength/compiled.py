@@ -0,0 +1,197 @@
+import sys
+import mmap
+import hashlib
+import struct
+import pathlib
+from array import array
+from importlib import resources
+
+# -------- Формат упакованных таблиц --------
+# Заголовок (с sha256 всего, что за ним), список дистанций-эквивалентов, два каталога блоков и сами блоки.
+# Все числа little-endian, блоки выровнены по 4 байта. Файл пишет только tools.compile_data —
+# после нормализации и проверки, поэтому при чтении данные не проверяются.
+#   rowing-блок (пол, дистанция):  N x uint16 время (сек), N x uint16 процент*100,
+#                                  по N x uint16 на каждую дистанцию-эквивалент (сек)
+#   strength-блок (пол, вес, упр.): N x uint32 процент*100, N x uint32 кг*100
+MAGIC = b"RSTB"
+VERSION = 2
+COMPILED_FILENAME = "data_tables.bin"
+ROWING_FILENAME = "data_for_rowing_app.json"
+STRENGTH_FILENAME = "data_for_strength_app.json"
+
+GENDERS = ("female", "male")
+EXERCISES = ("squat", "bench-press", "deadlift")
+FIXED = 100          # проценты и килограммы храним как int * 100
+MISSING = 0xFFFF     # нет эквивалента для дистанции
+
+_HEADER = struct.Struct("<4sHHHH32s")   # magic, version, n_eq, n_row, n_str, sha256
+_DIR = struct.Struct("<BBHII")
+
+
+def _align4(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def to_fixed(value) -> int:
+    return int(round(float(value) * FIXED))
+
+
+def from_fixed(v: int) -> str:
+    # обратное преобразование в исходную строку: 9980 -> "99.8", 3800 -> "38"
+    if v % FIXED == 0:
+        return str(v // FIXED)
+    return f"{v / FIXED:.2f}".rstrip("0")
+
+
+def mmss_to_sec(s: str) -> int:
+    mm, ss = s.strip().split(":")
+    return int(mm) * 60 + int(ss)
+
+
+def sec_to_mmss(sec: int) -> str:
+    return f"{sec // 60:02d}:{sec % 60:02d}"
+
+
+def meters_of(key: str) -> int:
+    return int("".join(ch for ch in key if ch.isdigit()) or 0)
+
+
+# -------- Запись (build-time, tools.compile_data) --------
+def compile_tables(rowing: dict, strength: dict) -> bytes:
+    """Упаковать проверенные колонки.
+
+    rowing:   {(пол, дистанция): (времена, проценты * 100, {метры: времена либо MISSING})}
+    strength: {(пол, вес, упр.): (проценты * 100, кг * 100)}
+    """
+    eq_dists = sorted({m for _, _, eq in rowing.values() for m in eq})
+    row_blocks = []
+    for g, d in sorted(rowing, key=lambda k: (GENDERS.index(k[0]), k[1])):
+        times, percents, eq = rowing[(g, d)]
+        cols = [array("H", times), array("H", percents)]
+        cols += [array("H", eq.get(m) or [MISSING] * len(times)) for m in eq_dists]
+        row_blocks.append((GENDERS.index(g), 0, d, len(times), cols))
+
+    str_blocks = []
+    for g, bw, ex in sorted(strength, key=lambda k: (GENDERS.index(k[0]), k[1], EXERCISES.index(k[2]))):
+        percents, kilos = strength[(g, bw, ex)]
+        str_blocks.append((GENDERS.index(g), EXERCISES.index(ex), bw, len(percents),
+                           [array("I", percents), array("I", kilos)]))
+
+    head = array("H", eq_dists).tobytes()
+    head += b"\0" * (_align4(_HEADER.size + len(head)) - _HEADER.size - len(head))
+    offset = _HEADER.size + len(head) + _DIR.size * (len(row_blocks) + len(str_blocks))
+
+    directory, payload = bytearray(), bytearray()
+    for a, b, key, count, cols in row_blocks + str_blocks:
+        directory += _DIR.pack(a, b, key, offset + len(payload), count)
+        for col in cols:
+            if sys.byteorder != "little":
+                col = array(col.typecode, col)
+                col.byteswap()
+            payload += col.tobytes()
+        payload += b"\0" * (_align4(len(payload)) - len(payload))
+
+    body = bytes(head + directory + payload)
+    return _HEADER.pack(MAGIC, VERSION, len(eq_dists), len(row_blocks), len(str_blocks),
+                        hashlib.sha256(body).digest()) + body
+
+
+# -------- Чтение (mmap, лениво) --------
+class CompiledTables:
+    def __init__(self, buf, owner=None):
+        self._buf = buf
+        self._owner = owner  # mmap/файл, который нужно закрыть
+        self._mv = memoryview(buf)
+        magic, version, n_eq, n_row, n_str, digest = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Unsupported compiled tables file")
+        self.digest = digest.hex()   # sha256 содержимого: версия данных, из которых собраны другие файлы
+        pos = _HEADER.size
+        self.eq_distances = tuple(self._column(pos, n_eq, "H"))
+        pos = _align4(pos + 2 * n_eq)
+
+        self._rowing = {}
+        for _ in range(n_row):
+            gi, _, dist, off, count = _DIR.unpack_from(buf, pos)
+            self._rowing[(GENDERS[gi], dist)] = (off, count)
+            pos += _DIR.size
+        self._strength = {}
+        for _ in range(n_str):
+            gi, ei, bw, off, count = _DIR.unpack_from(buf, pos)
+            self._strength[(GENDERS[gi], bw, EXERCISES[ei])] = (off, count)
+            pos += _DIR.size
+
+    @classmethod
+    def open(cls, path):
+        f = open(path, "rb")
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
+        return cls(mm, owner=mm)
+
+    def close(self):
+        self._mv.release()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+    def _column(self, offset: int, count: int, fmt: str):
+        size = struct.calcsize(fmt)
+        raw = self._mv[offset:offset + count * size]
+        if sys.byteorder == "little":
+            return raw.cast(fmt)
+        col = array(fmt, raw.tobytes())
+        col.byteswap()
+        return col
+
+    # --- сырые колонки ---
+    def distances(self, gender: str):
+        return sorted(d for g, d in self._rowing if g == gender)
+
+    def bodyweights(self, gender: str):
+        return sorted({bw for g, bw, _ in self._strength if g == gender})
+
+    def rowing_columns(self, gender: str, distance: int):
+        """(times, percents, {meters: times}) либо None, если блока нет."""
+        entry = self._rowing.get((gender, int(distance)))
+        if entry is None:
+            return None
+        off, count = entry
+        times = self._column(off, count, "H")
+        percents = self._column(off + 2 * count, count, "H")
+        eq = {m: self._column(off + 2 * count * (2 + i), count, "H")
+              for i, m in enumerate(self.eq_distances)}
+        return times, percents, eq
+
+    def strength_columns(self, gender: str, bodyweight: int, exercise: str):
+        """(percents, kilos) либо None, если блока нет."""
+        entry = self._strength.get((gender, int(bodyweight), exercise))
+        if entry is None:
+            return None
+        off, count = entry
+        return self._column(off, count, "I"), self._column(off + 4 * count, count, "I")
+
+
+# -------- Поиск файла в пакете --------
+def _package_data_dir():
+    pkg = __package__ or "rowstrength"
+    return resources.files(pkg).joinpath("data")
+
+
+def load_json_from_package(filename: str):
+    import json  # только запасной путь и компиляция: при обычном запуске не нужен
+    with _package_data_dir().joinpath(filename).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def open_package_tables():
+    """Открыть упакованные таблицы из data/; None, если файла нет или он не читается."""
+    try:
+        res = _package_data_dir().joinpath(COMPILED_FILENAME)
+        if isinstance(res, pathlib.Path):
+            return CompiledTables.open(res)
+        return CompiledTables(res.read_bytes())
+    except (OSError, ValueError, struct.error):
+        return None
+
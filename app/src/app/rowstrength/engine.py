@@ -0,0 +1,215 @@
+import re
+import sys
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+from .compiled import FIXED, to_fixed, from_fixed
+from .interp import Interpolator
+from .tables import load_tables
+
+# -------- Константы расчёта --------
+DISTANCES = [500, 1000, 1500, 2000, 2500, 3000, 4000, 5000, 6000, 8000, 10000]
+SHOW_DISTANCES = [500, 1000, 2000, 3000, 5000, 6000, 10000]  # 7 строк
+EXERCISE_KEYS = ["bench-press", "squat", "deadlift"]
+REPS_TABLE = {
+    1: 100, 2: 97, 3: 94, 4: 92, 5: 89, 6: 86, 7: 83, 8: 81, 9: 78, 10: 75,
+    11: 73, 12: 71, 13: 70, 14: 68, 15: 67, 16: 65, 17: 64, 18: 63, 19: 61,
+    20: 60, 21: 59, 22: 58, 23: 57, 24: 56, 25: 55, 26: 54, 27: 53, 28: 52,
+    29: 51, 30: 50
+}
+
+# размер LRU-кэша на каждую функцию расчёта (тренер листает спортсменов туда-обратно)
+CACHE_SIZE = 4096
+
+# Результаты неизменяемы, поэтому из кэша их можно отдавать как есть.
+# percent — строка как в таблице; distances — (метры, секунды, сплит); kilos — (упражнение, вес)
+ErgResult = namedtuple("ErgResult", "percent distances kilos")
+BarResult = namedtuple("BarResult", "rep_max erg_2k")
+
+
+class CalcError(ValueError):
+    # key — ключ сообщения в T (err_weight, err_no_data, ...)
+    def __init__(self, key: str):
+        super().__init__(key)
+        self.key = key
+
+
+# -------- Таблицы и интерполяция (создаются один раз) --------
+_tables = None
+_interp = None
+_lookup = None   # False — файла нет
+_tables_lock = threading.Lock()
+
+
+def get_tables():
+    global _tables
+    with _tables_lock:
+        if _tables is None:
+            _tables = load_tables()
+        return _tables
+
+
+def get_interpolator():
+    global _interp
+    rowing, strength = get_tables()
+    with _tables_lock:
+        if _interp is None:
+            _interp = Interpolator(rowing, strength)
+        return _interp
+
+
+def get_lookup():
+    """Заранее посчитанные результаты эргометра (lookup.ErgLookup) либо None.
+
+    Файл, посчитанный по другому data_tables.bin, не используется: расчёт идёт по таблицам.
+    """
+    global _lookup
+    rowing, _ = get_tables()
+    with _tables_lock:
+        if _lookup is None:
+            from .lookup import open_package_lookup  # lookup импортирует engine
+            _lookup = open_package_lookup() or False
+            if _lookup and _lookup.tables_digest != rowing.digest:
+                print(f"data_lookup.bin was built from other data tables (sha256 {_lookup.tables_digest[:12]}, "
+                      f"tables {str(rowing.digest)[:12]}): ignored", file=sys.stderr)
+                _lookup.close()
+                _lookup = False
+        return _lookup or None
+
+
+# -------- Утилиты --------
+def split_500m(distance_m: int, total_sec: int) -> str:
+    tenths_total = round(total_sec * 10 / (distance_m / 500))
+    mins = tenths_total // 600
+    sec_tenths = tenths_total % 600
+    secs = sec_tenths // 10
+    tenth = sec_tenths % 10
+    return f"{mins:02d}:{secs:02d}.{tenth}/500m"
+
+
+def format_time(total_sec) -> str:
+    mm, hs = divmod(round(total_sec * 100), 6000)
+    return f"{mm:02d}:{hs // 100:02d}.{hs % 100:02d}"
+
+
+def _kilo_str(kilo: float) -> str:
+    # дробные результаты показываем с точностью 0.1 кг
+    return from_fixed(round(kilo * 10) * (FIXED // 10))
+
+
+def get_split_500m(distance_m: int, time_mmss: str) -> str:
+    m = re.fullmatch(r'\s*(\d{1,2}):(\d{2})\s*', time_mmss)
+    return split_500m(distance_m, int(m.group(1)) * 60 + int(m.group(2)))
+
+
+# -------- Расчёты --------
+@lru_cache(maxsize=CACHE_SIZE)
+def erg_equivalents(gender: str, bw: float, distance: int, time_mmss: str, tenths: int = 0) -> ErgResult:
+    if not (40 <= bw <= 140):
+        raise CalcError("err_weight")
+    if not tenths and bw == int(bw):
+        # строки таблицы с целым весом посчитаны заранее (data/data_lookup.bin)
+        lookup = get_lookup()
+        if lookup is not None:
+            res = lookup.erg(gender, int(bw), distance, time_mmss)
+            if res is not None:
+                return res
+    return erg_computed(gender, bw, distance, time_mmss, tenths)
+
+
+def erg_computed(gender: str, bw: float, distance: int, time_mmss: str, tenths: int = 0) -> ErgResult:
+    """Расчёт по таблицам, без готовых результатов и без кэша."""
+    if not (40 <= bw <= 140):
+        raise CalcError("err_weight")
+    rowing, strength = get_tables()
+    idx = rowing.index(gender, distance)
+    if idx is None:
+        raise CalcError("err_no_data")
+    row = idx.offset(time_mmss)
+    if row is None:
+        raise CalcError("err_time_range")
+    if not strength.has(gender, bw):
+        raise CalcError("err_no_strength")
+    if tenths or bw != int(bw):
+        # десятые на последней строке таблицы — за последним узлом: берём значение самой строки
+        t = min(idx.times[row] + tenths / 10, idx.times[-1])
+        return _erg_interpolated(gender, bw, distance, t)
+    percent = idx.percents[row]
+    return ErgResult(from_fixed(percent), erg_distances(idx, row), erg_kilos(strength, gender, bw, percent))
+
+
+def erg_distances(idx, row: int) -> tuple:
+    """(метры, секунды, сплит) по SHOW_DISTANCES для строки таблицы."""
+    distances = []
+    for m in SHOW_DISTANCES:
+        if idx.equivalent_at(row, m) is not None:
+            sec = idx.equivalents[m][row]
+            distances.append((m, sec, split_500m(m, sec)))
+    return tuple(distances)
+
+
+def erg_kilos(strength, gender: str, bw, percent: int) -> tuple:
+    """(упражнение, вес) для процента (* 100) и целого веса тела."""
+    kilos = []
+    for ex_key in EXERCISE_KEYS:
+        kilos.append((ex_key, strength.kilo(gender, bw, ex_key, percent)))
+    return tuple(kilos)
+
+
+def _erg_interpolated(gender: str, bw: float, distance: int, t: float) -> ErgResult:
+    # между строками таблицы (десятые секунды) и между весами тела
+    interp = get_interpolator()
+    point = interp.rowing(gender, distance).at(t)
+    if point is None:
+        raise CalcError("err_time_range")
+    percent, eq = point
+    distances = [(m, eq[m], split_500m(m, eq[m])) for m in SHOW_DISTANCES if m in eq]
+
+    kilos = []
+    for ex_key in EXERCISE_KEYS:
+        kilo = interp.kilo(gender, bw, ex_key, percent)
+        if kilo is None:
+            raise CalcError("err_no_strength")
+        kilos.append((ex_key, _kilo_str(kilo)))
+    return ErgResult(from_fixed(round(percent * FIXED)), tuple(distances), tuple(kilos))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def bar_equivalents(gender: str, bw: float, exercise: str, bar_weight: float, reps: int) -> BarResult:
+    if not (40 <= bw <= 140):
+        raise CalcError("err_weight")
+    if not (1 <= bar_weight <= 700):
+        raise CalcError("err_bar_weight")
+    if not (1 <= reps <= 30):
+        raise CalcError("err_reps")
+
+    rep_max = round((bar_weight / REPS_TABLE[reps]) * 100, 2)
+    rowing, strength = get_tables()
+    if not strength.has(gender, bw):
+        raise CalcError("err_no_strength")
+    if bw != int(bw):
+        interp = get_interpolator()
+        if not interp.has_strength(gender, bw, exercise):
+            raise CalcError("err_no_strength")
+        pct = interp.percent_for_kilo(gender, bw, exercise, rep_max)
+        i_percent = to_fixed(pct) if pct is not None else None
+    else:
+        ex_table = strength.exercise(gender, bw, exercise)
+        i_percent = ex_table.percent_for_kilo(to_fixed(rep_max)) if ex_table else None
+    if i_percent is None:
+        raise CalcError("err_1rm_map")
+
+    idx_2k = rowing.index(gender, 2000)
+    return BarResult(rep_max, idx_2k.time_for_percent(i_percent) if idx_2k else None)
+
+
+# -------- Статистика кэша --------
+def cache_stats() -> dict:
+    """{"erg": {...}, "bar": {...}} с hits/misses/maxsize/currsize."""
+    return {name: fn.cache_info()._asdict() for name, fn in (("erg", erg_equivalents), ("bar", bar_equivalents))}
+
+
+def cache_clear():
+    erg_equivalents.cache_clear()
+    bar_equivalents.cache_clear()
@@ -0,0 +1,304 @@
+import queue
+import sqlite3
+import datetime
+import threading
+import pathlib
+
+from .compiled import mmss_to_sec
+
+# -------- История расчётов (SQLite, WAL) --------
+HISTORY_FILENAME = "history.sqlite3"
+BATCH_MAX = 500       # записей в одной транзакции
+BATCH_LINGER = 0.05   # сек: сколько писатель ждёт следующие записи перед коммитом
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS athletes (
+    id      INTEGER PRIMARY KEY,
+    name    TEXT NOT NULL UNIQUE,
+    gender  TEXT
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id          INTEGER PRIMARY KEY,
+    athlete_id  INTEGER REFERENCES athletes(id),
+    date        TEXT NOT NULL,           -- YYYY-MM-DD
+    kind        TEXT NOT NULL,           -- erg | bar
+    gender      TEXT NOT NULL,
+    bodyweight  REAL NOT NULL,
+    distance    INTEGER,                 -- erg
+    time_sec    REAL,                    -- erg: время с десятыми
+    exercise    TEXT,                    -- bar
+    bar_weight  REAL,                    -- bar
+    reps        INTEGER,                 -- bar
+    percent     TEXT,                    -- erg: процент из таблицы
+    one_rep_max REAL,                    -- bar
+    erg_2k      TEXT                     -- bar: эквивалент на 2 км
+);
+CREATE TABLE IF NOT EXISTS equivalents (
+    session_id  INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    key         TEXT NOT NULL,           -- erg: "2000m" (сек), "bench-press" (кг), ...
+    value       TEXT,
+    PRIMARY KEY (session_id, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_athlete_date ON sessions(athlete_id, date);
+CREATE INDEX IF NOT EXISTS sessions_distance_time ON sessions(distance, time_sec);
+"""
+
+_INSERT_SESSION = ("INSERT INTO sessions (athlete_id, date, kind, gender, bodyweight, distance, time_sec, exercise,"
+                   " bar_weight, reps, percent, one_rep_max, erg_2k) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+_SESSION_COLUMNS = ("s.id, a.name AS athlete, s.date, s.kind, s.gender, s.bodyweight, s.distance, s.time_sec,"
+                    " s.exercise, s.bar_weight, s.reps, s.percent, s.one_rep_max, s.erg_2k")
+_INSERT_EQUIVALENT = "INSERT INTO equivalents (session_id, key, value) VALUES (?, ?, ?)"
+
+_STOP = object()
+
+
+def _eq_value(key: str) -> str:
+    return f"(SELECT CAST(value AS REAL) FROM equivalents WHERE session_id = s.id AND key = '{key}')"
+
+
+def _mmss_sql(col: str) -> str:
+    return f"(CAST(substr({col}, 1, 2) AS INTEGER) * 60 + CAST(substr({col}, 4, 2) AS INTEGER))"
+
+
+# допустимые сортировки session_ids(): имя -> выражения ORDER BY (ключи — только из этого словаря)
+ORDER_BY = {
+    "athlete": ("a.name COLLATE NOCASE",),
+    "date": ("s.date",),
+    "test": ("s.kind", "s.distance", "s.exercise"),
+    "bodyweight": ("s.bodyweight",),
+    "result": ("COALESCE(s.time_sec, s.bar_weight)",),
+    "percent": ("CAST(s.percent AS REAL)",),
+    "erg_2k": (f"COALESCE({_eq_value('2000m')}, {_mmss_sql('s.erg_2k')})",),
+}
+for _ex in ("bench-press", "squat", "deadlift"):
+    ORDER_BY[_ex] = (f"COALESCE({_eq_value(_ex)}, CASE WHEN s.exercise = '{_ex}' THEN s.one_rep_max END)",)
+
+
+def _like_escape(text: str) -> str:
+    """Текст пользователя для LIKE ... ESCAPE '\\': %, _ и \\ ищутся как обычные символы."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _connect(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")   # в WAL это надёжно при сбое приложения
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def _today() -> str:
+    return datetime.date.today().isoformat()
+
+
+class HistoryStore:
+    """Спортсмены, тестовые сессии и рассчитанные эквиваленты.
+
+    Запись — только через очередь: фоновый поток собирает записи в пакеты и пишет одной
+    транзакцией, так что record_*() не трогают диск. Чтение — в вызывающем потоке.
+    """
+
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._readers = []                    # соединения всех потоков-читателей, для close()
+        self._readers_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._error = None
+        self._writer = threading.Thread(target=self._run, name="rowstrength-history", daemon=True)
+        self._writer.start()
+
+    # ---- Запись (любой поток, без ожидания) ----
+    def record_erg(self, athlete, gender: str, bw: float, distance: int, time_mmss: str, tenths: int, result,
+                   date: str = None):
+        """result — engine.ErgResult."""
+        eq = [(f"{m}m", f"{sec:.1f}") for m, sec, _ in result.distances] + list(result.kilos)
+        self._queue.put((athlete, date or _today(), "erg", gender, bw, distance, mmss_to_sec(time_mmss) + tenths / 10,
+                         None, None, None, result.percent, None, None, eq))
+
+    def record_bar(self, athlete, gender: str, bw: float, exercise: str, bar_weight: float, reps: int, result,
+                   date: str = None):
+        """result — engine.BarResult."""
+        self._queue.put((athlete, date or _today(), "bar", gender, bw, None, None, exercise, bar_weight, reps, None,
+                         result.rep_max, result.erg_2k, ()))
+
+    def flush(self, timeout: float = None) -> bool:
+        """Дождаться, пока всё поставленное в очередь будет записано."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout)
+        # threading.local виден только своему потоку: соединения пула закрываются по списку
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        self._local.conn = None
+
+    # ---- Фоновый писатель ----
+    def _run(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = _connect(self.path)
+            conn.executescript(SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            self._error = e
+            self._ready.set()
+            self._drain_forever()
+            return
+        self._ready.set()
+        athlete_ids = {}
+        try:
+            while True:
+                items = [self._queue.get()]
+                # flush()/close() не ждут окончания паузы: пакет закрывается сразу
+                while len(items) < BATCH_MAX and isinstance(items[-1], tuple):
+                    try:
+                        items.append(self._queue.get(timeout=BATCH_LINGER))
+                    except queue.Empty:
+                        break
+                records = [it for it in items if isinstance(it, tuple)]
+                if records:
+                    try:
+                        with conn:
+                            self._write(conn, records, athlete_ids)
+                    except sqlite3.Error as e:
+                        self._error = e
+                        athlete_ids.clear()
+                for it in items:
+                    if isinstance(it, threading.Event):
+                        it.set()
+                if items[-1] is _STOP:
+                    return
+        finally:
+            conn.close()
+
+    def _drain_forever(self):
+        # база недоступна: записи теряются, но flush()/close() не должны зависнуть
+        while True:
+            it = self._queue.get()
+            if isinstance(it, threading.Event):
+                it.set()
+            elif it is _STOP:
+                return
+
+    @staticmethod
+    def _write(conn, records, athlete_ids):
+        for athlete, *row, eq in records:
+            athlete_id = None
+            if athlete:
+                athlete_id = athlete_ids.get(athlete)
+                if athlete_id is None:
+                    conn.execute("INSERT OR IGNORE INTO athletes (name, gender) VALUES (?, ?)", (athlete, row[2]))
+                    athlete_id = athlete_ids[athlete] = conn.execute(
+                        "SELECT id FROM athletes WHERE name = ?", (athlete,)).fetchone()[0]
+            session_id = conn.execute(_INSERT_SESSION, (athlete_id, *row)).lastrowid
+            conn.executemany(_INSERT_EQUIVALENT, [(session_id, k, v) for k, v in eq])
+
+    # ---- Чтение (в вызывающем потоке) ----
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._ready.wait()
+            if self._error is not None:
+                raise self._error
+            conn = self._local.conn = _connect(self.path)
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _dicts(self, sql: str, args=()):
+        cur = self._reader().execute(sql, args)
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur]
+
+    @property
+    def error(self):
+        """Последняя ошибка записи (либо открытия базы) или None."""
+        return self._error
+
+    def athletes(self):
+        return self._dicts("SELECT id, name, gender FROM athletes ORDER BY name")
+
+    def progression(self, athletes=None, start: str = None, end: str = None, kind: str = None,
+                    equivalents: bool = False):
+        """Сессии спортсменов (имена; None — все) за период [start, end] по спортсмену и дате.
+
+        Основные результаты (процент, 1ПМ, 2 км) лежат в самих сессиях, поэтому сезон команды
+        из 40 человек — один проход по индексу (athlete_id, date); полные таблицы эквивалентов
+        (equivalents=True) подгружаются вторым запросом.
+        """
+        where, args = ["s.date BETWEEN ? AND ?"], [start or "0000-00-00", end or "9999-99-99"]
+        if athletes is not None:
+            names = list(athletes)
+            where.append(f"s.athlete_id IN (SELECT id FROM athletes WHERE name IN ({', '.join('?' * len(names))}))")
+            args += names
+        if kind:
+            where.append("s.kind = ?")
+            args.append(kind)
+        where = " AND ".join(where)
+        rows = self._dicts(f"SELECT {_SESSION_COLUMNS} FROM sessions s LEFT JOIN athletes a ON a.id = s.athlete_id"
+                           f" WHERE {where} ORDER BY s.athlete_id, s.date, s.id", args)
+        if equivalents:
+            by_id = {}
+            for r in rows:
+                r["equivalents"] = by_id[r["id"]] = {}
+            for session_id, key, value in self._reader().execute(
+                    "SELECT e.session_id, e.key, e.value FROM sessions s JOIN equivalents e ON e.session_id = s.id"
+                    f" WHERE {where}", args):
+                by_id[session_id][key] = value
+        return rows
+
+    def session_ids(self, text: str = None, order: str = "date", descending: bool = False, flush: bool = True):
+        """id сессий после фильтра (подстрока имени или даты) в порядке сортировки ORDER_BY[order].
+
+        Сортировка и фильтр — в SQL; метод рассчитан на фоновый поток (у каждого потока своё соединение).
+        """
+        if flush:
+            self.flush(1.0)  # только что посчитанное тоже должно попасть в выборку
+        where, args = "", []
+        if text:
+            where = "WHERE a.name LIKE ? ESCAPE '\\' OR s.date LIKE ? ESCAPE '\\'"
+            text = _like_escape(text)
+            args = [f"%{text}%", f"{text}%"]
+        direction = "DESC" if descending else "ASC"
+        order_sql = ", ".join(f"{part} {direction}" for part in ORDER_BY[order])
+        return [r[0] for r in self._reader().execute(
+            f"SELECT s.id FROM sessions s LEFT JOIN athletes a ON a.id = s.athlete_id {where}"
+            f" ORDER BY {order_sql}, s.id {direction}", args)]
+
+    def sessions(self, ids):
+        """Сессии с эквивалентами в порядке ids (страница таблицы)."""
+        ids = list(ids)
+        if not ids:
+            return []
+        marks = ", ".join("?" * len(ids))
+        rows = {r["id"]: r for r in self._dicts(
+            f"SELECT {_SESSION_COLUMNS} FROM sessions s LEFT JOIN athletes a ON a.id = s.athlete_id"
+            f" WHERE s.id IN ({marks})", ids)}
+        for r in rows.values():
+            r["equivalents"] = {}
+        for session_id, key, value in self._reader().execute(
+                f"SELECT session_id, key, value FROM equivalents WHERE session_id IN ({marks})", ids):
+            rows[session_id]["equivalents"][key] = value
+        return [rows[i] for i in ids if i in rows]
+
+    def best_times(self, distance: int, limit: int = 10, start: str = None, end: str = None):
+        """Лучшие времена на дистанции (индекс (distance, time_sec))."""
+        return self._dicts(
+            f"SELECT {_SESSION_COLUMNS} FROM sessions s LEFT JOIN athletes a ON a.id = s.athlete_id"
+            " WHERE s.distance = ? AND s.date BETWEEN ? AND ? ORDER BY s.time_sec LIMIT ?",
+            (int(distance), start or "0000-00-00", end or "9999-99-99", limit))
+
+
+def open_history(data_dir):
+    """HistoryStore в каталоге данных приложения; None, если каталог недоступен."""
+    try:
+        return HistoryStore(pathlib.Path(data_dir) / HISTORY_FILENAME)
+    except (OSError, RuntimeError):
+        return None
@@ -0,0 +1,132 @@
+import struct
+import threading
+
+from .compiled import _package_data_dir
+
+# -------- Локализация: скомпилированные каталоги по языкам --------
+# data/messages.json (источник) -> tools.compile_messages -> data/messages.bin.
+# Каталог языка — плоский кортеж строк в порядке MESSAGE_IDS; читается при первом обращении
+# к языку. Смена языка в приложении — замена одной ссылки на Catalog.
+LANGS = ("en", "de", "fr", "es", "ru")
+LANG_LABEL = {"en": "English", "de": "Deutsch", "fr": "Français", "es": "Español", "ru": "Русский"}
+LANG_BY_LABEL = {v: k for k, v in LANG_LABEL.items()}
+MESSAGES_FILENAME = "messages.bin"
+MESSAGES_SOURCE = "messages.json"
+
+MESSAGE_IDS = (
+    "splash", "title", "mode_erg", "mode_bar", "language", "gender", "female", "male", "weight", "distance",
+    "minutes", "seconds", "centis", "exercise", "bar_weight", "reps", "calc", "mode_chart",
+    # вкладка Команда и отчёт
+    "mode_roster", "athlete", "filter", "sort", "descending", "refresh", "export", "exporting", "export_done",
+    "report_title", "col_date", "col_test", "col_bodyweight", "col_result", "col_percent",
+    # таблицы результатов
+    "erg_tbl1_title", "erg_tbl2_title", "bar_tbl_title", "tbl_1rm", "tbl_2k", "kg",
+    "ex_bench", "ex_squat", "ex_deadlift",
+    # ошибки (ключи CalcError)
+    "err_title", "err_weight", "err_reps", "err_bar_weight", "err_no_data", "err_time_range", "err_no_strength",
+    "err_1rm_map",
+)
+EXERCISE_IDS = {"ex_bench": "bench-press", "ex_squat": "squat", "ex_deadlift": "deadlift"}
+# колонки таблицы команды — в порядке roster.ROSTER_ACCESSORS
+ROSTER_HEADING_IDS = ("athlete", "col_date", "col_test", "col_bodyweight", "col_result", "col_percent", "tbl_2k",
+                      "ex_bench", "ex_squat", "ex_deadlift")
+
+MAGIC = b"RSMS"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHHI")   # magic, version, n_langs, n_msgs, длина списка id
+_LANG = struct.Struct("<2sxxI")      # код языка, смещение секции
+
+
+class Catalog:
+    """Тексты одного языка: tr.calc, tr.message(e.key); обратные словари посчитаны при загрузке."""
+    __slots__ = MESSAGE_IDS + ("lang", "exercise_labels", "ex_ui_to_key", "ex_key_to_label", "gender_labels",
+                               "gender_map", "roster_headings")
+
+    def __init__(self, lang: str, texts):
+        self.lang = lang
+        for name, text in zip(MESSAGE_IDS, texts):
+            setattr(self, name, text)
+        self.exercise_labels = [getattr(self, i) for i in EXERCISE_IDS]
+        self.ex_ui_to_key = {getattr(self, i): key for i, key in EXERCISE_IDS.items()}
+        self.ex_key_to_label = {key: getattr(self, i) for i, key in EXERCISE_IDS.items()}
+        self.gender_labels = [self.female, self.male]
+        self.gender_map = {self.female: "female", self.male: "male"}
+        self.roster_headings = [getattr(self, i) for i in ROSTER_HEADING_IDS]
+
+    def message(self, key: str) -> str:
+        """Текст по имени (например, CalcError.key); неизвестное имя возвращается как есть."""
+        return getattr(self, key, key) if key in MESSAGE_IDS else key
+
+
+# -------- Файл каталогов --------
+# Заголовок, id сообщений через \0 (проверка совместимости с MESSAGE_IDS), каталог языков,
+# секции языков: (n_msgs + 1) x uint32 смещения + строки UTF-8. Little-endian.
+def pack_messages(languages, messages: dict) -> bytes:
+    """messages: {id: {язык: текст}} с полным набором MESSAGE_IDS x languages."""
+    ids = "\0".join(MESSAGE_IDS).encode("ascii")
+    head = _HEADER.pack(MAGIC, VERSION, len(languages), len(MESSAGE_IDS), len(ids)) + ids
+    head += b"\0" * (-len(head) % 4)
+    offset = len(head) + _LANG.size * len(languages)
+    directory, sections = bytearray(), bytearray()
+    for lang in languages:
+        directory += _LANG.pack(lang.encode("ascii"), offset + len(sections))
+        blobs = [messages[m][lang].encode("utf-8") for m in MESSAGE_IDS]
+        ends, pos = [0], 0
+        for b in blobs:
+            pos += len(b)
+            ends.append(pos)
+        sections += struct.pack(f"<{len(ends)}I", *ends) + b"".join(blobs)
+        sections += b"\0" * (-len(sections) % 4)
+    return bytes(head + directory + sections)
+
+
+def unpack_language(buf, lang: str) -> tuple:
+    magic, version, n_langs, n_msgs, ids_len = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Unsupported messages file")
+    pos = _HEADER.size
+    if bytes(buf[pos:pos + ids_len]) != "\0".join(MESSAGE_IDS).encode("ascii"):
+        raise ValueError("Messages file was built for other message ids")
+    pos += ids_len + (-(pos + ids_len) % 4)
+    for _ in range(n_langs):
+        code, offset = _LANG.unpack_from(buf, pos)
+        pos += _LANG.size
+        if code.decode("ascii") == lang:
+            ends = struct.unpack_from(f"<{n_msgs + 1}I", buf, offset)
+            base = offset + 4 * (n_msgs + 1)
+            return tuple(bytes(buf[base + a:base + b]).decode("utf-8") for a, b in zip(ends, ends[1:]))
+    raise KeyError(lang)
+
+
+# -------- Загрузка по требованию --------
+_catalogs = {}
+_buf = None
+_lock = threading.Lock()   # каталог может впервые понадобиться из потока экспорта отчёта
+
+
+def _texts(lang: str) -> tuple:
+    global _buf
+    if _buf is None:
+        try:
+            _buf = _package_data_dir().joinpath(MESSAGES_FILENAME).read_bytes()
+        except OSError:
+            _buf = b""
+    try:
+        return unpack_language(_buf, lang)
+    except (ValueError, KeyError, struct.error):
+        # файла нет или он от другой версии: JSON-источник (только разработка)
+        from .compiled import load_json_from_package
+        messages = load_json_from_package(MESSAGES_SOURCE)["messages"]
+        return tuple(messages[m][lang] for m in MESSAGE_IDS)
+
+
+def catalog(lang: str) -> Catalog:
+    """Каталог языка (неизвестный язык — английский); загружается один раз."""
+    lang = lang if lang in LANGS else "en"
+    cat = _catalogs.get(lang)
+    if cat is None:
+        with _lock:
+            cat = _catalogs.get(lang)
+            if cat is None:
+                cat = _catalogs[lang] = Catalog(lang, _texts(lang))
+    return cat
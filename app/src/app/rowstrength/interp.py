@@ -0,0 +1,116 @@
+import math
+from array import array
+from bisect import bisect_right
+
+from .compiled import MISSING, FIXED
+
+
+# -------- Кусочно-линейная функция --------
+class Segments:
+    # на отрезке i: y = ys[i] + slopes[i] * (x - xs[i]); в узлах значение совпадает с таблицей
+    __slots__ = ("xs", "ys", "slopes")
+
+    def __init__(self, xs, ys):
+        self.xs = array("d", xs)
+        self.ys = array("d", ys)
+        self.slopes = array("d", ((self.ys[i + 1] - self.ys[i]) / (self.xs[i + 1] - self.xs[i])
+                                  for i in range(len(self.xs) - 1)))
+
+    def segment(self, x):
+        """Номер отрезка, содержащего x, либо None вне диапазона таблицы."""
+        if not self.xs or not (self.xs[0] <= x <= self.xs[-1]):
+            return None
+        return bisect_right(self.xs, x) - 1
+
+    def at(self, i: int, x: float) -> float:
+        if i >= len(self.slopes):  # x == последний узел
+            return self.ys[i]
+        return self.ys[i] + self.slopes[i] * (x - self.xs[i])
+
+    def __call__(self, x: float):
+        i = self.segment(x)
+        return None if i is None else self.at(i, x)
+
+
+# -------- Кривая дистанции: время -> процент и эквиваленты --------
+class RowingCurve:
+    __slots__ = ("percent", "equivalents")
+
+    def __init__(self, idx):
+        xs = list(idx.times)
+        self.percent = Segments(xs, [p / FIXED for p in idx.percents])
+        self.equivalents = {m: Segments(xs, list(col)) for m, col in idx.equivalents.items()
+                            if MISSING not in col}
+
+    def at(self, t: float):
+        """(процент, {метры: секунды}) для времени t в секундах (с десятыми) либо None."""
+        i = self.percent.segment(t)
+        if i is None:
+            return None
+        return self.percent.at(i, t), {m: s.at(i, t) for m, s in self.equivalents.items()}
+
+
+class Interpolator:
+    def __init__(self, rowing_table, strength_table):
+        self.rowing_table = rowing_table
+        self.strength_table = strength_table
+        self._curves = {}
+        self._strength = {}
+
+    def rowing(self, gender: str, distance: int):
+        key = (gender, int(distance))
+        try:
+            return self._curves[key]
+        except KeyError:
+            idx = self.rowing_table.index(*key)
+            curve = self._curves[key] = RowingCurve(idx) if idx is not None else None
+            return curve
+
+    def _exercise(self, gender: str, bw: int, exercise: str):
+        key = (gender, bw, exercise)
+        try:
+            return self._strength[key]
+        except KeyError:
+            idx = self.strength_table.exercise(*key)
+            seg = self._strength[key] = (Segments([p / FIXED for p in idx.percents], [k / FIXED for k in idx.kilos])
+                                         if idx is not None else None)
+            return seg
+
+    def _bracket(self, gender: str, bw: float, exercise: str):
+        # соседние целые веса и доля второго
+        lo = math.floor(bw)
+        w = bw - lo
+        s0 = self._exercise(gender, lo, exercise)
+        s1 = self._exercise(gender, lo + 1, exercise) if w else None
+        if s0 is None or (w and s1 is None):
+            return None
+        return s0, s1, w
+
+    def has_strength(self, gender: str, bw: float, exercise: str) -> bool:
+        return self._bracket(gender, bw, exercise) is not None
+
+    def kilo(self, gender: str, bw: float, exercise: str, percent: float):
+        """Вес на штанге для дробного веса тела и процента; None вне таблицы."""
+        br = self._bracket(gender, bw, exercise)
+        if br is None:
+            return None
+        s0, s1, w = br
+        k0 = s0(percent)
+        if k0 is None or not w:
+            return k0
+        k1 = s1(percent)
+        return None if k1 is None else k0 + w * (k1 - k0)
+
+    def percent_for_kilo(self, gender: str, bw: float, exercise: str, kilo: float):
+        """Наибольший табличный процент, вес которого (с учётом дробного веса тела) не превышает kilo."""
+        br = self._bracket(gender, bw, exercise)
+        if br is None:
+            return None
+        s0, s1, w = br
+        xs = s0.xs
+        if w:
+            col = lambda i: s0.ys[i] + w * (s1(xs[i]) - s0.ys[i])
+        else:
+            col = s0.ys.__getitem__
+        i = bisect_right(range(len(xs)), kilo, key=col)
+        return xs[i - 1] if i else None
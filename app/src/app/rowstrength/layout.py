@@ -0,0 +1,315 @@
+import asyncio
+import contextlib
+
+import toga
+from toga.style.pack import Pack
+from toga.style.applicator import TogaApplicator
+from travertino.node import Node
+
+# -------- Транзакции и отложенная раскладка --------
+# Внутри `with transaction():` Widget.refresh() пересчитывает только размер самого виджета
+# (impl.refresh), а корень его дерева раскладки запоминается. На выходе из внешней транзакции
+# каждый корень перекладывается один раз: сначала содержимое окон, затем вложенные корни
+# (вкладки OptionContainer, содержимое ScrollContainer) — если окно их уже не переложило.
+# enable_deferred_layout() делает так же и вне транзакций: корни копятся, а раскладка
+# выполняется одним loop.call_soon за итерацию цикла событий (без запущенного цикла — сразу);
+# flush_layout() — сразу.
+_depth = 0
+_deferred = False
+_scheduled = None    # handle call_soon отложенной раскладки
+_pending = {}        # корень -> None, в порядке первого изменения
+_laid_out = None     # корни, переложенные во время сброса
+_widget_refresh = None
+
+
+def _refresh(self):
+    if (_depth or _deferred) and _laid_out is None:
+        self._impl.refresh()
+        _pending[self.root] = None
+        if not _depth and _scheduled is None:
+            _schedule()
+        return
+    _widget_refresh(self)
+    if _laid_out is not None and self._root is None:
+        _laid_out.add(self)
+
+
+def _install():
+    global _widget_refresh
+    if _widget_refresh is None:
+        _widget_refresh = toga.Widget.refresh
+        toga.Widget.refresh = _refresh
+
+
+def _is_window_content(root) -> bool:
+    window = root.window
+    return window is not None and window.content is root
+
+
+def _flush():
+    global _laid_out
+    # за время транзакции корень мог стать частью другого дерева; без контейнера раскладывать некуда
+    roots = [r for r in dict.fromkeys(r.root for r in _pending) if r._impl.container is not None]
+    _pending.clear()
+    roots.sort(key=lambda r: not _is_window_content(r))
+    _laid_out = set()
+    try:
+        for root in roots:
+            if root not in _laid_out:
+                root.refresh()
+    finally:
+        _laid_out = None
+
+
+def _schedule():
+    global _scheduled
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _flush()   # цикл не запущен (скрипты, тесты) — отложить некуда, раскладка сразу
+        return
+    _scheduled = loop.call_soon(_run_scheduled)
+
+
+def _run_scheduled():
+    global _scheduled
+    _scheduled = None
+    if _pending and not _depth:   # транзакция, открытая через await, разложит сама
+        _flush()
+
+
+@contextlib.contextmanager
+def transaction():
+    """Отложить раскладку до конца блока; вложенные транзакции сливаются с внешней."""
+    global _depth
+    _install()
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        if not _depth and _pending:
+            _flush()
+
+
+def flush_layout():
+    """Разложить всё отложенное сейчас — для кода, которому нужна геометрия виджетов (и внутри транзакции)."""
+    if _pending and _laid_out is None:
+        _flush()
+
+
+def enable_deferred_layout():
+    """refresh() вне транзакций только запоминает корень; одна раскладка за итерацию цикла событий."""
+    global _deferred
+    _install()
+    _deferred = True
+
+
+def disable_deferred_layout():
+    global _deferred, _scheduled
+    _deferred = False
+    if _scheduled is not None:
+        _scheduled.cancel()
+        _scheduled = None
+    flush_layout()
+
+
+# -------- Инкрементальная раскладка Pack --------
+# Pack на каждый refresh пересчитывает всё дерево, а set_bounds обходит каждый виджет.
+# install_incremental() запоминает для узла место, с которым он разложен последний раз, и ведёт флаги:
+#   dirty — узел пересчитывается (изменились его стиль, дети или intrinsic, либо стиль/intrinsic
+#           ребёнка — их читает и раскладка родителя: поля, flex, минимальный размер);
+#   path  — изменилось что-то ниже: дети с флагами перемеряются с прежним местом, и только если
+#           размер какого-то из них изменился, узел пересчитывается целиком.
+# Чистый узел с тем же местом пропускается вместе с поддеревом (размеры и позиции детей остались
+# в их layout). intrinsic сравнивается со снимком на момент раскладки: rehint переписывает его
+# и без изменений. set_bounds доходит только до узлов, чей абсолютный прямоугольник изменился.
+_NO_LAYOUT = {"text_align", "color", "background_color", "visibility"}   # как в Pack._apply
+_epoch = 0          # переустановка сбрасывает всё запомненное
+_touched = set()    # узлы, чей intrinsic переписан после их раскладки
+_pack = {}          # исходные методы, пока установлено
+
+
+class _TrackedIntrinsicSize(Pack.IntrinsicSize):
+    """intrinsic узла, запоминающий запись (узел попадает в _touched)."""
+
+    def __init__(self, node, width, height):
+        self._node = node
+        self._width, self._height = width, height
+
+    @property
+    def width(self):
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        self._width = value
+        _touched.add(self._node)
+
+    @property
+    def height(self):
+        return self._height
+
+    @height.setter
+    def height(self, value):
+        self._height = value
+        _touched.add(self._node)
+
+
+def mark_dirty(node):
+    """Пересчитать узел на следующей раскладке; предки проверят, изменился ли его размер."""
+    node._layout_dirty = True
+    node = node.parent
+    while node is not None:
+        node._layout_path = True
+        node = node.parent
+
+
+def _mark_with_parent(node):
+    mark_dirty(node)
+    if node.parent is not None:
+        mark_dirty(node.parent)
+
+
+def _check_touched():
+    for node in _touched:
+        if (node.intrinsic.width, node.intrinsic.height) != getattr(node, "_layout_intrinsic", None):
+            _mark_with_parent(node)
+    _touched.clear()
+
+
+def _sizes(layout):
+    return layout.content_width, layout.content_height, layout.min_content_width, layout.min_content_height
+
+
+def _inc_layout(self, viewport):
+    if _touched:
+        _check_touched()
+    _pack["layout"](self, viewport)
+
+
+def _relayout(self, node, key):
+    _pack["_layout_node"](self, alloc_width=key[0], alloc_height=key[1], use_all_width=key[2],
+                          use_all_height=key[3])
+    # начало координат детей (в том числе новых) задают сеттеры content_top/left узла,
+    # а их вызывает только пересчёт родителя, который мог не понадобиться
+    layout = node.layout
+    top, left = layout.absolute_content_top, layout.absolute_content_left
+    for child in node.children:
+        child.layout._origin_top = top
+        child.layout._origin_left = left
+    intrinsic = node.intrinsic
+    if type(intrinsic) is not _TrackedIntrinsicSize:
+        intrinsic = node.intrinsic = _TrackedIntrinsicSize(node, intrinsic.width, intrinsic.height)
+    node._layout_intrinsic = (intrinsic.width, intrinsic.height)
+    node._layout_key = key
+    node._layout_dirty = node._layout_path = False
+    node._layout_relaid = True
+
+
+def _inc_layout_node(self, alloc_width, alloc_height, use_all_width, use_all_height):
+    node = self._applicator.node
+    key = (alloc_width, alloc_height, use_all_width, use_all_height, _epoch)
+    if getattr(node, "_layout_dirty", True) or getattr(node, "_layout_key", None) != key:
+        return _relayout(self, node, key)
+    if not getattr(node, "_layout_path", False):
+        return
+    node._layout_path = False
+    for child in node.children:
+        if getattr(child, "_layout_dirty", True) or getattr(child, "_layout_path", False):
+            child_key = getattr(child, "_layout_key", None)
+            if child_key is None or child_key[4] != _epoch:
+                return _relayout(self, node, key)
+            before = _sizes(child.layout)
+            child.style._layout_node(alloc_width=child_key[0], alloc_height=child_key[1],
+                                     use_all_width=child_key[2], use_all_height=child_key[3])
+            if _sizes(child.layout) != before:
+                return _relayout(self, node, key)
+    node._layout_descend = True   # set_bounds: спуститься к перемеренным детям
+
+
+def _inc_apply(self, names):
+    if names - _NO_LAYOUT:
+        node = getattr(self._applicator, "node", None)
+        if node is not None:
+            _mark_with_parent(node)
+    _pack["_apply"](self, names)
+
+
+def _inc_set_bounds(self):
+    node = self.node
+    layout, impl = node.layout, node._impl
+    # масштаб DPI и эпоха — в ключе: те же логические координаты дают другие нативные
+    bounds = (layout.absolute_content_left, layout.absolute_content_top, layout.content_width,
+              layout.content_height, getattr(impl, "dpi_scale", None), _epoch)
+    moved = bounds != getattr(node, "_layout_bounds", None)
+    if moved:
+        impl.set_bounds(*bounds[:4])
+        node._layout_bounds = bounds
+    if moved or getattr(node, "_layout_relaid", False):
+        node._layout_relaid = node._layout_descend = False
+        for child in node.children:
+            child.applicator.set_bounds()
+    elif getattr(node, "_layout_descend", False):
+        # узел не сдвинулся и не пересчитан: прочие дети остались на месте
+        node._layout_descend = False
+        for child in node.children:
+            if getattr(child, "_layout_relaid", False) or getattr(child, "_layout_descend", False):
+                child.applicator.set_bounds()
+
+
+def _inc_add(self, child):
+    _pack["add"](self, child)
+    mark_dirty(self)
+
+
+def _inc_insert(self, index, child):
+    _pack["insert"](self, index, child)
+    mark_dirty(self)
+
+
+def _forget_bounds(node):
+    # снятое с дерева поддерево при повторном добавлении получит set_bounds заново
+    node._layout_bounds = None
+    for child in node.children:
+        _forget_bounds(child)
+
+
+def _inc_remove(self, child):
+    _pack["remove"](self, child)
+    mark_dirty(self)
+    _forget_bounds(child)
+
+
+def _inc_clear(self):
+    children = list(self.children)
+    _pack["clear"](self)
+    mark_dirty(self)
+    for child in children:
+        _forget_bounds(child)
+
+
+_PATCHES = (
+    (Pack, "layout", _inc_layout), (Pack, "_layout_node", _inc_layout_node), (Pack, "_apply", _inc_apply),
+    (TogaApplicator, "set_bounds", _inc_set_bounds),
+    (Node, "add", _inc_add), (Node, "insert", _inc_insert), (Node, "remove", _inc_remove), (Node, "clear", _inc_clear),
+)
+
+
+def install_incremental():
+    """Включить инкрементальную раскладку (до трассировки: tracing оборачивает то, что установлено)."""
+    global _epoch
+    if _pack:
+        return
+    _epoch += 1
+    for cls, name, func in _PATCHES:
+        _pack[name] = getattr(cls, name)
+        setattr(cls, name, func)
+
+
+def uninstall_incremental():
+    for cls, name, _ in _PATCHES:
+        if name in _pack:
+            setattr(cls, name, _pack[name])
+    _pack.clear()
+    _touched.clear()
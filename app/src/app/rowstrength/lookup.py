@@ -0,0 +1,280 @@
+import sys
+import mmap
+import struct
+import pathlib
+from array import array
+
+from .compiled import GENDERS, MISSING, from_fixed, mmss_to_sec, _align4, _package_data_dir
+from .engine import (
+    DISTANCES, SHOW_DISTANCES, EXERCISE_KEYS, CalcError, ErgResult, get_tables, erg_distances, erg_kilos,
+)
+
+# -------- Готовые результаты эргометра (build-time) --------
+# Весь домен calculate_erg без десятых и с целым весом: пол x дистанция x время x вес.
+# Строка (пол, дистанция, время) не зависит от веса, веса в штанге зависят только от (пол, вес, процент),
+# поэтому файл хранит две плотные таблицы вместо полного произведения:
+#   rows:  индекс base(пол, дистанция) + (сек - tmin) -> id процента, по SHOW_DISTANCES (сек, id сплита)
+#   kilos: ((пол * n_bw + вес) * n_pct + id процента) * 3 + упр. -> id строки веса
+# Строки (проценты, сплиты, веса) лежат в пуле один раз; первые n_pct строк — проценты.
+# Все числа little-endian, секции выровнены по 4 байта. В заголовке — sha256 data_tables.bin, из которого
+# посчитан файл: с другими таблицами engine его не использует.
+MAGIC = b"RSLK"
+VERSION = 2
+LOOKUP_FILENAME = "data_lookup.bin"
+BODYWEIGHTS = range(40, 141)   # как проверка веса в engine.erg_equivalents
+
+NO_ROW = 0xFFFF        # такого времени в таблице нет
+NO_STRENGTH = 0xFFFF   # для веса нет силовых таблиц
+KILO_NONE = 0xFFFE     # в таблице упражнения нет процента
+
+_HEADER = struct.Struct("<4sHHHHHI32s")   # magic, version, n_show, n_blocks, n_bw, n_pct, n_strings, sha256 таблиц
+_BLOCK = struct.Struct("<BxHHHI")       # пол, дистанция, tmin, строк, первая строка
+ROW_WIDTH = 1 + 2 * len(SHOW_DISTANCES)
+
+
+def _le(col: array) -> bytes:
+    if sys.byteorder != "little":
+        col = array(col.typecode, col)
+        col.byteswap()
+    return col.tobytes()
+
+
+class _Pool:
+    # значение -> id; тип значения сохраняется первым символом: "s" — строка, "f" — float
+    def __init__(self):
+        self.ids = {}
+        self.items = []
+
+    def id(self, value) -> int:
+        tagged = f"f{value!r}" if isinstance(value, float) else f"s{value}"
+        i = self.ids.get(tagged)
+        if i is None:
+            i = self.ids[tagged] = len(self.items)
+            self.items.append(tagged)
+            if i >= KILO_NONE:
+                raise ValueError("Too many distinct strings for a 16-bit lookup pool")
+        return i
+
+
+def build_lookup() -> bytes:
+    """Упакованные результаты для всех строк таблиц гребли и всех целых весов 40..140 кг."""
+    rowing, strength = get_tables()
+    indexes = [(gi, d, rowing.index(g, d)) for gi, g in enumerate(GENDERS) for d in DISTANCES]
+    indexes = [(gi, d, idx) for gi, d, idx in indexes if idx is not None and len(idx)]
+
+    pool = _Pool()
+    percents = sorted({p for _, _, idx in indexes for p in idx.percents}, reverse=True)
+    pct_ids = {p: pool.id(from_fixed(p)) for p in percents}
+
+    blocks, rows = [], array("H")
+    for gi, d, idx in indexes:
+        tmin, count = idx.times[0], idx.times[-1] - idx.times[0] + 1
+        blocks.append((gi, d, tmin, count, len(rows) // ROW_WIDTH))
+        block = array("H", [NO_ROW] + [MISSING, 0] * len(SHOW_DISTANCES)) * count
+        for row, t in enumerate(idx.times):
+            r = (t - tmin) * ROW_WIDTH
+            block[r] = pct_ids[idx.percents[row]]
+            for m, sec, split in erg_distances(idx, row):
+                i = r + 1 + 2 * SHOW_DISTANCES.index(m)
+                block[i], block[i + 1] = sec, pool.id(split)
+        rows.extend(block)
+
+    kilos = array("H")
+    for g in GENDERS:
+        for bw in BODYWEIGHTS:
+            if not strength.has(g, bw):
+                kilos.extend([NO_STRENGTH] * (len(percents) * len(EXERCISE_KEYS)))
+                continue
+            for p in percents:
+                kilos.extend(KILO_NONE if kilo is None else pool.id(kilo)
+                             for _, kilo in erg_kilos(strength, g, bw, p))
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for s in pool.items:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, len(SHOW_DISTANCES), len(blocks), len(BODYWEIGHTS),
+                                 len(percents), len(pool.items), bytes.fromhex(rowing.digest)))
+    out += _le(array("H", SHOW_DISTANCES)) + _le(array("H", BODYWEIGHTS))
+    out += b"\0" * (_align4(len(out)) - len(out))
+    for block in blocks:
+        out += _BLOCK.pack(*block)
+    out += _le(offsets) + blob
+    out += b"\0" * (_align4(len(out)) - len(out))
+    return bytes(out + _le(rows) + _le(kilos))
+
+
+def compile_package_lookup(out_path=None) -> pathlib.Path:
+    out = pathlib.Path(out_path) if out_path else _package_data_dir() / LOOKUP_FILENAME
+    out.write_bytes(build_lookup())
+    return out
+
+
+# -------- Чтение (mmap) --------
+class ErgLookup:
+    def __init__(self, buf, owner=None):
+        self._owner = owner
+        self._mv = memoryview(buf)
+        magic, version, n_show, n_blocks, n_bw, self._n_pct, n_strings, digest = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Unsupported lookup file")
+        self.tables_digest = digest.hex()
+        pos = _HEADER.size
+        show = tuple(self._column(pos, n_show, "H"))
+        if show != tuple(SHOW_DISTANCES):
+            raise ValueError("Lookup file was built for other distances")
+        pos += 2 * n_show
+        self._bw_index = {bw: i for i, bw in enumerate(self._column(pos, n_bw, "H"))}
+        self._n_bw = n_bw
+        pos = _align4(pos + 2 * n_bw)
+
+        self._blocks = {}
+        n_rows = 0
+        for _ in range(n_blocks):
+            gi, d, tmin, count, base = _BLOCK.unpack_from(buf, pos)
+            self._blocks[(GENDERS[gi], d)] = (gi, tmin, count, base)
+            n_rows = max(n_rows, base + count)
+            pos += _BLOCK.size
+        self._offsets = self._column(pos, n_strings + 1, "I")
+        pos += 4 * (n_strings + 1)
+        self._blob = pos
+        self._strings = [None] * n_strings   # декодируются по первому обращению
+        pos = _align4(pos + self._offsets[-1])
+        self._rows = self._column(pos, n_rows * ROW_WIDTH, "H")
+        pos += 2 * n_rows * ROW_WIDTH
+        self._kilos = self._column(pos, len(GENDERS) * n_bw * self._n_pct * len(EXERCISE_KEYS), "H")
+
+    @classmethod
+    def open(cls, path):
+        f = open(path, "rb")
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
+        return cls(mm, owner=mm)
+
+    def close(self):
+        self._rows = self._kilos = self._offsets = None
+        self._mv.release()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+    def _column(self, offset: int, count: int, fmt: str):
+        raw = self._mv[offset:offset + count * struct.calcsize(fmt)]
+        if sys.byteorder == "little":
+            return raw.cast(fmt)
+        col = array(fmt, raw.tobytes())
+        col.byteswap()
+        return col
+
+    def _str(self, i: int):
+        s = self._strings[i]
+        if s is None:
+            raw = bytes(self._mv[self._blob + self._offsets[i]:self._blob + self._offsets[i + 1]]).decode("utf-8")
+            s = self._strings[i] = float(raw[1:]) if raw[0] == "f" else raw[1:]
+        return s
+
+    def erg(self, gender: str, bw: int, distance: int, time_mmss: str):
+        """ErgResult как у engine.erg_equivalents (десятые = 0, целый вес) либо None, если входа нет в файле."""
+        block = self._blocks.get((gender, distance))
+        bwi = self._bw_index.get(bw)
+        if block is None or bwi is None:
+            return None
+        gi, tmin, count, base = block
+        try:
+            t = mmss_to_sec(time_mmss) - tmin
+        except (ValueError, AttributeError):
+            return None
+        if not 0 <= t < count:
+            return None
+        rows, r = self._rows, (base + t) * ROW_WIDTH
+        pct = rows[r]
+        if pct == NO_ROW:
+            return None
+        k = ((gi * self._n_bw + bwi) * self._n_pct + pct) * len(EXERCISE_KEYS)
+        kilo_ids = self._kilos[k:k + len(EXERCISE_KEYS)]
+        if kilo_ids[0] == NO_STRENGTH:
+            raise CalcError("err_no_strength")
+
+        s = self._str
+        distances = tuple((m, rows[i], s(rows[i + 1])) for m, i in zip(SHOW_DISTANCES, range(r + 1, r + ROW_WIDTH, 2))
+                          if rows[i] != MISSING)
+        kilos = tuple((ex, None if kid == KILO_NONE else s(kid)) for ex, kid in zip(EXERCISE_KEYS, kilo_ids))
+        return ErgResult(s(pct), distances, kilos)
+
+
+def open_package_lookup():
+    """Открыть data/data_lookup.bin; None, если файла нет или он не читается."""
+    try:
+        res = _package_data_dir().joinpath(LOOKUP_FILENAME)
+        if isinstance(res, pathlib.Path):
+            return ErgLookup.open(res)
+        return ErgLookup(res.read_bytes())
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def package_lookup_digest():
+    """sha256 таблиц, из которых собран data/data_lookup.bin; None, если файла нет или он старого формата."""
+    lookup = open_package_lookup()
+    if lookup is None:
+        return None
+    try:
+        return lookup.tables_digest
+    finally:
+        lookup.close()
+
+
+def verify_lookup(lookup: ErgLookup) -> int:
+    """Сверить все входы с engine.erg_computed; возвращает число расхождений."""
+    from .engine import erg_computed
+    rowing, _ = get_tables()
+    mismatches = 0
+    for g in GENDERS:
+        for d in DISTANCES:
+            idx = rowing.index(g, d)
+            if idx is None:
+                continue
+            for row in range(len(idx)):
+                t = idx.time_at(row)
+                for bw in BODYWEIGHTS:
+                    try:
+                        expected = erg_computed(g, float(bw), d, t)
+                    except CalcError as e:
+                        expected = e.key
+                    try:
+                        got = lookup.erg(g, bw, d, t)
+                    except CalcError as e:
+                        got = e.key
+                    if got != expected:
+                        mismatches += 1
+                        if mismatches <= 10:
+                            print(f"mismatch {g}/{d}/{t}/{bw}: {got!r} != {expected!r}", file=sys.stderr)
+    return mismatches
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m rowstrength.lookup",
+                                     description="Precompute every erg result into the packed lookup file.")
+    parser.add_argument("--out", help=f"output file (default: data/{LOOKUP_FILENAME})")
+    parser.add_argument("--verify", action="store_true", help="compare every entry with the table calculation")
+    args = parser.parse_args(argv)
+    out = compile_package_lookup(args.out)
+    print(f"{out} ({out.stat().st_size} bytes)")
+    if args.verify:
+        lookup = ErgLookup.open(out)
+        try:
+            mismatches = verify_lookup(lookup)
+        finally:
+            lookup.close()
+        print(f"{mismatches} mismatches")
+        return 1 if mismatches else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+import os
+import sys
+import zlib
+import time
+import pathlib
+from collections import deque
+from itertools import chain, islice
+
+from .compiled import sec_to_mmss
+from .engine import CalcError, erg_equivalents, bar_equivalents, format_time
+
+# -------- Отчёт команды: PNG-страницы и многостраничный PDF --------
+# Главный процесс считает строки таблиц и раскладывает блоки спортсменов по страницам;
+# страницы рисуются в пуле процессов (PIL), PNG пишет сам рабочий процесс, а PDF
+# дописывается страница за страницей в порядке номеров. В памяти — только страницы «в полёте».
+DPI = 150
+PAGE_SIZE = (1240, 1754)         # A4 при 150 dpi
+MARGIN = 90
+FONT_SIZES = {"title": 34, "head": 28, "text": 24}
+LINE_H = 34                      # строка заголовка таблицы
+ROW_H = 40                       # строка таблицы
+HEAD_H = 56                      # имя спортсмена и входные данные
+TABLE_GAP = 18
+BLOCK_GAP = 36
+IN_FLIGHT = 2                    # страниц на рабочий процесс, отправленных вперёд
+SESSION_CHUNK = 200              # сессий истории за один запрос
+
+CLR_TEXT = (43, 28, 122)
+CLR_ACCENT = (106, 90, 205)
+CLR_GRID = (184, 176, 216)
+CLR_HEAD_BG = (237, 231, 255)
+FONT_FILES = ("arial.ttf", "segoeui.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf")
+
+
+# -------- Строки таблиц (те же, что показывают calculate_erg/calculate_bar) --------
+def erg_distance_rows(res):
+    return [[f"{m} m", format_time(sec), split] for m, sec, split in res.distances]
+
+
+def erg_kilo_rows(res, ex_labels: dict):
+    return [[ex_labels.get(ex_key, ex_key), f"{kilo} kg"] for ex_key, kilo in res.kilos]
+
+
+def bar_rows(res, label_1rm: str, label_2k: str, kg: str = "kg"):
+    rep_max, km2_res = res
+    return [[label_1rm, f"{rep_max} {kg}"], [label_2k, km2_res]]
+
+
+# -------- Блоки спортсменов --------
+# tr — i18n.catalog(lang): подписи таблиц и тексты ошибок на языке отчёта
+def session_entry(session: dict) -> dict:
+    """Входы расчёта из сессии history.HistoryStore."""
+    entry = {k: session.get(k) for k in ("athlete", "date", "gender", "bodyweight")}
+    if session["kind"] == "erg":
+        t = round(session["time_sec"] * 10)
+        entry.update(distance=session["distance"], time=f"{sec_to_mmss(t // 10)}.{t % 10}")
+    else:
+        entry.update(exercise=session["exercise"], bar_weight=session["bar_weight"], reps=session["reps"])
+    return entry
+
+
+def entry_block(entry: dict, tr) -> dict:
+    """Блок отчёта: заголовок и таблицы одного расчёта. entry — поля как у `python -m rowstrength batch` + athlete, date."""
+    from .batch import EXERCISE_ALIASES, _gender, _time
+    head = " — ".join(str(v) for v in (entry.get("athlete") or "—", entry.get("date")) if v)
+    try:
+        g, bw = _gender(str(entry["gender"])), float(entry["bodyweight"])
+        if entry.get("distance"):
+            distance, (mmss, tenths) = int(entry["distance"]), _time(str(entry["time"]))
+            res = erg_equivalents(g, bw, distance, mmss, tenths)
+            info = f"{distance} m  {mmss}.{tenths}  {bw:g} kg  {res.percent}%"
+            tables = [(tr.erg_tbl1_title, erg_distance_rows(res), (1, 1, 1)),
+                      (tr.erg_tbl2_title.format(w=f"{bw:g}"), erg_kilo_rows(res, tr.ex_key_to_label), (1, 1))]
+        else:
+            ex = str(entry["exercise"]).strip()
+            ex = EXERCISE_ALIASES.get(ex.lower(), ex)
+            bar_w, reps = float(entry["bar_weight"]), int(entry["reps"])
+            res = bar_equivalents(g, bw, ex, bar_w, reps)
+            info = f"{tr.ex_key_to_label.get(ex, ex)}  {bar_w:g} × {reps}  {bw:g} kg"
+            tables = [(tr.bar_tbl_title, bar_rows(res, tr.tbl_1rm, tr.tbl_2k, tr.kg), (1, 1))]
+    except CalcError as e:
+        info, tables = tr.message(e.key), []
+    except (KeyError, ValueError, TypeError) as e:
+        info, tables = f"bad input: {e}", []
+    return {"head": head, "info": info, "tables": tables}
+
+
+def block_height(block: dict) -> int:
+    h = HEAD_H + BLOCK_GAP
+    for title, rows, _ in block["tables"]:
+        h += LINE_H * (title.count("\n") + 1) + ROW_H * len(rows) + TABLE_GAP
+    return h
+
+
+def paginate(blocks, page_height: int = PAGE_SIZE[1] - 2 * MARGIN - HEAD_H):
+    """Списки блоков по страницам; блоки читаются по одному (генератор -> генератор)."""
+    page, used = [], 0
+    for block in blocks:
+        h = block_height(block)
+        if page and used + h > page_height:
+            yield page
+            page, used = [], 0
+        page.append(block)
+        used += h
+    if page:
+        yield page
+
+
+# -------- Рисование страницы (в рабочем процессе) --------
+_fonts = {}
+
+
+def _font(kind: str):
+    font = _fonts.get(kind)
+    if font is None:
+        from PIL import ImageFont
+        size = FONT_SIZES[kind]
+        for name in FONT_FILES:
+            try:
+                font = ImageFont.truetype(name, size)
+                break
+            except OSError:
+                continue
+        else:
+            font = ImageFont.load_default(size)
+        _fonts[kind] = font
+    return font
+
+
+def _draw_table(draw, x, y, width, title, rows, weights):
+    for line in title.split("\n"):
+        draw.text((x, y + 4), line, fill=CLR_ACCENT, font=_font("text"))
+        y += LINE_H
+    total = sum(weights)
+    cols = [x]
+    for w in weights:
+        cols.append(cols[-1] + width * w / total)
+    for i, row in enumerate(rows):
+        top = y + i * ROW_H
+        draw.rectangle((x, top, x + width, top + ROW_H), fill=CLR_HEAD_BG if i % 2 == 0 else "white",
+                       outline=CLR_GRID)
+        for c, cell in enumerate(row):
+            draw.text((cols[c] + 10, top + 8), str(cell), fill=CLR_TEXT, font=_font("text"))
+    for cx in cols[1:-1]:
+        draw.line((cx, y, cx, y + ROW_H * len(rows)), fill=CLR_GRID)
+    return y + ROW_H * len(rows) + TABLE_GAP
+
+
+def render_page(job):
+    """(номер, путь PNG | None, (ширина, высота), поток PDF | None) для одной страницы."""
+    from PIL import Image, ImageDraw
+    number, blocks, header, png_path, want_pdf = job
+    im = Image.new("RGB", PAGE_SIZE, "white")
+    draw = ImageDraw.Draw(im)
+    width = PAGE_SIZE[0] - 2 * MARGIN
+    draw.text((MARGIN, MARGIN - 50), f"{header} — {number}", fill=CLR_ACCENT, font=_font("title"))
+    y = MARGIN + HEAD_H
+    for block in blocks:
+        draw.text((MARGIN, y), block["head"], fill=CLR_TEXT, font=_font("head"))
+        draw.text((MARGIN + width // 2, y + 4), block["info"], fill=CLR_TEXT, font=_font("text"))
+        y += HEAD_H
+        for title, rows, weights in block["tables"]:
+            y = _draw_table(draw, MARGIN, y, width, title, rows, weights)
+        y += BLOCK_GAP
+    if png_path:
+        im.save(png_path, "PNG", dpi=(DPI, DPI))
+    # PDF: несжатые RGB-строки + Flate; сжатие — тоже в рабочем процессе
+    stream = zlib.compress(im.tobytes(), 6) if want_pdf else None
+    return number, png_path, im.size, stream
+
+
+# -------- PDF по страницам --------
+class PdfPages:
+    """PDF, в который страницы-изображения дописываются по одной; каталог и дерево страниц — в close()."""
+
+    def __init__(self, path, title: str = None):
+        from PIL import PdfParser
+        self._pp = PdfParser
+        self.path = pathlib.Path(path)
+        self._f = open(self.path, "w+b")
+        self.pdf = PdfParser.PdfParser(f=self._f, mode="w+b")
+        self.pdf.start_writing()
+        self.pdf.write_header()
+        self.pdf.write_comment("RowStrength squad report")
+        # ссылки на каталог и дерево страниц нужны страницам заранее (Parent)
+        self.root_ref = self.pdf.next_object_id(0)
+        self.pdf.pages_ref = self.pdf.next_object_id(0)
+        if title:
+            self.pdf.info["Title"] = title
+
+    def add_page(self, size, stream: bytes):
+        pp, pdf = self._pp, self.pdf
+        w, h = size
+        image = pdf.write_obj(None, stream=stream, Type=pp.PdfName(b"XObject"), Subtype=pp.PdfName(b"Image"),
+                              Width=w, Height=h, ColorSpace=pp.PdfName(b"DeviceRGB"), BitsPerComponent=8,
+                              Filter=pp.PdfName(b"FlateDecode"))
+        pw, ph = w * 72.0 / DPI, h * 72.0 / DPI
+        contents = pdf.write_obj(None, stream=b"q %f 0 0 %f 0 0 cm /image Do Q\n" % (pw, ph))
+        page = pdf.write_page(None, Resources=pp.PdfDict(ProcSet=[pp.PdfName(b"PDF"), pp.PdfName(b"ImageC")],
+                                                         XObject=pp.PdfDict(image=image)),
+                              MediaBox=[0, 0, pw, ph], Contents=contents)
+        pdf.pages.append(page)
+
+    def close(self):
+        pp, pdf = self._pp, self.pdf
+        pdf.write_obj(self.root_ref, Type=pp.PdfName(b"Catalog"), Pages=pdf.pages_ref)
+        pdf.write_obj(pdf.pages_ref, Type=pp.PdfName(b"Pages"), Count=len(pdf.pages), Kids=pdf.pages)
+        pdf.root_ref = self.root_ref
+        pdf.write_xref_and_trailer()
+        pdf.close()
+        self._f.close()
+
+
+# -------- Экспорт --------
+def _pool(workers):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # spawn и в Windows, и в Linux: рабочим процессам не достаётся состояние GUI
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _render_in_pool(jobs, workers: int, done):
+    """Рисовать страницы в пуле; при сбое пула вернуть ещё не нарисованные задания (по порядку)."""
+    from concurrent.futures.process import BrokenProcessPool
+    with _pool(workers) as pool:
+        # окно из IN_FLIGHT * workers страниц: порядок PDF сохраняется, память ограничена
+        window = deque((job, pool.submit(render_page, job)) for job in islice(jobs, IN_FLIGHT * workers))
+        while window:
+            job, future = window[0]
+            try:
+                page = future.result()
+            except (BrokenProcessPool, OSError):
+                pool.shutdown(wait=False, cancel_futures=True)
+                pending = [job for job, _ in window]
+                return chain(pending, jobs)
+            window.popleft()
+            for job in islice(jobs, 1):
+                window.append((job, pool.submit(render_page, job)))
+            done(page)
+    return ()
+
+
+def export_report(blocks, out_dir, name: str = "squad_report", header: str = "RowStrength",
+                  formats=("png", "pdf"), workers: int = None, progress=None) -> dict:
+    """Нарисовать блоки (итерируемые лениво) в out_dir: name-0001.png ... и name.pdf.
+
+    workers=0 — рисовать в этом процессе. progress(страниц_готово) вызывается из этого потока.
+    """
+    out = pathlib.Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    want_png, want_pdf = "png" in formats, "pdf" in formats
+    pdf = PdfPages(out / f"{name}.pdf", title=header) if want_pdf else None
+    jobs = ((n, page, header, str(out / f"{name}-{n:04d}.png") if want_png else None, want_pdf)
+            for n, page in enumerate(paginate(blocks), 1))
+    result = {"pages": 0, "png": [], "pdf": str(pdf.path) if pdf else None}
+
+    def done(page):
+        number, png_path, size, stream = page
+        if pdf is not None:
+            pdf.add_page(size, stream)
+        if png_path:
+            result["png"].append(png_path)
+        result["pages"] = number
+        if progress is not None:
+            progress(number)
+
+    try:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 0:
+            jobs = _render_in_pool(jobs, workers, done)
+        # без пула или после его падения (например, рабочий процесс не запустился) — в этом процессе
+        for job in jobs:
+            done(render_page(job))
+        return result
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+
+def history_blocks(store, ids, tr):
+    """Блоки для сессий истории в порядке ids; сессии читаются кусками."""
+    ids = list(ids)
+    for start in range(0, len(ids), SESSION_CHUNK):
+        for session in store.sessions(ids[start:start + SESSION_CHUNK]):
+            yield entry_block(session_entry(session), tr)
+
+
+def spawned_child() -> bool:
+    """Запуск рабочего процесса пула собранным приложением.
+
+    В сборке briefcase sys.executable — само приложение, а не python.exe: пул запускает его
+    с аргументами "-c <код> --multiprocessing-fork", которые выполняются здесь, как это сделал бы python -c.
+    """
+    argv = sys.argv
+    if "--multiprocessing-fork" not in argv or "-c" not in argv[:-1]:
+        return False
+    exec(argv[argv.index("-c") + 1], {"__name__": "__mp_main__"})
+    return True
+
+
+def main(argv=None):
+    import csv
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m rowstrength report",
+                                     description="Render erg/barbell result sheets for a squad CSV into PNG pages "
+                                                 "and a PDF (columns as for 'batch', plus athlete and date).")
+    parser.add_argument("input", help="input CSV file")
+    parser.add_argument("-o", "--output", default="report", help="output directory (default: report)")
+    parser.add_argument("-n", "--name", default="squad_report", help="file name prefix")
+    parser.add_argument("-l", "--lang", default="en", help="language of the labels (en, de, fr, es, ru)")
+    parser.add_argument("-f", "--format", action="append", choices=["png", "pdf"], help="output format (repeatable)")
+    parser.add_argument("-j", "--workers", type=int, help="render processes (0 = in this process)")
+    args = parser.parse_args(argv)
+
+    from .i18n import catalog
+    tr = catalog(args.lang)
+    started = time.perf_counter()
+    with open(args.input, "r", encoding="utf-8-sig", newline="") as f:
+        blocks = (entry_block(row, tr) for row in csv.DictReader(f))
+        res = export_report(blocks, args.output, args.name, tr.report_title,
+                            tuple(args.format or ("png", "pdf")), args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"{res['pages']} pages in {elapsed:.2f} s -> {res['pdf'] or args.output}", file=sys.stderr)
+    return 0
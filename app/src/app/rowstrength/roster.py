@@ -0,0 +1,188 @@
+import asyncio
+import sys
+from collections import OrderedDict
+
+from toga.sources import Source
+
+from .engine import EXERCISE_KEYS, format_time
+
+# -------- Таблица команды: виртуальный toga.Table поверх постраничного источника --------
+# Атрибуты строки = accessors колонок таблицы; ключи сортировки совпадают с history.ORDER_BY.
+ROSTER_ACCESSORS = ["athlete", "date", "test", "bodyweight", "result", "percent", "erg_2k",
+                    "bench_press", "squat", "deadlift"]
+SORT_KEYS = ["athlete", "date", "test", "bodyweight", "result", "percent", "erg_2k",
+             "bench-press", "squat", "deadlift"]   # по колонкам ROSTER_ACCESSORS
+PAGE_SIZE = 100
+MAX_PAGES = 16   # в памяти — не больше MAX_PAGES * PAGE_SIZE строк
+
+
+class RosterRow:
+    __slots__ = ["key"] + ROSTER_ACCESSORS
+
+    def __init__(self, key, **values):
+        self.key = key
+        for name in ROSTER_ACCESSORS:
+            setattr(self, name, values.get(name))
+
+
+def _kg(value) -> str:
+    return "" if value in (None, "") else f"{value} kg"
+
+
+def _secs(value) -> str:
+    return "" if value in (None, "") else format_time(float(value))
+
+
+def session_row(session: dict, ex_labels: dict) -> RosterRow:
+    """Строка таблицы из сессии history.HistoryStore (с эквивалентами)."""
+    eq = session.get("equivalents") or {}
+    values = dict(athlete=session["athlete"] or "—", date=session["date"], bodyweight=f"{session['bodyweight']:g}")
+    if session["kind"] == "erg":
+        values.update(test=f"{session['distance']} m", result=_secs(session["time_sec"]),
+                      percent=session["percent"], erg_2k=_secs(eq.get("2000m")))
+        for ex in EXERCISE_KEYS:
+            values[ex.replace("-", "_")] = _kg(eq.get(ex))
+    else:
+        ex = session["exercise"]
+        values.update(test=ex_labels.get(ex, ex), result=f"{session['bar_weight']:g} × {session['reps']}",
+                      erg_2k=session["erg_2k"])
+        values[ex.replace("-", "_")] = _kg(session["one_rep_max"])
+    return RosterRow(session["id"], **values)
+
+
+# -------- Поставщики строк --------
+# keys(text, order, descending) -> ключи строк в порядке показа (фоновый поток);
+# rows(keys) -> RosterRow для страницы (пул потоков, только видимое окно).
+class HistoryProvider:
+    def __init__(self, store, ex_labels: dict):
+        self.store = store
+        self.ex_labels = ex_labels
+
+    def keys(self, text, order, descending):
+        return self.store.session_ids(text, order, descending)
+
+    def rows(self, keys):
+        return [session_row(s, self.ex_labels) for s in self.store.sessions(keys)]
+
+
+# -------- Источник для toga.Table --------
+class PagedSource(Source):
+    """Источник данных toga.Table, материализующий строки страницами по запросу.
+
+    Таблица WinForms виртуальная: она спрашивает len() и строки только видимого окна,
+    поэтому в памяти — упорядоченные ключи и несколько последних страниц (LRU).
+    Сортировка и фильтр (reload) и чтение недостающей страницы выполняются в пуле потоков;
+    пока страница читается, таблица показывает пустые строки.
+    """
+
+    def __init__(self, provider=None, page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES):
+        super().__init__()
+        self.provider = provider
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._keys = []
+        self._pages = OrderedDict()
+        self._positions = None
+        self._generation = 0
+        self._loading = set()   # страницы, которые сейчас читаются в пуле потоков
+        self._version = 0       # меняется вместе с ключами: прочитанное до смены не показываем
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __getitem__(self, index: int) -> RosterRow:
+        if index < 0:
+            index += len(self._keys)
+        if not 0 <= index < len(self._keys):
+            raise IndexError(index)
+        page, offset = divmod(index, self.page_size)
+        return self._page(page)[offset]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _page(self, page: int):
+        rows = self._pages.get(page)
+        if rows is not None:
+            self._pages.move_to_end(page)
+            return rows
+        start = page * self.page_size
+        keys = self._keys[start:start + self.page_size]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # без цикла событий (скрипты, бенчмарки) — читаем сразу
+            return self._store(page, keys, self.provider.rows(keys))
+        if page not in self._loading:
+            self._loading.add(page)
+            loop.create_task(self._prefetch(page, keys))
+        return [RosterRow(k) for k in keys]
+
+    async def _prefetch(self, page: int, keys):
+        version = self._version
+        try:
+            rows = await asyncio.get_running_loop().run_in_executor(None, self.provider.rows, keys)
+        except Exception as e:
+            # страница остаётся заглушками; следующее обращение к ней прочитает её снова
+            print(f"roster: page {page} not loaded: {e!r}", file=sys.stderr)
+            return
+        finally:
+            if version == self._version:
+                self._loading.discard(page)
+        if version != self._version:
+            return  # пока читали, сменились порядок строк или подписи
+        self._store(page, keys, rows)
+        self.notify("clear")
+
+    def _store(self, page: int, keys, rows):
+        if len(rows) != len(keys):
+            # строка исчезла из хранилища после сортировки — держим место, чтобы индексы не съехали
+            by_key = {r.key: r for r in rows}
+            rows = [by_key.get(k) or RosterRow(k) for k in keys]
+        self._pages[page] = rows
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return rows
+
+    @property
+    def keys(self):
+        """Ключи строк в порядке показа (копия: источник может смениться, пока её читают)."""
+        return list(self._keys)
+
+    def index(self, row) -> int:
+        if self._positions is None:
+            self._positions = {k: i for i, k in enumerate(self._keys)}
+        try:
+            return self._positions[row.key]
+        except (KeyError, AttributeError):
+            raise ValueError(f"{row!r} is not in the data source") from None
+
+    def set_keys(self, keys):
+        """Заменить содержимое (поток GUI); таблица перечитает только видимое окно."""
+        self._keys = list(keys)
+        self._pages.clear()
+        self._loading.clear()
+        self._version += 1
+        self._positions = None
+        self.notify("clear")
+
+    def invalidate(self):
+        """Сбросить страницы (например, сменились подписи): порядок строк тот же."""
+        self._pages.clear()
+        self._loading.clear()
+        self._version += 1
+        self.notify("clear")
+
+    async def reload(self, text: str = None, order: str = "date", descending: bool = True):
+        """Пересчитать порядок строк в пуле потоков и показать результат, если он ещё актуален."""
+        if self.provider is None:
+            return False
+        self._generation += 1
+        generation = self._generation
+        keys = await asyncio.get_running_loop().run_in_executor(None, self.provider.keys, text or None, order,
+                                                                descending)
+        if generation != self._generation:
+            return False  # пока считали, пользователь уже изменил фильтр или сортировку
+        self.set_keys(keys)
+        return True
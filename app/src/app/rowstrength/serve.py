@@ -0,0 +1,248 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+from bisect import bisect_left
+from urllib.parse import urlsplit, parse_qsl
+
+from .batch import EXERCISE_ALIASES, _gender, _time
+from .engine import CalcError, erg_equivalents, bar_equivalents, format_time, get_tables
+
+# -------- Локальный HTTP/JSON сервис --------
+# GET  /erg?gender=male&bodyweight=80&distance=2000&time=06:30.5
+# GET  /bar?gender=male&bodyweight=80&exercise=squat&bar_weight=100&reps=5
+# POST /erg, /bar — JSON-объект либо массив объектов (пакет; ответ — массив в том же порядке)
+# GET  /metrics — счётчики и гистограммы задержек (формат Prometheus)
+# Соединения keep-alive, запросы можно отправлять конвейером: ответы идут в порядке запросов.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY = 4 * 1024 * 1024
+MAX_BATCH = 10_000
+# границы корзин гистограммы, секунды
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# -------- Запросы к движку --------
+def erg_query(q: dict) -> dict:
+    res = erg_equivalents(_gender(str(q["gender"])), float(q["bodyweight"]), int(q["distance"]),
+                          *_time(str(q["time"])))
+    return {
+        "percent": res.percent,
+        "distances": [{"meters": m, "time": format_time(sec), "split": split} for m, sec, split in res.distances],
+        "kilos": dict(res.kilos),
+    }
+
+
+def bar_query(q: dict) -> dict:
+    ex = str(q["exercise"]).strip()
+    res = bar_equivalents(_gender(str(q["gender"])), float(q["bodyweight"]), EXERCISE_ALIASES.get(ex.lower(), ex),
+                          float(q["bar_weight"]), int(q["reps"]))
+    return {"one_rep_max": res.rep_max, "erg_2k": res.erg_2k}
+
+
+QUERIES = {"/erg": erg_query, "/bar": bar_query}
+PATHS = {"/erg", "/bar", "/metrics", "/health"}
+
+
+def _answer(fn, q) -> dict:
+    # ошибка одного запроса не роняет пакет: она возвращается на его месте
+    try:
+        if not isinstance(q, dict):
+            raise BadRequest("query must be a JSON object")
+        return fn(q)
+    except CalcError as e:
+        return {"error": e.key}
+    except KeyError as e:
+        return {"error": f"missing field {e.args[0]!r}"}
+    except (ValueError, TypeError) as e:
+        return {"error": f"bad input: {e}"}
+
+
+# -------- Метрики --------
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # последняя — +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.latency = {}       # путь -> Histogram (время обработки одного HTTP-запроса)
+        self.requests = {}      # (путь, статус) -> число
+        self.queries = {}       # путь -> число запросов к движку (элементы пакетов считаются по одному)
+        self.connections = 0
+
+    def record(self, path: str, status: int, seconds: float, queries: int):
+        hist = self.latency.get(path)
+        if hist is None:
+            hist = self.latency[path] = Histogram()
+        hist.observe(seconds)
+        key = (path, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if queries:
+            self.queries[path] = self.queries.get(path, 0) + queries
+
+    def render(self) -> str:
+        lines = ["# TYPE rowstrength_requests_total counter"]
+        for (path, status), n in sorted(self.requests.items()):
+            lines.append(f'rowstrength_requests_total{{path="{path}",status="{status}"}} {n}')
+        lines.append("# TYPE rowstrength_queries_total counter")
+        for path, n in sorted(self.queries.items()):
+            lines.append(f'rowstrength_queries_total{{path="{path}"}} {n}')
+        lines.append("# TYPE rowstrength_request_seconds histogram")
+        for path, hist in sorted(self.latency.items()):
+            acc = 0
+            for le, n in zip(BUCKETS + ("+Inf",), hist.counts):
+                acc += n
+                lines.append(f'rowstrength_request_seconds_bucket{{path="{path}",le="{le}"}} {acc}')
+            lines.append(f'rowstrength_request_seconds_sum{{path="{path}"}} {hist.total:.6f}')
+            lines.append(f'rowstrength_request_seconds_count{{path="{path}"}} {hist.count}')
+        lines.append("# TYPE rowstrength_connections_total counter")
+        lines.append(f"rowstrength_connections_total {self.connections}")
+        lines.append("# TYPE rowstrength_uptime_seconds gauge")
+        lines.append(f"rowstrength_uptime_seconds {time.time() - self.started:.1f}")
+        return "\n".join(lines) + "\n"
+
+
+# -------- HTTP --------
+def _response(status: int, body: bytes, content_type: str, keep_alive: bool) -> bytes:
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+def _json_body(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class Service:
+    def __init__(self):
+        self.metrics = Metrics()
+
+    def handle(self, method: str, target: str, body: bytes):
+        """(статус, тело, content-type, число запросов к движку) для одного HTTP-запроса."""
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        if path == "/metrics":
+            return 200, self.metrics.render().encode("utf-8"), "text/plain; version=0.0.4", 0
+        if path == "/health":
+            return 200, b'{"status":"ok"}', "application/json", 0
+        fn = QUERIES.get(path)
+        if fn is None:
+            return 404, _json_body({"error": "not found"}), "application/json", 0
+
+        if method == "GET":
+            return 200, _json_body(_answer(fn, dict(parse_qsl(url.query)))), "application/json", 1
+        if method != "POST":
+            return 405, _json_body({"error": "use GET or POST"}), "application/json", 0
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError as e:
+            return 400, _json_body({"error": f"invalid JSON: {e}"}), "application/json", 0
+        if isinstance(payload, list):
+            if len(payload) > MAX_BATCH:
+                return 413, _json_body({"error": f"batch larger than {MAX_BATCH}"}), "application/json", 0
+            return 200, _json_body([_answer(fn, q) for q in payload]), "application/json", len(payload)
+        return 200, _json_body(_answer(fn, payload)), "application/json", 1
+
+    async def connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.metrics.connections += 1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                started = time.perf_counter()
+                try:
+                    method, target, keep_alive, length = _parse_head(head)
+                except BadRequest as e:
+                    writer.write(_response(400, _json_body({"error": str(e)}), "application/json", False))
+                    return
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, out, ctype, n = self.handle(method, target, body)
+                except Exception as e:  # сервис должен пережить любую ошибку одного запроса
+                    status, out, ctype, n = 500, _json_body({"error": str(e)}), "application/json", 0
+                writer.write(_response(status, out, ctype, keep_alive))
+                path = urlsplit(target).path.rstrip("/") or "/"
+                # неизвестные пути — одной меткой, чтобы число рядов метрик не росло
+                self.metrics.record(path if path in PATHS else "other", status, time.perf_counter() - started, n)
+                if not keep_alive:
+                    return
+                # ответы на конвейерные запросы копятся в буфере; ждём сокет, только если он переполнен
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _parse_head(head: bytes):
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise BadRequest("malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    conn = headers.get("connection", "").lower()
+    keep_alive = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+    length = headers.get("content-length", "0")
+    # int() принял бы и "-5", "+5", "1_000"
+    if not (length.isascii() and length.isdigit()):
+        raise BadRequest("bad Content-Length")
+    length = int(length)
+    if length > MAX_BODY:
+        raise BadRequest(f"Content-Length larger than {MAX_BODY}")
+    return method.upper(), target, keep_alive, length
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, ready=None):
+    get_tables()  # таблицы загружаются один раз, до первого запроса
+    service = Service()
+    server = await asyncio.start_server(service.connection, host, port)
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rowstrength serve",
+                                     description="Serve erg/barbell equivalents as JSON over HTTP on localhost.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default: {DEFAULT_PORT})")
+    args = parser.parse_args(argv)
+
+    def ready(server):
+        addrs = ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+        print(f"RowStrength service listening on {addrs}", file=sys.stderr)
+
+    try:
+        asyncio.run(serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,549 @@
+import contextlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+from toga.platform import get_platform_factory
+from toga.sources import ListSource, TreeSource
+
+# -------- Пакетные изменения источников toga --------
+# ListSource/TreeSource уведомляют слушателей о каждой строке: 50k append — 50k insert и столько же
+# обновлений нативной таблицы. BatchListSource/BatchTreeSource добавляют extend(), replace_all()
+# и `with source.batch():`, после которых слушатель получает одно уведомление на всё изменение:
+#   insert_range(index, items)          — строки вставлены подряд (ListSource)
+#   insert_range(parent, index, items)  — дети parent вставлены подряд (TreeSource, parent=None — корни)
+#   reset()                             — прочее: содержимое нужно перечитать целиком
+# Слушатель без этих методов получает прежние поэлементные события в исходном порядке;
+# изменения (change) одной строки внутри batch() сливаются в одно.
+#
+# add_index(accessor, ...) включает индексы для find(): {значение: [строки в порядке источника]}
+# по каждому accessor и карту строка -> позиция для index()/remove(). Индексы ведутся по тем же
+# уведомлениям (вставка, удаление, очистка, change из Row.__setattr__); позиции после вставки или
+# удаления в середине досчитываются лениво с места изменения.
+#
+# ColumnarListSource хранит значения не в Row (объект и __dict__ на строку), а по колонкам:
+# list либо array ('d' — float, 'q' — int); одинаковые строки (str) в колонке — один объект.
+# Строка — ColumnRow, представление (хранилище, слот), создаваемое при обращении; чтение, запись
+# с уведомлением change и удаление атрибутов — как у Row, в том числе у строки, уже удалённой
+# из источника (значения удалённых строк остаются в колонках до clear()/replace_all()).
+# Отличие одно: представление каждый раз новое, поэтому `s[0] is s[0]` ложно — сравнивать через ==.
+
+
+def _coalesce(events):
+    """Одно событие на пакет (имя, kwargs) либо None, если пакет — только изменения строк."""
+    if all(name == "change" for name, _ in events):
+        return None
+    first = events[0][1]
+    if all(name == "insert" for name, _ in events) and all(
+            kwargs.get("parent") is first.get("parent") and kwargs["index"] == first["index"] + i
+            for i, (_, kwargs) in enumerate(events)):
+        args = dict(index=first["index"], items=[kwargs["item"] for _, kwargs in events])
+        if "parent" in first:
+            args["parent"] = first["parent"]
+        return "insert_range", args
+    return "reset", {}
+
+
+def _deliver(source, events):
+    if all(name == "change" for name, _ in events):
+        # строка, изменённая несколько раз, — одно уведомление
+        events = list({kwargs["item"]: (name, kwargs) for name, kwargs in events}.values())
+    batched = _coalesce(events)
+    for listener in list(source.listeners):
+        method = getattr(listener, batched[0], None) if batched else None
+        if method is not None:
+            method(**batched[1])
+            continue
+        for name, kwargs in events:
+            method = getattr(listener, name, None)
+            if method is not None:
+                method(**kwargs)
+
+
+class _Batched:
+    _batch = None   # буфер событий внутри batch()
+
+    def notify(self, notification: str, **kwargs):
+        if self._batch is not None:
+            self._batch.append((notification, kwargs))
+        else:
+            super().notify(notification, **kwargs)
+
+    def _notify_events(self, events):
+        if not events:
+            return
+        if self._batch is not None:
+            self._batch.extend(events)
+        else:
+            _deliver(self, events)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Копить уведомления до конца блока и разослать одним событием; вложенные блоки сливаются с внешним."""
+        if self._batch is not None:
+            yield self
+            return
+        self._batch = []
+        try:
+            yield self
+        finally:
+            events, self._batch = self._batch, None
+            if events:
+                _deliver(self, events)
+
+
+# -------- Индексы --------
+_MISSING = object()       # у строки нет атрибута: find() её не находит
+_UNHASHABLE = object()    # значение без hash: такой индекс find() не использует
+
+
+def _index_key(row, accessor):
+    value = getattr(row, accessor, _MISSING)
+    try:
+        hash(value)
+    except TypeError:
+        return _UNHASHABLE
+    return value
+
+
+def _criteria(data, accessors) -> dict:
+    # как toga.sources.list_source._find_item: словарь, последовательность по accessors либо первое значение
+    if isinstance(data, Mapping):
+        return dict(data)
+    if hasattr(data, "__iter__") and not isinstance(data, str):
+        return dict(zip(accessors, data))
+    return {accessors[0]: data}
+
+
+class _Indexed:
+    _indexes = None     # accessor -> {значение: [строки по возрастанию позиции]}; None — индексов нет
+    _values = None      # accessor -> {строка: значение, под которым она в индексе}
+    _positions = None   # строка -> позиция
+    _valid = 0          # позиции верны для первых _valid строк
+    _count = 0          # строк учтено в индексах
+
+    def add_index(self, *accessors):
+        """Индексы значений для find() и карта позиций для index()/remove(); без аргументов — только позиции."""
+        rows = self._rows()
+        if self._indexes is None:
+            self._indexes, self._values = {}, {}
+            self._positions, self._valid = {}, 0
+        for accessor in accessors:
+            buckets, values = self._indexes[accessor], self._values[accessor] = {}, {}
+            for row in rows:
+                key = values[row] = _index_key(row, accessor)
+                buckets.setdefault(key, []).append(row)
+        self._count = len(rows)
+
+    def _position(self, row) -> int:
+        position = self._positions.get(row)
+        if position is not None and position < self._valid:
+            return position
+        rows = self._rows()
+        for i in range(self._valid, len(rows)):
+            self._positions[rows[i]] = i
+        self._valid = len(rows)
+        return self._positions[row]
+
+    def notify(self, notification: str, **kwargs):
+        if self._indexes is not None:
+            self._track(notification, kwargs)
+        super().notify(notification, **kwargs)
+
+    def _notify_events(self, events):
+        if self._indexes is not None:
+            for notification, kwargs in events:
+                self._track(notification, kwargs)
+        super()._notify_events(events)
+
+    def _track(self, notification, kwargs):
+        if kwargs.get("parent") is not None:
+            return   # дети узлов TreeSource не индексируются
+        if notification == "insert":
+            self._track_insert(kwargs["index"], kwargs["item"])
+        elif notification == "remove":
+            self._track_remove(kwargs["index"], kwargs["item"])
+        elif notification == "change":
+            self._track_change(kwargs["item"])
+        elif notification == "clear":
+            self._positions, self._valid, self._count = {}, 0, 0
+            for accessor in self._indexes:
+                self._indexes[accessor], self._values[accessor] = {}, {}
+
+    def _track_insert(self, index, row):
+        # ListSource.insert/__delitem__ передают индекс как есть, в том числе отрицательный
+        index = min(max(self._count + index, 0) if index < 0 else index, self._count)
+        append = index == self._count
+        if append and self._valid == self._count:
+            self._positions[row] = index
+            self._valid += 1
+        else:
+            self._valid = min(self._valid, index)
+        self._count += 1
+        for accessor, buckets in self._indexes.items():
+            key = self._values[accessor][row] = _index_key(row, accessor)
+            bucket = buckets.setdefault(key, [])
+            if append:
+                bucket.append(row)
+            else:
+                bucket.insert(bisect_left(bucket, index, key=self._position), row)
+
+    def _track_remove(self, index, row):
+        if index < 0:
+            index += self._count
+        self._positions.pop(row, None)
+        self._valid = min(self._valid, index)
+        self._count -= 1
+        for accessor, buckets in self._indexes.items():
+            key = self._values[accessor].pop(row)
+            bucket = buckets[key]
+            bucket.remove(row)
+            if not bucket:
+                del buckets[key]
+
+    def _track_change(self, row):
+        for accessor, buckets in self._indexes.items():
+            values = self._values[accessor]
+            old = values.get(row, _MISSING)
+            if old is _MISSING and row not in values:
+                return   # строка уже удалена из источника (toga не отвязывает её _source) либо не корень
+            new = _index_key(row, accessor)
+            if old is new or (old is not _UNHASHABLE and new is not _UNHASHABLE and old == new):
+                continue
+            bucket = buckets[old]
+            bucket.remove(row)
+            if not bucket:
+                del buckets[old]
+            values[row] = new
+            bucket = buckets.setdefault(new, [])
+            bucket.insert(bisect_left(bucket, self._position(row), key=self._position), row)
+
+    def index(self, row) -> int:
+        if self._indexes is None:
+            return super().index(row)
+        try:
+            return self._position(row)
+        except (KeyError, TypeError):
+            raise ValueError(f"{row!r} is not in the data source") from None
+
+    def find(self, data, start=None):
+        if not self._indexes:
+            return self._scan(data, start)
+        criteria = _criteria(data, self._accessors)
+        candidates = None
+        for accessor, value in criteria.items():
+            buckets = self._indexes.get(accessor)
+            if buckets is None:
+                continue
+            if _UNHASHABLE in buckets:
+                return self._scan(data, start)
+            try:
+                bucket = buckets.get(value, ())
+            except TypeError:
+                return self._scan(data, start)
+            if candidates is None or len(bucket) < len(candidates):
+                candidates = bucket
+        if candidates is None:
+            return self._scan(data, start)
+        first = 0 if start is None else bisect_right(candidates, self.index(start), key=self._position)
+        for i in range(first, len(candidates)):
+            row = candidates[i]
+            if all(getattr(row, accessor, _MISSING) == value for accessor, value in criteria.items()):
+                return row
+        raise ValueError(self._not_found(data))
+
+    def _scan(self, data, start):
+        return super().find(data, start)
+
+
+class BatchListSource(_Indexed, _Batched, ListSource):
+    """ListSource с extend()/replace_all()/batch() и индексами (add_index)."""
+
+    def _rows(self):
+        return self._data
+
+    def _not_found(self, data):
+        return f"No row matching {data!r} in data"
+
+    def __setitem__(self, index, value):
+        if self._indexes is not None:
+            # toga сообщает о замене как о вставке: старая строка уходит из индексов здесь
+            index = range(len(self._data))[index]
+            self._track_remove(index, self._data[index])
+        super().__setitem__(index, value)
+
+    def remove(self, row):
+        del self[self.index(row)]
+
+    def extend(self, data) -> list:
+        """Добавить строки в конец; слушатель получит один insert_range."""
+        rows = [self._create_row(value) for value in data]
+        index = len(self._data)
+        self._data.extend(rows)
+        self._notify_events([("insert", dict(index=index + i, item=row)) for i, row in enumerate(rows)])
+        return rows
+
+    def replace_all(self, data) -> list:
+        """Заменить всё содержимое; слушатель получит один reset (старый — clear и insert на строку)."""
+        rows = [self._create_row(value) for value in data]
+        self._data = rows
+        self._notify_events([("clear", {})] + [("insert", dict(index=i, item=row)) for i, row in enumerate(rows)])
+        return rows
+
+
+class BatchTreeSource(_Indexed, _Batched, TreeSource):
+    """TreeSource с extend()/replace_all()/batch(); индексы (add_index) — по корням."""
+
+    def _rows(self):
+        return self._roots
+
+    def _not_found(self, data):
+        return f"No root node matching {data!r} in {self}"
+
+    def __setitem__(self, index, data):
+        if self._indexes is None:
+            return super().__setitem__(index, data)
+        # toga сообщает о замене корня как об изменении нового узла
+        index = range(len(self._roots))[index]
+        self._track_remove(index, self._roots[index])
+        super().__setitem__(index, data)
+        self._track_insert(index, self._roots[index])
+
+    def extend(self, data, parent=None) -> list:
+        """Добавить узлы (в формате данных TreeSource) в конец детей parent либо корней."""
+        if parent is None:
+            children = self._roots
+        elif parent._source is not self:
+            raise ValueError(f"{parent} is not managed by this data source")
+        else:
+            if parent._children is None:
+                parent._children = []
+            children = parent._children
+        nodes = self._create_nodes(parent=parent, value=data)
+        index = len(children)
+        children.extend(nodes)
+        self._notify_events([("insert", dict(parent=parent, index=index + i, item=node))
+                             for i, node in enumerate(nodes)])
+        return nodes
+
+    def replace_all(self, data) -> list:
+        """Заменить все корни (с поддеревьями); слушатель получит один reset."""
+        for root in self._roots:
+            root._source = None
+        nodes = self._roots = self._create_nodes(parent=None, value=data)
+        self._notify_events([("clear", {})] + [("insert", dict(parent=None, index=i, item=node))
+                                               for i, node in enumerate(nodes)])
+        return nodes
+
+
+# -------- Колоночное хранение --------
+INTERN_LIMIT = 1 << 16   # больше разных строк в колонке — значения не повторяются, интернирование не нужно
+_INT64 = range(-2 ** 63, 2 ** 63)
+
+
+def _fits(column, value) -> bool:
+    if type(column) is list:
+        return True
+    if column.typecode == "d":
+        return type(value) is float
+    return type(value) is int and value in _INT64
+
+
+class _Columns:
+    """Значения строк по колонкам; строка — номер слота (слоты удалённых строк не переиспользуются)."""
+
+    def __init__(self, source):
+        self.source = source   # кому сообщать об изменениях (как Row._source: и после удаления строки)
+        self.size = 0
+        self.columns = {}
+        self.interned = {}     # колонка -> {str: str}, пока разных строк не больше INTERN_LIMIT
+
+    def put(self, slot: int, name: str, value):
+        column = self.columns.get(name)
+        if column is None:
+            # первая строка решает тип колонки: float/int — array, прочее — list; атрибут, появившийся позже, — list
+            if self.size == 0 and type(value) is float:
+                column = array("d")
+            elif self.size == 0 and type(value) is int and value in _INT64:
+                column = array("q")
+            else:
+                column = [_MISSING] * self.size
+                self.interned[name] = {}
+            self.columns[name] = column
+        elif not _fits(column, value):
+            column = self.columns[name] = list(column)
+            self.interned[name] = {}
+        if type(value) is str:
+            table = self.interned.get(name)
+            if table is not None:
+                value = table.setdefault(value, value)
+                if len(table) > INTERN_LIMIT:
+                    del self.interned[name]
+        if slot == len(column):
+            column.append(value)
+        else:
+            column[slot] = value
+
+    def add(self, items) -> int:
+        slot = self.size
+        for name, value in items:
+            self.put(slot, name, value)
+        self.size += 1
+        for name, column in self.columns.items():
+            if len(column) < self.size:   # у новой строки нет этого атрибута
+                if type(column) is not list:
+                    column = self.columns[name] = list(column)
+                column.append(_MISSING)
+        return slot
+
+
+class ColumnRow:
+    """Строка ColumnarListSource. Создаётся при каждом обращении (`s[0] is s[0]` ложно): сравнивать через ==."""
+
+    __slots__ = ("_store", "_slot")
+
+    def __init__(self, store: _Columns, slot: int):
+        object.__setattr__(self, "_store", store)
+        object.__setattr__(self, "_slot", slot)
+
+    def __getattr__(self, attr):
+        column = self._store.columns.get(attr)
+        value = _MISSING if column is None else column[self._slot]
+        if value is _MISSING:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {attr!r}")
+        return value
+
+    def __setattr__(self, attr, value):
+        self._store.put(self._slot, attr, value)
+        if not attr.startswith("_"):
+            self._store.source.notify("change", item=self)
+
+    def __delattr__(self, attr):
+        getattr(self, attr)   # AttributeError, как у Row
+        self._store.put(self._slot, attr, _MISSING)
+        if not attr.startswith("_"):
+            self._store.source.notify("change", item=self)
+
+    def __eq__(self, other):
+        return type(other) is ColumnRow and other._store is self._store and other._slot == self._slot
+
+    def __hash__(self):
+        return hash((id(self._store), self._slot))
+
+    def __repr__(self):
+        slot = self._slot
+        descriptor = " ".join(f"{name}={column[slot]!r}" for name, column in sorted(self._store.columns.items())
+                              if not name.startswith("_") and column[slot] is not _MISSING)
+        return f"<Row {slot} {descriptor if descriptor else '(no attributes)'}>"
+
+
+class _Rows:
+    """Порядок строк (номера слотов в array) с интерфейсом списка строк, которым пользуется ListSource."""
+
+    __slots__ = ("store", "slots")
+
+    def __init__(self, store: _Columns):
+        self.store = store
+        self.slots = array("q")
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ColumnRow(self.store, slot) for slot in self.slots[index]]
+        return ColumnRow(self.store, self.slots[index])
+
+    def __iter__(self):
+        store = self.store
+        return (ColumnRow(store, slot) for slot in self.slots)
+
+    def __setitem__(self, index, row):
+        self.slots[index] = row._slot
+
+    def __delitem__(self, index):
+        del self.slots[index]
+
+    def insert(self, index, row):
+        self.slots.insert(index, row._slot)
+
+    def extend(self, rows):
+        self.slots.extend(row._slot for row in rows)
+
+    def index(self, row) -> int:
+        if type(row) is not ColumnRow or row._store is not self.store:
+            raise ValueError(f"{row!r} is not in list")
+        return self.slots.index(row._slot)
+
+
+class ColumnarListSource(BatchListSource):
+    """BatchListSource с колоночным хранением значений (для таблиц в сотни тысяч строк)."""
+
+    def __init__(self, accessors, data=None):
+        super().__init__(accessors)
+        self._store = _Columns(self)
+        self._data = _Rows(self._store)
+        if data is not None:
+            self._data.extend(self._create_row(value) for value in data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def _create_row(self, data) -> ColumnRow:
+        if isinstance(data, Mapping):
+            items = data.items()
+        elif hasattr(data, "__iter__") and not isinstance(data, str):
+            items = zip(self._accessors, data)
+        else:
+            items = ((self._accessors[0], data),)
+        return ColumnRow(self._store, self._store.add(items))
+
+    def _new_store(self):
+        # прежние строки (ColumnRow) держат старое хранилище: читаются и, как Row, сообщают об изменениях
+        self._store = _Columns(self)
+        self._data = _Rows(self._store)
+
+    def clear(self):
+        self._new_store()
+        self.notify("clear")
+
+    def replace_all(self, data) -> list:
+        self._new_store()
+        rows = [self._create_row(value) for value in data]
+        self._data.extend(rows)
+        self._notify_events([("clear", {})] + [("insert", dict(index=i, item=row)) for i, row in enumerate(rows)])
+        return rows
+
+    def _scan(self, data, start):
+        # перебор по колонкам без объектов строк
+        columns = []
+        for name, value in _criteria(data, self._accessors).items():
+            column = self._store.columns.get(name)
+            if column is None:
+                raise ValueError(self._not_found(data))
+            columns.append((column, value))
+        slots = self._data.slots
+        for i in range(0 if start is None else self._data.index(start) + 1, len(slots)):
+            slot = slots[i]
+            if all(column[slot] == value for column, value in columns):
+                return ColumnRow(self._store, slot)
+        raise ValueError(self._not_found(data))
+
+# -------- Нативные таблицы --------
+# Table бэкенда на любое событие источника перечитывает его длину (update_data): диапазон — один вызов.
+def _insert_range(self, index, items, parent=None):
+    self.update_data()
+
+
+def _reset(self):
+    self.update_data()
+
+
+def install_range_listeners(factory=None):
+    """Научить Table (и DetailedList) бэкенда insert_range/reset, если у них этого нет."""
+    factory = factory or get_platform_factory()
+    for name in ("Table", "DetailedList"):
+        cls = getattr(factory, name, None)
+        if cls is not None and hasattr(cls, "update_data") and not hasattr(cls, "insert_range"):
+            cls.insert_range = _insert_range
+            cls.reset = _reset
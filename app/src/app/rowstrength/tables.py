@@ -0,0 +1,141 @@
+from bisect import bisect_right
+
+from .compiled import EXERCISES, MISSING, CompiledTables, from_fixed, mmss_to_sec, sec_to_mmss, open_package_tables
+
+
+def _two(n: int) -> str:
+    return f"{n:02d}"
+
+
+# -------- Индекс одной дистанции (пол, дистанция) --------
+class DistanceIndex:
+    __slots__ = ("times", "percents", "equivalents", "minutes", "seconds_for_minute", "_offsets", "_neg_percents")
+
+    def __init__(self, times, percents, equivalents):
+        self.times = times                # секунды по возрастанию
+        self.percents = percents          # процент * 100, не возрастает
+        self.equivalents = equivalents    # {метры: секунды либо MISSING}
+        self._offsets = {t: i for i, t in enumerate(times)}
+        self._neg_percents = [-p for p in percents]  # по возрастанию, для bisect
+
+        mins = {}
+        for t in times:
+            mins.setdefault(t // 60, []).append(t % 60)
+        self.minutes = [_two(m) for m in sorted(mins)]
+        self.seconds_for_minute = {_two(m): [_two(s) for s in sorted(ss)] for m, ss in mins.items()}
+
+    def __len__(self):
+        return len(self.times)
+
+    def offset(self, time_mmss: str):
+        """Номер строки для "MM:SS" либо None."""
+        try:
+            return self._offsets.get(mmss_to_sec(time_mmss))
+        except (ValueError, AttributeError):
+            return None
+
+    def time_at(self, i: int) -> str:
+        return sec_to_mmss(self.times[i])
+
+    def equivalent_at(self, i: int, meters: int):
+        col = self.equivalents.get(meters)
+        if col is None or col[i] == MISSING:
+            return None
+        return sec_to_mmss(col[i])
+
+    def time_for_percent(self, percent: int):
+        """Первое (самое быстрое) время с процентом ниже заданного; последнее, если такого нет."""
+        if not self.times:
+            return None
+        i = bisect_right(self._neg_percents, -percent)
+        return self.time_at(min(i, len(self.times) - 1))
+
+
+# -------- Таблица одного упражнения (пол, вес, упражнение) --------
+class ExerciseIndex:
+    __slots__ = ("percents", "kilos", "_offsets")
+
+    def __init__(self, percents, kilos):
+        self.percents = percents    # процент * 100 по возрастанию
+        self.kilos = kilos          # кг * 100, не убывает
+        self._offsets = {p: i for i, p in enumerate(percents)}
+
+    def __len__(self):
+        return len(self.percents)
+
+    def kilo(self, percent: int):
+        """Вес (кг * 100) для процента (* 100) либо None."""
+        i = self._offsets.get(percent)
+        return None if i is None else self.kilos[i]
+
+    def percent_for_kilo(self, kilo: int):
+        """Наибольший процент (* 100), вес которого не превышает kilo (* 100); None, если таких нет."""
+        i = bisect_right(self.kilos, kilo)
+        return self.percents[i - 1] if i else None
+
+
+# -------- Таблицы целиком --------
+class RowingTable:
+    def __init__(self, columns):
+        # columns(gender, distance) -> (times, percents, {meters: times}) | None
+        self._columns = columns
+        self._indexes = {}
+        self.digest = None   # sha256 data_tables.bin, из которого собраны колонки
+
+    @classmethod
+    def from_compiled(cls, tables):
+        table = cls(tables.rowing_columns)
+        table.digest = tables.digest
+        return table
+
+    def index(self, gender: str, distance: int):
+        """DistanceIndex для (пол, дистанция); строится один раз. None, если данных нет."""
+        key = (gender, int(distance))
+        try:
+            return self._indexes[key]
+        except KeyError:
+            cols = self._columns(*key)
+            idx = self._indexes[key] = DistanceIndex(*cols) if cols else None
+            return idx
+
+
+class StrengthTable:
+    def __init__(self, columns):
+        # columns(gender, bodyweight, exercise) -> (percents, kilos) | None
+        self._columns = columns
+        self._indexes = {}
+        self.digest = None   # sha256 data_tables.bin, из которого собраны колонки
+
+    @classmethod
+    def from_compiled(cls, tables):
+        table = cls(tables.strength_columns)
+        table.digest = tables.digest
+        return table
+
+    def exercise(self, gender: str, bw, exercise: str):
+        """ExerciseIndex для (пол, вес, упражнение); вес округляется вниз, как ключи исходного JSON."""
+        key = (gender, int(bw), exercise)
+        try:
+            return self._indexes[key]
+        except KeyError:
+            cols = self._columns(*key)
+            idx = self._indexes[key] = ExerciseIndex(*cols) if cols else None
+            return idx
+
+    def has(self, gender: str, bw) -> bool:
+        return any(self.exercise(gender, bw, ex) is not None for ex in EXERCISES)
+
+    def kilo(self, gender: str, bw, exercise: str, percent: int):
+        """Вес строкой в формате таблицы ("23.5") либо None."""
+        idx = self.exercise(gender, bw, exercise)
+        v = idx.kilo(percent) if idx is not None else None
+        return None if v is None else from_fixed(v)
+
+
+def load_tables():
+    # упакованные таблицы (mmap, лениво); без файла — те же таблицы, собранные из JSON в памяти
+    tables = open_package_tables()
+    if tables is None:
+        from .tools.compile_data import compile_package_json
+        tables = CompiledTables(compile_package_json())
+    return RowingTable.from_compiled(tables), StrengthTable.from_compiled(tables)
@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+import threading
+
+# точка отсчёта — импорт пакета (как можно ближе к старту процесса)
+T0 = time.perf_counter()
+
+
+class PhaseTimer:
+    """Отметки фаз запуска: (имя, секунды от T0)."""
+
+    def __init__(self, t0: float = T0):
+        self.t0 = t0
+        self.phases = []
+
+    def mark(self, name: str) -> float:
+        t = time.perf_counter() - self.t0
+        self.phases.append((name, t))
+        return t
+
+    def get(self, name: str):
+        return next((t for n, t in self.phases if n == name), None)
+
+    def report(self) -> str:
+        lines, prev = [], 0.0
+        for name, t in self.phases:
+            lines.append(f"{name:<16} {t * 1000:9.1f} ms  (+{(t - prev) * 1000:.1f})")
+            prev = t
+        return "\n".join(lines)
+
+    def report_if_enabled(self, env: str = "ROWSTRENGTH_STARTUP_TIMING"):
+        if os.environ.get(env):
+            print(self.report(), file=sys.stderr)
+
+
+# -------- Время импортов (аналог python -X importtime) --------
+# В упакованном RowStrength.exe флаги интерпретатора не передать, поэтому профиль
+# включается переменной окружения и собирается хуком в sys.meta_path.
+class _TimedLoader:
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        prof = self._profiler
+        if threading.get_ident() != prof._thread:  # фоновые потоки не считаем: стек общий
+            return self._loader.exec_module(module)
+        prof._stack.append(0.0)  # сюда дети складывают своё суммарное время
+        t = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            cum = time.perf_counter() - t
+            children = prof._stack.pop()
+            if prof._stack:
+                prof._stack[-1] += cum
+            prof.records.append((self._name, cum - children, cum, len(prof._stack)))
+
+
+class ImportProfiler:
+    """Собственное и суммарное время исполнения каждого импортированного модуля."""
+
+    def __init__(self):
+        self.records = []   # (модуль, своё, суммарное, глубина) в порядке завершения
+        self._stack = []
+        self._busy = False
+        self._thread = threading.get_ident()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path=None, target=None):
+        if self._busy:
+            return None
+        self._busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._busy = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, name)
+        return spec
+
+    def report(self, top: int = 0) -> str:
+        """Дерево как у -X importtime (мкс); top > 0 — только самые долгие по суммарному времени."""
+        if top:
+            rows = sorted(self.records, key=lambda r: r[2], reverse=True)[:top]
+            lines = [f"{'self [us]':>10} | {'cumulative':>10} | module"]
+            lines += [f"{s * 1e6:10.0f} | {c * 1e6:10.0f} | {name}" for name, s, c, _ in rows]
+        else:
+            lines = [f"import time: {'self [us]':>9} | {'cumulative':>10} | imported package"]
+            lines += [f"import time: {s * 1e6:9.0f} | {c * 1e6:10.0f} | {'  ' * depth}{name}"
+                      for name, s, c, depth in self.records]
+        total = sum(c for _, _, c, depth in self.records if depth == 0)
+        lines.append(f"{len(self.records)} modules, {total * 1000:.1f} ms")
+        return "\n".join(lines)
+
+
+_import_profiler = None
+
+
+def start_import_profile(env: str = "ROWSTRENGTH_IMPORT_TIMING"):
+    """Включить профиль импортов, если задана переменная окружения (значение — top N, "1" — всё дерево)."""
+    global _import_profiler
+    if os.environ.get(env) and _import_profiler is None:
+        _import_profiler = ImportProfiler().install()
+    return _import_profiler
+
+
+def report_imports_if_enabled(env: str = "ROWSTRENGTH_IMPORT_TIMING"):
+    if _import_profiler is None:
+        return
+    value = os.environ.get(env, "")
+    top = int(value) if value.isdigit() and value != "1" else 0
+    print(_import_profiler.report(top), file=sys.stderr)
@@ -0,0 +1,253 @@
+import sys
+import pathlib
+
+from ..compiled import (
+    GENDERS, EXERCISES, FIXED, MISSING, COMPILED_FILENAME, ROWING_FILENAME, STRENGTH_FILENAME,
+    to_fixed, from_fixed, meters_of, mmss_to_sec, sec_to_mmss, compile_tables, load_json_from_package,
+    _package_data_dir, CompiledTables,
+)
+
+# -------- Компилятор таблиц данных (offline) --------
+# JSON -> нормализованные колонки -> проверки -> data/data_tables.bin (+ sha256 в заголовке).
+# Нормализация: время "M:SS"/"MM:SS" -> секунды, "500m"/"500 m" -> метры, проценты и кг -> int * 100.
+# Ошибки (файл не пишется): дубликаты ключей с разными значениями, нарушение монотонности,
+#   значения вне uint16/uint32. Предупреждения: пропуски строк, неполное покрытие весов/упражнений,
+#   проценты гребли без строки в силовой таблице.
+# Рантайм (tables.py, engine.py) читает только результат и сам ничего не проверяет.
+BODYWEIGHTS = range(40, 141)      # как проверка веса в engine
+DISTANCES = (500, 1000, 1500, 2000, 2500, 3000, 4000, 5000, 6000, 8000, 10000)
+PLACEHOLDER_KILO = to_fixed(1)    # "1" кг в силовой таблице — заглушка, см. _fix_placeholders
+UINT16 = 0xFFFF
+
+
+class Report:
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+        self.fixes = []
+
+    def error(self, msg: str):
+        self.errors.append(msg)
+
+    def warn(self, msg: str):
+        self.warnings.append(msg)
+
+    def print(self, out=sys.stderr, limit: int = 20):
+        for title, items in (("error", self.errors), ("warning", self.warnings), ("fixed", self.fixes)):
+            for msg in items[:limit]:
+                print(f"{title}: {msg}", file=out)
+            if len(items) > limit:
+                print(f"{title}: ... and {len(items) - limit} more", file=out)
+
+
+# -------- Нормализация --------
+def _unique(items, what: str, report: Report) -> list:
+    # [(ключ, значение)] с нормализованными ключами -> по возрастанию ключа без дубликатов
+    out = {}
+    for key, value in items:
+        if key in out and out[key] != value:
+            report.error(f"{what}: duplicate key {key} with different values")
+        out[key] = value
+    return sorted(out.items())
+
+
+def normalise_rowing(raw: dict, report: Report) -> dict:
+    """{(пол, дистанция): (времена, проценты * 100, {метры: времена либо MISSING})}."""
+    out = {}
+    for g in GENDERS:
+        for dist_key, dist_data in (raw.get(g) or {}).items():
+            what = f"rowing {g}/{dist_key}"
+            rows = []
+            for t, row in dist_data.items():
+                try:
+                    eq = {meters_of(k): mmss_to_sec(v) for k, v in row.items() if k != "percent" and v}
+                    rows.append((mmss_to_sec(t), (to_fixed(row["percent"]), tuple(sorted(eq.items())))))
+                except (KeyError, ValueError, TypeError, AttributeError) as e:
+                    report.error(f"{what}: bad row {t!r}: {e}")
+            rows = _unique(rows, what, report)
+            if not rows:
+                continue
+            times = [t for t, _ in rows]
+            eq = {}
+            for i, (_, (_, cells)) in enumerate(rows):
+                for m, sec in cells:
+                    eq.setdefault(m, [MISSING] * len(rows))[i] = sec
+            out[(g, int(dist_key))] = (times, [p for _, (p, _) in rows], eq)
+    return out
+
+
+def normalise_strength(raw: dict, report: Report) -> dict:
+    """{(пол, вес, упр.): (проценты * 100, кг * 100)}."""
+    out = {}
+    for g in GENDERS:
+        for bw_key, by_ex in (raw.get(g) or {}).items():
+            for ex, table in (by_ex or {}).items():
+                what = f"strength {g}/{bw_key}/{ex}"
+                if ex not in EXERCISES:
+                    report.error(f"{what}: unknown exercise")
+                    continue
+                try:
+                    rows = _unique(((to_fixed(p), to_fixed(k)) for p, k in table.items()), what, report)
+                except (ValueError, TypeError) as e:
+                    report.error(f"{what}: {e}")
+                    continue
+                if rows:
+                    out[(g, int(bw_key), ex)] = ([p for p, _ in rows], [k for _, k in rows])
+    return out
+
+
+def _fix_placeholders(strength: dict, report: Report):
+    # "1" кг — заглушка в исходных таблицах; раньше её заменял расчёт (среднее с весом при 1%)
+    for key, (percents, kilos) in strength.items():
+        for i, kilo in enumerate(kilos):
+            if kilo == PLACEHOLDER_KILO and FIXED in percents:
+                kilos[i] = to_fixed(round((1 + kilos[percents.index(FIXED)] / FIXED) / 2, 2))
+                report.fixes.append(f"strength {'/'.join(map(str, key))}: placeholder 1 kg at "
+                                    f"{from_fixed(percents[i])}% -> {from_fixed(kilos[i])} kg")
+
+
+# -------- Проверки --------
+def _first_break(values, strict: bool, decreasing: bool):
+    for i in range(1, len(values)):
+        a, b = values[i - 1], values[i]
+        if decreasing:
+            a, b = b, a
+        if a > b or (strict and a == b):
+            return i
+    return None
+
+
+def validate(rowing: dict, strength: dict, report: Report):
+    for (g, d), (times, percents, eq) in rowing.items():
+        what = f"rowing {g}/{d}"
+        if times[-1] > UINT16 - 1 or max(percents) > UINT16 - 1:
+            report.error(f"{what}: value does not fit 16 bits")
+        i = _first_break(percents, strict=False, decreasing=True)
+        if i is not None:
+            report.error(f"{what}: percent increases with time at {sec_to_mmss(times[i])}")
+        for m, col in eq.items():
+            present = [(t, v) for t, v in zip(times, col) if v != MISSING]
+            i = _first_break([v for _, v in present], strict=False, decreasing=False)
+            if i is not None:
+                report.error(f"{what}: {m}m equivalent decreases at {sec_to_mmss(present[i][0])}")
+            if len(present) < len(times):
+                report.warn(f"{what}: {len(times) - len(present)} rows without a {m}m equivalent")
+        gaps = [(a, b) for a, b in zip(times, times[1:]) if b - a > 1]
+        if gaps:
+            report.warn(f"{what}: {len(gaps)} gaps in time, first {sec_to_mmss(gaps[0][0])}-"
+                        f"{sec_to_mmss(gaps[0][1])}")
+    for g in GENDERS:
+        missing = [d for d in DISTANCES if (g, d) not in rowing]
+        if missing:
+            report.warn(f"rowing {g}: no table for {', '.join(map(str, missing))} m")
+
+    for key, (percents, kilos) in strength.items():
+        what = f"strength {'/'.join(map(str, key))}"
+        i = _first_break(percents, strict=True, decreasing=False)
+        if i is not None:
+            report.error(f"{what}: percent not increasing at row {i}")
+        i = _first_break(kilos, strict=False, decreasing=False)
+        if i is not None:
+            report.error(f"{what}: kilo decreases at {from_fixed(percents[i])}%")
+        gaps = [(a, b) for a, b in zip(percents, percents[1:]) if b - a > FIXED]
+        if gaps:
+            report.warn(f"{what}: {len(gaps)} gaps in percent, first {from_fixed(gaps[0][0])}-"
+                        f"{from_fixed(gaps[0][1])}%")
+    for g in GENDERS:
+        for bw in BODYWEIGHTS:
+            missing = [ex for ex in EXERCISES if (g, bw, ex) not in strength]
+            if missing:
+                report.warn(f"strength {g}/{bw}: no table for {', '.join(missing)}")
+
+    # engine.erg_kilos ищет процент гребли в силовой таблице точно
+    rowing_percents = {p for _, percents, _ in rowing.values() for p in percents}
+    uncovered = {key: len(rowing_percents.difference(percents)) for key, (percents, _) in strength.items()}
+    uncovered = {key: n for key, n in uncovered.items() if n}
+    if uncovered:
+        key, n = next(iter(uncovered.items()))
+        report.warn(f"strength: {len(uncovered)} tables miss rowing percents, e.g. {'/'.join(map(str, key))} "
+                    f"misses {n}")
+
+
+def compile_data(rowing_raw: dict, strength_raw: dict):
+    """(упакованные таблицы либо None при ошибках, Report)."""
+    report = Report()
+    rowing = normalise_rowing(rowing_raw, report)
+    strength = normalise_strength(strength_raw, report)
+    _fix_placeholders(strength, report)
+    validate(rowing, strength, report)
+    return (None if report.errors else compile_tables(rowing, strength)), report
+
+
+def compile_package_json() -> bytes:
+    """Таблицы из JSON пакета в памяти (запасной путь, если data_tables.bin нет)."""
+    data, report = compile_data(load_json_from_package(ROWING_FILENAME), load_json_from_package(STRENGTH_FILENAME))
+    if data is None:
+        raise ValueError(f"Invalid data tables: {report.errors[0]}")
+    return data
+
+
+def main(argv=None):
+    import json
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m rowstrength.tools.compile_data",
+                                     description="Normalise and validate the JSON data tables and compile them "
+                                                 "into the packed runtime file.")
+    parser.add_argument("--rowing", help=f"rowing JSON (default: data/{ROWING_FILENAME})")
+    parser.add_argument("--strength", help=f"strength JSON (default: data/{STRENGTH_FILENAME})")
+    parser.add_argument("--out", help=f"output file (default: data/{COMPILED_FILENAME})")
+    parser.add_argument("--check", action="store_true", help="only check that the output file is up to date")
+    parser.add_argument("--strict", action="store_true", help="treat warnings as errors")
+    parser.add_argument("--lookup", action="store_true", help="also rebuild data/data_lookup.bin")
+    args = parser.parse_args(argv)
+    if args.lookup and args.out:
+        parser.error("--lookup is built from the package tables: do not combine it with --out")
+
+    def load(path, name):
+        if path is None:
+            return load_json_from_package(name)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    data, report = compile_data(load(args.rowing, ROWING_FILENAME), load(args.strength, STRENGTH_FILENAME))
+    report.print()
+    if data is None or (args.strict and report.warnings):
+        print(f"{len(report.errors)} errors, {len(report.warnings)} warnings: not written", file=sys.stderr)
+        return 1
+    digest = CompiledTables(data).digest
+    out = pathlib.Path(args.out) if args.out else _package_data_dir() / COMPILED_FILENAME
+    if args.check:
+        try:
+            current = CompiledTables(out.read_bytes()).digest
+        except (OSError, ValueError):
+            current = None   # нет файла либо он старого формата
+        print(f"{out}: {'up to date' if current == digest else 'stale'} (sha256 {digest})")
+        lookup_ok = args.out is not None or _check_lookup(digest)
+        return 0 if current == digest and lookup_ok else 1
+    out.write_bytes(data)
+    print(f"{out} ({len(data)} bytes, sha256 {digest})")
+    if args.lookup:
+        from ..lookup import compile_package_lookup
+        lookup = compile_package_lookup()
+        print(f"{lookup} ({lookup.stat().st_size} bytes)")
+    elif args.out is None:
+        _check_lookup(digest)
+    return 0
+
+
+def _check_lookup(digest: str) -> bool:
+    # data_lookup.bin посчитан по таблицам пакета; с другими таблицами engine его не использует
+    from ..lookup import LOOKUP_FILENAME, package_lookup_digest
+    path = _package_data_dir() / LOOKUP_FILENAME
+    if not path.exists():
+        return True   # файл необязателен: engine считает по таблицам
+    built_from = package_lookup_digest()
+    if built_from == digest:
+        print(f"{path}: up to date")
+        return True
+    print(f"{path}: stale (built from {built_from or 'an older format'}), rebuild with --lookup", file=sys.stderr)
+    return False
+
+
+if __name__ == "__main__":
+    sys.exit(main())
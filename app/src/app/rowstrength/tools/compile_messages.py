@@ -0,0 +1,81 @@
+import re
+import sys
+import json
+import pathlib
+
+from ..compiled import _package_data_dir, load_json_from_package
+from ..i18n import (
+    LANGS, LANG_LABEL, MESSAGE_IDS, EXERCISE_IDS, MESSAGES_FILENAME, MESSAGES_SOURCE, pack_messages, unpack_language,
+)
+
+# -------- Компилятор каталогов локализации (offline) --------
+# data/messages.json -> проверки -> data/messages.bin.
+# Ошибки: нет сообщения или перевода, лишние id, разные {плейсхолдеры} в переводах,
+# совпадающие подписи там, где по ним строятся обратные словари (пол, упражнения, языки).
+_PLACEHOLDER = re.compile(r"{(\w*)}")
+
+
+def validate(source: dict) -> list:
+    errors = []
+    languages, messages = source.get("languages") or {}, source.get("messages") or {}
+    if dict(languages) != LANG_LABEL:
+        errors.append(f"languages must be {LANG_LABEL}")
+    for m in sorted(set(messages) - set(MESSAGE_IDS)):
+        errors.append(f"{m}: not in i18n.MESSAGE_IDS")
+    for m in MESSAGE_IDS:
+        texts = messages.get(m)
+        if texts is None:
+            errors.append(f"{m}: missing")
+            continue
+        missing = [lang for lang in LANGS if not isinstance(texts.get(lang), str)]
+        if missing:
+            errors.append(f"{m}: no text for {', '.join(missing)}")
+            continue
+        placeholders = {lang: sorted(_PLACEHOLDER.findall(texts[lang])) for lang in LANGS}
+        if len({tuple(p) for p in placeholders.values()}) > 1:
+            errors.append(f"{m}: placeholders differ between languages {placeholders}")
+    if errors:
+        return errors
+    for lang in LANGS:
+        for what, ids in (("gender", ("female", "male")), ("exercise", tuple(EXERCISE_IDS))):
+            labels = [messages[i][lang] for i in ids]
+            if len(set(labels)) != len(labels):
+                errors.append(f"{lang}: {what} labels are not unique: {labels}")
+    return errors
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m rowstrength.tools.compile_messages",
+                                     description="Validate data/messages.json and compile it into the per-language "
+                                                 "catalog file.")
+    parser.add_argument("--source", help=f"messages JSON (default: data/{MESSAGES_SOURCE})")
+    parser.add_argument("--out", help=f"output file (default: data/{MESSAGES_FILENAME})")
+    parser.add_argument("--check", action="store_true", help="only check that the output file is up to date")
+    args = parser.parse_args(argv)
+
+    if args.source:
+        with open(args.source, "r", encoding="utf-8") as f:
+            source = json.load(f)
+    else:
+        source = load_json_from_package(MESSAGES_SOURCE)
+    errors = validate(source)
+    for msg in errors:
+        print(f"error: {msg}", file=sys.stderr)
+    if errors:
+        return 1
+    data = pack_messages(LANGS, source["messages"])
+    assert all(unpack_language(data, lang) == tuple(source["messages"][m][lang] for m in MESSAGE_IDS)
+               for lang in LANGS)
+    out = pathlib.Path(args.out) if args.out else _package_data_dir() / MESSAGES_FILENAME
+    if args.check:
+        current = out.read_bytes() if out.exists() else None
+        print(f"{out}: {'up to date' if current == data else 'stale'}")
+        return 0 if current == data else 1
+    out.write_bytes(data)
+    print(f"{out} ({len(data)} bytes, {len(LANGS)} languages x {len(MESSAGE_IDS)} messages)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
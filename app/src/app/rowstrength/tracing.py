@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import functools
+import threading
+from collections import deque
+
+# -------- Трассировка обработчиков и раскладки --------
+# Спаны (имя, категория, начало, длительность, поток, args) пишутся в кольцевой буфер последних N событий.
+# install() оборачивает обработчики событий toga (toga.handlers.wrapped_handler), Pack.layout
+# и TogaApplicator.set_bounds корня дерева раскладки; вложенность видна по времени.
+# Экспорт — Chrome trace event JSON (chrome://tracing, ui.perfetto.dev).
+# В приложении: ROWSTRENGTH_TRACE=trace.json — запись при выходе и сводка в stderr.
+CAPACITY = 50_000
+
+
+class Tracer:
+    """Кольцевой буфер спанов; время — perf_counter_ns от создания трассировщика."""
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.events = deque(maxlen=capacity)
+        self.t0 = time.perf_counter_ns()
+
+    def add(self, name: str, cat: str, start_ns: int, end_ns: int, args=None):
+        self.events.append((name, cat, start_ns, end_ns - start_ns, threading.get_ident(), args))
+
+    def span(self, name: str, cat: str = "app", **args):
+        """with tracer.span("export"): ... — спан вокруг произвольного блока."""
+        return _Span(self, name, cat, args or None)
+
+    def clear(self):
+        self.events.clear()
+
+    def summary(self) -> dict:
+        """{имя: (число, всего мс, p50 мс, максимум мс)} по событиям в буфере."""
+        by_name = {}
+        for name, _, _, dur, _, _ in self.events:
+            by_name.setdefault(name, []).append(dur)
+        out = {}
+        for name, durs in by_name.items():
+            durs.sort()
+            out[name] = (len(durs), sum(durs) / 1e6, durs[len(durs) // 2] / 1e6, durs[-1] / 1e6)
+        return out
+
+    def report(self) -> str:
+        rows = sorted(self.summary().items(), key=lambda kv: kv[1][1], reverse=True)
+        lines = [f"{'span':<44} {'count':>6} {'total ms':>10} {'p50 ms':>9} {'max ms':>9}"]
+        lines += [f"{name:<44} {n:>6} {total:10.2f} {p50:9.3f} {peak:9.3f}" for name, (n, total, p50, peak) in rows]
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict:
+        pid = os.getpid()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "RowStrength"}}]
+        for tid in {e[4] for e in self.events}:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": names.get(tid, str(tid))}})
+        for name, cat, start, dur, tid, args in self.events:
+            event = {"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": (start - self.t0) / 1000, "dur": dur / 1000}
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer, self.name, self.cat, self.args = tracer, name, cat, args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add(self.name, self.cat, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+# -------- Обёртки toga --------
+_tracer = None
+_originals = {}    # имя -> исходная функция (и "traced_wrapped_handler" — замена)
+
+
+def _traced(handler, tracer: Tracer):
+    from toga.handlers import NativeHandler
+    if not callable(handler) or isinstance(handler, NativeHandler):
+        return handler
+    name = getattr(handler, "__qualname__", None) or type(handler).__name__
+    add, clock = tracer.add, time.perf_counter_ns
+
+    # toga сам решает, как звать обработчик (корутина, генератор, функция) — обёртка сохраняет вид
+    if asyncio.iscoroutinefunction(handler):
+        async def traced(interface, *args, **kwargs):
+            start = clock()
+            try:
+                return await handler(interface, *args, **kwargs)
+            finally:
+                add(name, "handler", start, clock(), {"widget": type(interface).__name__})
+    else:
+        def traced(interface, *args, **kwargs):
+            start = clock()
+            try:
+                return handler(interface, *args, **kwargs)
+            finally:
+                add(name, "handler", start, clock(), {"widget": type(interface).__name__})
+    return functools.wraps(handler)(traced)
+
+
+def _replace_name(name: str, old, new):
+    for module in list(sys.modules.values()):
+        if getattr(module, name, None) is old:
+            setattr(module, name, new)
+
+
+def install(tracer: Tracer = None) -> Tracer:
+    """Включить трассировку; обработчики, назначенные до вызова, не оборачиваются."""
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+    import toga.handlers
+    from toga.style.pack import Pack
+    from toga.style.applicator import TogaApplicator
+    tracer = _tracer = tracer or Tracer()
+    add, clock = tracer.add, time.perf_counter_ns
+
+    wrapped_handler = _originals["wrapped_handler"] = toga.handlers.wrapped_handler
+    layout = _originals["layout"] = Pack.layout
+    set_bounds = _originals["set_bounds"] = TogaApplicator.set_bounds
+
+    def traced_wrapped_handler(interface, handler, cleanup=None):
+        return wrapped_handler(interface, _traced(handler, tracer), cleanup)
+
+    def traced_layout(self, viewport):
+        start = clock()
+        try:
+            return layout(self, viewport)
+        finally:
+            add("Pack.layout", "layout", start, clock(), {"root": type(self._applicator.node).__name__})
+
+    def traced_set_bounds(self):
+        if self.node._root is not None:
+            return set_bounds(self)    # дочерние узлы — внутри спана своего корня
+        start = clock()
+        try:
+            return set_bounds(self)
+        finally:
+            add("TogaApplicator.set_bounds", "layout", start, clock(), {"root": type(self.node).__name__})
+
+    # виджеты импортируют wrapped_handler по имени — заменяем его во всех загруженных модулях toga
+    # (модули, загруженные позже, возьмут замену из toga.handlers)
+    _originals["traced_wrapped_handler"] = traced_wrapped_handler
+    _replace_name("wrapped_handler", wrapped_handler, traced_wrapped_handler)
+    Pack.layout = traced_layout
+    TogaApplicator.set_bounds = traced_set_bounds
+    return tracer
+
+
+def uninstall():
+    global _tracer
+    if _tracer is None:
+        return
+    from toga.style.pack import Pack
+    from toga.style.applicator import TogaApplicator
+    _replace_name("wrapped_handler", _originals["traced_wrapped_handler"], _originals["wrapped_handler"])
+    Pack.layout = _originals["layout"]
+    TogaApplicator.set_bounds = _originals["set_bounds"]
+    _tracer = None
+
+
+def current():
+    return _tracer
+
+
+def start_if_enabled(env: str = "ROWSTRENGTH_TRACE"):
+    """Включить трассировку, если задана переменная окружения (значение — путь к trace JSON)."""
+    return install() if os.environ.get(env) else None
+
+
+def write_if_enabled(env: str = "ROWSTRENGTH_TRACE"):
+    path = os.environ.get(env)
+    if _tracer is None or not path:
+        return
+    _tracer.write(path)
+    print(_tracer.report(), file=sys.stderr)
+    print(f"trace: {path} ({len(_tracer.events)} events)", file=sys.stderr)
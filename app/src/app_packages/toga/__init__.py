@@ -22,6 +22,11 @@ __all__ = list(toga_core_imports.keys())
 
 
 def __getattr__(name):
+    if name == "__version__":
+        # __name__ is "toga" in this file, but the distribution name is "toga-core".
+        # Resolved on first use; reading installer metadata slows down app start-up.
+        value = globals()["__version__"] = _package_version(__file__, "toga-core")
+        return value
     try:
         module_name = toga_core_imports[name]
     except KeyError:
@@ -45,6 +50,3 @@ class NotImplementedWarning(RuntimeWarning):
             stacklevel=2,
         )
 
-
-# __name__ is "toga" in this file, but the distribution name is "toga-core".
-__version__ = _package_version(__file__, "toga-core")
@@ -5,7 +5,6 @@ import importlib.metadata
 import signal
 import sys
 import warnings
-import webbrowser
 from collections.abc import Coroutine, Iterator
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Protocol
@@ -787,6 +786,8 @@ class App:
         will be disabled.
         """
         if self.home_page is not None:
+            import webbrowser
+
             webbrowser.open(self.home_page)
 
     ######################################################################
@@ -8,7 +8,6 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 import toga
-from toga import dialogs
 from toga.window import MainWindow, Window
 
 if TYPE_CHECKING:
@@ -294,6 +293,9 @@ class DocumentSet(Sequence[Document], Mapping[Path, Document]):
                     # proceed with opening a new document.
                     return
 
+        # Dialogs are imported on first use to keep them out of app start-up.
+        from toga import dialogs
+
         self._open_dialog = dialogs.OpenFileDialog(
             self.app.formal_name,
             file_types=(
@@ -481,6 +483,8 @@ class DocumentWindow(MainWindow):
             document type doesn't define a :meth:`~toga.Document.write` method.
         """
         if self.doc._writable():
+            from toga import dialogs
+
             suggested_path = (
                 self.doc.path if self.doc.path else f"Untitled.{self.doc.extensions[0]}"
             )
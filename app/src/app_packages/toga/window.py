@@ -7,17 +7,16 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Any, Protocol, TypeVar
 
 import toga
-from toga import dialogs
 from toga.command import CommandSet
 from toga.constants import WindowState
 from toga.handlers import AsyncResult, wrapped_handler
-from toga.images import Image
 from toga.platform import get_platform_factory
 from toga.types import Position, Size
 
 if TYPE_CHECKING:
+    from toga import dialogs
     from toga.app import App
-    from toga.images import ImageT
+    from toga.images import Image, ImageT
     from toga.screens import Screen
     from toga.types import PositionT, SizeT
     from toga.widgets.base import Widget
@@ -581,7 +580,7 @@ class Window:
     # Window capabilities
     ######################################################################
 
-    def as_image(self, format: type[ImageT] = Image) -> ImageT:
+    def as_image(self, format: type[ImageT] | None = None) -> ImageT:
         """Render the current contents of the window as an image.
 
         :param format: Format to provide. Defaults to :class:`~toga.images.Image`; also
@@ -590,7 +589,11 @@ class Window:
             </reference/plugins/image_formats>`.
         :returns: An image containing the window content, in the format requested.
         """
-        return Image(self._impl.get_image_data()).as_format(format)
+        # Images (and dialogs, below) are imported on first use to keep them out of
+        # app start-up.
+        from toga.images import Image
+
+        return Image(self._impl.get_image_data()).as_format(format or Image)
 
     async def dialog(
         self, dialog: dialogs.Dialog[dialogs.DialogResultT]
@@ -676,6 +679,8 @@ class Window:
             self,
             on_result=wrapped_handler(self, on_result) if on_result else None,
         )
+        from toga import dialogs
+
         result.dialog = dialogs.InfoDialog(title, message)
         result.dialog._impl.show(self, result)
         return result
@@ -700,6 +705,8 @@ class Window:
             self,
             on_result=wrapped_handler(self, on_result) if on_result else None,
         )
+        from toga import dialogs
+
         result.dialog = dialogs.QuestionDialog(title, message)
         result.dialog._impl.show(self, result)
         return result
@@ -724,6 +731,8 @@ class Window:
             self,
             on_result=wrapped_handler(self, on_result) if on_result else None,
         )
+        from toga import dialogs
+
         result.dialog = dialogs.ConfirmDialog(title, message)
         result.dialog._impl.show(self, result)
         return result
@@ -745,6 +754,8 @@ class Window:
             self,
             on_result=wrapped_handler(self, on_result) if on_result else None,
         )
+        from toga import dialogs
+
         result.dialog = dialogs.ErrorDialog(title, message)
         result.dialog._impl.show(self, result)
         return result
@@ -771,6 +782,8 @@ class Window:
             self,
             on_result=wrapped_handler(self, on_result) if on_result else None,
         )
+        from toga import dialogs
+
         result.dialog = dialogs.StackTraceDialog(
             title,
             message=message,
@@ -800,6 +813,8 @@ class Window:
             self,
             on_result=wrapped_handler(self, on_result) if on_result else None,
         )
+        from toga import dialogs
+
         result.dialog = dialogs.SaveFileDialog(
             title,
             suggested_filename=suggested_filename,
@@ -834,6 +849,8 @@ class Window:
             self,
             on_result=wrapped_handler(self, on_result) if on_result else None,
         )
+        from toga import dialogs
+
         result.dialog = dialogs.OpenFileDialog(
             title,
             initial_directory=initial_directory,
@@ -868,6 +885,8 @@ class Window:
             self,
             on_result=wrapped_handler(self, on_result) if on_result else None,
         )
+        from toga import dialogs
+
         result.dialog = dialogs.SelectFolderDialog(
             title,
             initial_directory=initial_directory,
@@ -34,4 +34,12 @@ if SetProcessDpiAwarenessContext is not None:
     ):  # pragma: no cover
         print("WARNING: Failed to set the DPI Awareness mode for the app.")
 
-__version__ = travertino._package_version(__file__, __name__)
+
+def __getattr__(name):
+    # Resolved on first use; reading installer metadata slows down app start-up.
+    if name == "__version__":
+        value = globals()["__version__"] = travertino._package_version(
+            __file__, __name__
+        )
+        return value
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -22,4 +22,10 @@ def _package_version(file, name):
         return importlib.metadata.version(package)
 
 
-__version__ = _package_version(__file__, __name__)
+def __getattr__(name):
+    # Resolving the version reads installer metadata (and probes setuptools_scm),
+    # which is slow enough to show up in app start-up time; defer it to first use.
+    if name == "__version__":
+        value = globals()["__version__"] = _package_version(__file__, __name__)
+        return value
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
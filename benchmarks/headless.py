@@ -0,0 +1,66 @@
+"""Безоконный RowStrengthApp поверх toga_stub: настоящие обработчики, виджеты и раскладка Pack."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "app" / "src"
+
+
+def setup_paths():
+    # код приложения и вендоренные пакеты (toga 0.5) — раньше установленных в систему
+    for p in (SRC / "app_packages", SRC / "app"):
+        if str(p) not in sys.path:
+            sys.path.insert(0, str(p))
+    if str(ROOT) not in sys.path:
+        sys.path.append(str(ROOT))
+    os.environ["TOGA_BACKEND"] = "benchmarks.toga_stub"
+
+
+class HeadlessWindow:
+    """Вместо toga.MainWindow: контейнер окна и диалоги, которые только запоминаются."""
+
+    def __init__(self, size=(1000, 750)):
+        from .toga_stub.factory import Container
+        self._container = Container(*size)
+        self.messages = []
+
+    @property
+    def content(self):
+        return self._container.content
+
+    @content.setter
+    def content(self, widget):
+        self._container.set_content(widget)
+        widget.refresh()
+
+    def info_dialog(self, title, message):
+        self.messages.append(message)
+
+
+def make_app(lang: str = "ru"):
+    """RowStrengthApp с построенным главным UI, без цикла событий и нативного окна."""
+    setup_paths()
+    import toga
+    from rowstrength.app import RowStrengthApp
+    from rowstrength.i18n import catalog
+
+    # toga.App.__init__ требует нативное приложение; состояние RowStrengthApp ставится как обычно
+    app_init = toga.App.__init__
+    toga.App.__init__ = lambda self, *args, **kwargs: None
+    try:
+        app = RowStrengthApp()
+    finally:
+        toga.App.__init__ = app_init
+    app.lang = lang
+    app.tr = catalog(lang)
+    app._main_window = HeadlessWindow()
+
+    # _post_build_fixups планирует второй проход через call_later
+    try:
+        asyncio.get_event_loop()
+    except RuntimeError:
+        asyncio.set_event_loop(asyncio.new_event_loop())
+    app._build_main()
+    return app
@@ -0,0 +1,445 @@
+"""Бенчмарки горячих путей RowStrength без GUI.
+
+    python -m benchmarks                      # все случаи, таблица в stdout
+    python -m benchmarks -o base.json         # сохранить результаты
+    python -m benchmarks --compare base.json  # сравнить с прошлой ревизией
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+from .headless import ROOT, setup_paths
+
+# -------- Измерение --------
+PERCENTILES = (50, 90, 99)
+REGRESSION = 1.10  # p50 медленнее на 10% — регрессия
+
+
+def _percentile(sorted_values, p):
+    # линейная интерполяция между соседними рангами
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def measure(fn, repeat: int, number: int = 1, setup=None) -> dict:
+    """Время одного вызова fn (мкс) по repeat замерам из number вызовов и память одного вызова."""
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            if setup:
+                setup()
+            t = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - t) / number * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # отдельный прогон под tracemalloc: сам трассировщик замедляет код в разы
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+
+    samples.sort()
+    res = {f"p{p}_us": round(_percentile(samples, p), 3) for p in PERCENTILES}
+    res.update(min_us=round(samples[0], 3), mean_us=round(sum(samples) / len(samples), 3),
+               repeat=repeat, number=number,
+               alloc_peak_kb=round((peak - base) / 1024, 2), alloc_net_kb=round((current - base) / 1024, 2),
+               alloc_blocks=blocks)
+    return res
+
+
+def native_calls(fn, setup=None) -> dict:
+    """Вызовы нативного слоя заглушки toga за один вызов fn (раскладки, set_bounds, rehint...)."""
+    from .toga_stub.factory import CALLS
+    if setup:
+        setup()
+    CALLS.clear()
+    fn()
+    calls = dict(CALLS)
+    CALLS.clear()
+    return calls
+
+
+# -------- Случаи --------
+def _cycle(items):
+    # бесконечный перебор входов, чтобы замер не сводился к одному значению
+    items = list(items)
+    state = {"i": 0}
+
+    def nxt():
+        i = state["i"]
+        state["i"] = (i + 1) % len(items)
+        return items[i]
+    return nxt
+
+
+def cases(quick: bool):
+    """(имя, fn, repeat, number, setup) — всё тяжёлое готовится здесь, вне замеров."""
+    from rowstrength import engine
+    from rowstrength.app import ResultTable
+    from rowstrength.tables import RowingTable
+    from rowstrength.compiled import ROWING_FILENAME, STRENGTH_FILENAME, load_json_from_package
+    from .headless import make_app
+
+    r = (lambda n: max(3, n // 10)) if quick else (lambda n: n)
+    rng = random.Random(2024)
+
+    for name in (ROWING_FILENAME, STRENGTH_FILENAME):
+        yield f"load_json/{name}", lambda name=name: load_json_from_package(name), r(20), 1, None
+
+    splits = _cycle((d, f"{rng.randint(1, 40):02d}:{rng.randint(0, 59):02d}") for _ in range(256)
+                    for d in (rng.choice(engine.DISTANCES),))
+    yield "get_split_500m", lambda: engine.get_split_500m(*splits()), r(200), 100, None
+
+    rowing_table, _ = engine.get_tables()
+    # выбор дистанции: DistanceIndex (минуты/секунды для списков) строится при первом обращении
+    for d in engine.DISTANCES:
+        if rowing_table.index("male", d) is not None:
+            yield f"tables.index/male/{d}", lambda d=d: RowingTable(rowing_table._columns).index("male", d), \
+                r(200), 1, None
+    erg_inputs = []
+    for _ in range(256):
+        g, d = rng.choice(("male", "female")), rng.choice(engine.DISTANCES)
+        idx = rowing_table.index(g, d)
+        erg_inputs.append((g, float(rng.randint(50, 120)), d, idx.time_at(rng.randrange(len(idx))),
+                           rng.choice((0, 0, 0, 5))))
+    erg = _cycle(erg_inputs)
+    bar_inputs = [(rng.choice(("male", "female")), float(rng.randint(50, 120)), rng.choice(engine.EXERCISE_KEYS),
+                   float(rng.randint(40, 200)), rng.randint(1, 12)) for _ in range(256)]
+    bar = _cycle(bar_inputs)
+
+    def _fill(fn, inputs):
+        # тёплый кэш: каждый вход уже посчитан хотя бы раз
+        for args in inputs:
+            fn(*args)
+
+    yield "engine.erg/cold", lambda: engine.erg_equivalents(*erg()), r(500), 1, engine.cache_clear
+    yield "engine.erg/warm", lambda: engine.erg_equivalents(*erg()), r(500), 100, lambda: _fill(engine.erg_equivalents, erg_inputs)
+    # готовые результаты (data/data_lookup.bin) против расчёта по таблицам для тех же входов
+    exact = _cycle(args for args in erg_inputs if not args[4])
+    lookup = engine.get_lookup()
+    if lookup is not None:
+        keys = _cycle((g, int(bw), d, t) for g, bw, d, t, _ in erg_inputs)
+        yield "lookup.erg", lambda: lookup.erg(*keys()), r(500), 100, None
+    yield "engine.erg/computed", lambda: engine.erg_computed(*exact()), r(500), 100, None
+    yield "engine.bar/cold", lambda: engine.bar_equivalents(*bar()), r(500), 1, engine.cache_clear
+    yield "engine.bar/warm", lambda: engine.bar_equivalents(*bar()), r(500), 100, lambda: _fill(engine.bar_equivalents, bar_inputs)
+
+    # обработчики кнопок целиком: чтение виджетов, расчёт, таблицы, раскладка
+    app = make_app()
+    app.calculate_erg(None)
+    app.calculate_bar(None)
+
+    def set_erg():
+        engine.cache_clear()
+        g, bw, d, t, tenths = erg()
+        app.gender.value = app.gender.items[0 if g == "female" else 1].value
+        app.weight.value = bw
+        app.distance.value = str(d)
+        app.min_sel.value, app.sec_sel.value = t.split(":")
+        app.cen_sel.value = str(tenths)
+
+    def set_bar():
+        engine.cache_clear()
+        g, bw, ex, bar_w, reps = bar()
+        app.gender_b.value = app.gender_b.items[0 if g == "female" else 1].value
+        app.weight_b.value, app.bar_weight.value, app.reps.value = bw, bar_w, reps
+
+    yield "app.calculate_erg", lambda: app.calculate_erg(None), r(300), 1, set_erg
+    yield "app.calculate_bar", lambda: app.calculate_bar(None), r(300), 1, set_bar
+    if app._main_window.messages:
+        raise RuntimeError(f"handler reported errors: {app._main_window.messages[:3]}")
+
+    # график: смена дистанции (кривая из кэша либо заново) и ввод времени (только overlay)
+    chart = app.chart
+    curves = _cycle((g, d, rowing_table.index(g, d)) for g in ("female", "male") for d in engine.DISTANCES)
+
+    def show_curve():
+        chart._key = None   # иначе повтор того же выбора ничего не делает
+        chart.show_curve(*curves())
+    yield "chart.curve/cold", show_curve, r(200), 1, chart._paths.clear
+    yield "chart.curve/cached", show_curve, r(200), 100, None
+    chart.show_curve("male", 2000, rowing_table.index("male", 2000))
+    yield "chart.overlay", lambda: chart.show_point(400.0, 95.0, ["2000 m  06:40.0  95%", "a: 1 kg", "b: 2 kg"]), \
+        r(300), 100, None
+
+    # смена языка: каталог из data/messages.bin при первом обращении, дальше — замена ссылки и подписи
+    # в одной транзакции раскладки (по одной раскладке на каждое изменённое дерево: окно, вкладки)
+    from rowstrength import i18n
+    langs = _cycle(i18n.LANG_LABEL[lang] for lang in ("en", "de", "fr", "es", "ru"))
+    yield "i18n.catalog/cold", lambda: i18n.catalog("de"), r(200), 1, i18n._catalogs.clear
+    yield "app.lang_change", lambda: setattr(app.lang_sel, "value", langs()), r(100), 1, None
+
+    # трассировка (ROWSTRENGTH_TRACE): цена одного спана в кольцевом буфере
+    from rowstrength.tracing import Tracer
+    tracer = Tracer(capacity=1000)
+
+    def one_span():
+        with tracer.span("bench"):
+            pass
+    yield "tracing.span", one_span, r(200), 100, None
+
+    # таблица результатов как в calculate_erg: ячейки созданы заранее, меняется только текст
+    table = ResultTable(3, col_flex=[1, 1, 1], max_rows=len(engine.SHOW_DISTANCES))
+    result_rows = _cycle([[f"{m} m", f"0{k}:25.00", f"0{k}:25.0/500m"] for m in engine.SHOW_DISTANCES]
+                         for k in range(1, 4))
+    yield "result_table.update/7x3", lambda: table.update(result_rows()), r(200), 1, None
+
+    yield from _layout_cases(r)
+    yield from _source_cases(r, quick)
+    yield from _history_cases(r, erg_inputs, bar_inputs)
+
+
+def _layout_cases(r):
+    # дерево из 5000 виджетов (250 строк x 19 ярлыков): одна правка текста — полная раскладка toga
+    # против инкрементальной (пересчёт предков изменённого ярлыка, set_bounds только сдвинутым)
+    import toga
+    from toga.style import Pack
+    from rowstrength import layout
+    from .toga_stub.factory import Container
+
+    root = toga.Box(style=Pack(direction="column"))
+    labels = []
+    for i in range(250):
+        row = [toga.Label(f"{i}:{j}", style=Pack(flex=1)) for j in range(19)]
+        labels += row
+        root.add(toga.Box(children=row, style=Pack(direction="row")))
+    Container(1000, 750).set_content(root)
+    texts = _cycle(("x", "xxxxxxxx", "xxxx"))
+    targets = _cycle(labels[::97])
+
+    def set_text():
+        targets().text = texts()
+
+    layout.uninstall_incremental()
+    yield "pack.5000/text/full", set_text, r(20), 1, None
+    layout.install_incremental()
+    root.refresh()
+    yield "pack.5000/text", set_text, r(200), 1, None
+    yield "pack.5000/refresh", root.refresh, r(200), 1, None
+
+    # таблица строка за строкой в прикреплённый Box: раскладка на каждый add() против одной
+    # отложенной (call_soon, как в приложении: одна итерация цикла событий на прогон)
+    holder = toga.Box(style=Pack(direction="column"))
+    Container(1000, 750).set_content(holder)
+
+    def build_rows():
+        holder.clear()
+        for i in range(50):
+            holder.add(toga.Box(children=[toga.Label(f"{i}:{j}", style=Pack(flex=1)) for j in range(3)],
+                                style=Pack(direction="row")))
+
+    async def build_rows_deferred():
+        build_rows()
+        await asyncio.sleep(0)
+
+    yield "pack.rows50/sync", build_rows, r(50), 1, None
+    loop = asyncio.new_event_loop()
+    layout.enable_deferred_layout()
+    try:
+        yield "pack.rows50/deferred", lambda: loop.run_until_complete(build_rows_deferred()), r(50), 1, None
+    finally:
+        layout.disable_deferred_layout()
+        loop.close()
+
+
+def _source_cases(r, quick):
+    # 5000 строк в toga.Table: append по одной (insert и update_data на строку) против extend()
+    import toga
+    from toga.sources import ListSource
+    from rowstrength.sources import BatchListSource, install_range_listeners
+
+    install_range_listeners()
+    rows = [(f"athlete {i}", f"{i % 60:02d}:00", i) for i in range(5000)]
+    source = BatchListSource(["athlete", "time", "percent"])
+    toga.Table(headings=["Athlete", "Time", "%"], accessors=source._accessors, data=source)
+
+    def append_rows():
+        for row in rows:
+            source.append(row)
+
+    def batch_rows():
+        with source.batch():
+            for row in rows:
+                source.append(row)
+
+    yield "source.5000/append", append_rows, r(20), 1, source.clear
+    yield "source.5000/extend", lambda: source.extend(rows), r(50), 1, source.clear
+    yield "source.5000/batch", batch_rows, r(50), 1, source.clear
+    yield "source.5000/replace_all", lambda: source.replace_all(rows), r(50), 1, None
+
+    # 100k строк: find()/index() перебором против индексов add_index (строки из второй половины)
+    rows = [(f"athlete {i}", f"{i % 60:02d}:00", i % 100) for i in range(100_000)]
+    plain, indexed = BatchListSource(source._accessors, rows), BatchListSource(source._accessors, rows)
+    indexed.add_index("athlete", "percent")
+    names = _cycle(f"athlete {i}" for i in range(50_000, 100_000, 997))
+    positions = _cycle(range(50_000, 100_000, 997))
+    yield "source.100k/find/scan", lambda: plain.find({"athlete": names()}), r(20), 1, None
+    yield "source.100k/find", lambda: indexed.find({"athlete": names()}), r(200), 100, None
+    yield "source.100k/find/next", lambda: indexed.find({"percent": 7}, start=indexed[positions()]), r(200), 100, None
+    yield "source.100k/index/scan", lambda: plain.index(plain[positions()]), r(20), 1, None
+    yield "source.100k/index", lambda: indexed.index(indexed[positions()]), r(200), 100, None
+
+    # память таблицы команды (250k строк, quick — 100k): Row на строку против колонок; значения
+    # создаются заново для каждой строки, как при чтении из базы
+    from rowstrength.roster import ROSTER_ACCESSORS
+    from rowstrength.sources import ColumnarListSource
+    n = 100_000 if quick else 250_000
+
+    def sessions():
+        for i in range(n):
+            yield (f"athlete {i % 40:02d}", f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", f"{(i % 5 + 1) * 500} m",
+                   60.0 + i % 50, f"{6 + i % 3}:{i % 60:02d}.{i % 10}", 80.0 + (i % 200) / 10,
+                   f"{6 + i % 2}:{i % 60:02d}.{i % 10}", f"{80 + i % 60} kg", f"{100 + i % 80} kg", f"{120 + i % 90} kg")
+
+    yield f"source.{n // 1000}k/rows", lambda: ListSource(ROSTER_ACCESSORS, sessions()), 3, 1, None
+    yield f"source.{n // 1000}k/columnar", lambda: ColumnarListSource(ROSTER_ACCESSORS, sessions()), 3, 1, None
+
+
+def _history_cases(r, erg_inputs, bar_inputs):
+    # сезон команды: 40 спортсменов x 40 тестов (эргометр + штанга) по датам
+    import datetime
+    from rowstrength import engine
+    from rowstrength.history import HistoryStore
+    from rowstrength.roster import PagedSource, HistoryProvider
+
+    tmp = tempfile.TemporaryDirectory()
+    store = HistoryStore(f"{tmp.name}/history.sqlite3")
+    day0 = datetime.date(2025, 9, 1)
+    for a in range(40):
+        for i in range(40):
+            date = (day0 + datetime.timedelta(days=7 * i)).isoformat()
+            g, bw, d, t, tenths = erg_inputs[(a * 40 + i) % len(erg_inputs)]
+            store.record_erg(f"athlete {a:02d}", g, bw, d, t, tenths, engine.erg_equivalents(g, bw, d, t, tenths),
+                             date=date)
+            args = bar_inputs[(a * 40 + i) % len(bar_inputs)]
+            try:
+                store.record_bar(f"athlete {a:02d}", *args, engine.bar_equivalents(*args), date=date)
+            except engine.CalcError:
+                pass
+    store.flush()
+    try:
+        yield ("history.progression/squad40", lambda: store.progression(start="2025-09-01", end="2026-06-30"),
+               r(100), 1, None)
+        yield ("history.progression/squad40+eq",
+               lambda: store.progression(start="2025-09-01", end="2026-06-30", equivalents=True), r(50), 1, None)
+        yield "history.best_times/2000", lambda: store.best_times(2000, 10), r(200), 1, None
+        # таблица команды: пересортировка в фоне и одно видимое окно из 30 строк с холодной страницы
+        # (без цикла событий страница читается сразу; в приложении это работа пула потоков)
+        provider = HistoryProvider(store, {})
+        roster = PagedSource(provider)
+        roster.set_keys(provider.keys(None, "date", True))
+        yield "roster.keys/date", lambda: provider.keys(None, "date", True), r(100), 1, None
+        yield "roster.keys/squat+filter", lambda: provider.keys("athlete 1", "squat", False), r(50), 1, None
+        yield ("roster.window/30", lambda: [roster[i] for i in range(1500, 1530)], r(200), 1,
+               roster.invalidate)
+        yield "history.record_erg", lambda: store.record_erg(None, *erg_inputs[0], engine.erg_equivalents(
+            *erg_inputs[0])), r(500), 20, None
+    finally:
+        store.close()
+        tmp.cleanup()
+
+
+def run(quick=False, pattern=None, out=sys.stdout) -> dict:
+    results = {}
+    for name, fn, repeat, number, setup in cases(quick):
+        if pattern and pattern not in name:
+            continue
+        fn()  # прогрев: импорты, ленивые индексы
+        res = results[name] = measure(fn, repeat, number, setup)
+        calls = native_calls(fn, setup)
+        if calls:
+            res["native_calls"] = calls
+        counts = "".join(f"  {label} {calls[key]}" for key, label in (("layout", "layout"), ("table_update", "table"))
+                          if calls.get(key))
+        print(f"{name:<36} p50 {res['p50_us']:>10.1f} us  p90 {res['p90_us']:>10.1f}  p99 {res['p99_us']:>10.1f}"
+              f"  alloc {res['alloc_peak_kb']:>9.1f} KiB / {res['alloc_blocks']} blk{counts}", file=out)
+    return results
+
+
+# -------- Отчёт и сравнение --------
+def _revision():
+    try:
+        return subprocess.run(["git", "-C", str(ROOT), "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(base: dict, results: dict, threshold: float = REGRESSION, out=sys.stdout) -> int:
+    """Печатает отношение p50 к базовому прогону; возвращает число регрессий."""
+    regressions = 0
+    print(f"\ncompared with {base.get('revision') or 'baseline'}:", file=out)
+    for name, res in results.items():
+        old = base.get("results", {}).get(name)
+        if not old or not old.get("p50_us"):
+            print(f"{name:<36} (new)", file=out)
+            continue
+        ratio = res["p50_us"] / old["p50_us"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        layouts = ""
+        if "native_calls" in res or "native_calls" in old:
+            layouts = (f"  layout {old.get('native_calls', {}).get('layout', 0)} -> "
+                       f"{res.get('native_calls', {}).get('layout', 0)}")
+        print(f"{name:<36} x{ratio:6.2f}  alloc {old['alloc_peak_kb']:.1f} -> {res['alloc_peak_kb']:.1f} KiB"
+              f"{layouts}{flag}", file=out)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Headless RowStrength benchmarks.")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("-c", "--compare", help="JSON results of a previous run to compare against")
+    parser.add_argument("-k", "--filter", help="run only cases whose name contains this string")
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions (smoke run)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION,
+                        help=f"p50 ratio reported as a regression (default {REGRESSION})")
+    args = parser.parse_args(argv)
+
+    setup_paths()
+    import rowstrength.app  # noqa: F401 — toga при импорте включает DeprecationWarning, глушим уже после
+    warnings.simplefilter("ignore", DeprecationWarning)  # Pack.padding -> margin в toga 0.5
+    results = run(args.quick, args.filter)
+    report = {
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "quick": args.quick,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            return 1 if compare(json.load(f), results, args.threshold) else 0
+    return 0
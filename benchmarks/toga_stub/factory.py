@@ -0,0 +1,474 @@
+"""Минимальный безоконный бэкенд toga: ровно столько API виджетов, сколько нужно,
+чтобы построить и разложить дерево RowStrength без нативного GUI.
+Нативные вызовы считаются в CALLS — бенчмарки сообщают их число."""
+from collections import Counter
+
+from travertino.size import at_least
+
+CALLS = Counter()
+
+
+class Font:
+    def __init__(self, interface):
+        self.interface = interface
+
+    def load_predefined_system_font(self):
+        pass
+
+    def load_user_registered_font(self):
+        pass
+
+    def load_arbitrary_system_font(self):
+        pass
+
+
+class Container:
+    def __init__(self, width=1000, height=750):
+        self.width = width
+        self.height = height
+        self.content = None
+
+    def set_content(self, widget):
+        if self.content is not None:
+            self.content._impl.container = None
+        self.content = widget
+        if widget is not None:
+            widget._impl.container = self
+
+    def add_content(self, impl):
+        pass
+
+    def remove_content(self, impl):
+        pass
+
+    def refreshed(self):
+        CALLS["layout"] += 1
+
+
+class Widget:
+    dpi_scale = 1.0   # масштаб окна; тесты меняют его, как смена монитора в WinForms
+
+    def __init__(self, interface):
+        CALLS["create"] += 1
+        self.interface = interface
+        self._container = None
+        self.native = None
+        self.bounds = self.native_bounds = None
+        self.hidden = False
+        self.enabled = True
+        self.create()
+
+    def create(self):
+        pass
+
+    def set_app(self, app):
+        pass
+
+    def set_window(self, window):
+        pass
+
+    @property
+    def container(self):
+        return self._container
+
+    @container.setter
+    def container(self, container):
+        if self._container:
+            self._container.remove_content(self)
+        self._container = container
+        if container:
+            container.add_content(self)
+        else:
+            self.bounds = self.native_bounds = None   # снятый с окна виджет положение не хранит
+        for child in self.interface.children:
+            child._impl.container = container
+        self.refresh()
+
+    def get_tab_index(self):
+        return 0
+
+    def set_tab_index(self, tab_index):
+        pass
+
+    def get_enabled(self):
+        return self.enabled
+
+    def set_enabled(self, value):
+        self.enabled = value
+
+    def focus(self):
+        pass
+
+    def set_bounds(self, x, y, width, height):
+        CALLS["set_bounds"] += 1
+        self.bounds = (x, y, width, height)
+        # как scale_in() в toga_winforms: логические пиксели -> нативные
+        self.native_bounds = tuple(round(v * self.dpi_scale) for v in self.bounds)
+
+    def set_hidden(self, hidden):
+        self.hidden = hidden
+
+    def set_text_align(self, alignment):
+        pass
+
+    def set_font(self, font):
+        pass
+
+    def set_color(self, color):
+        pass
+
+    def set_background_color(self, color):
+        pass
+
+    def add_child(self, child):
+        child.container = self.container
+
+    def insert_child(self, index, child):
+        self.add_child(child)
+
+    def remove_child(self, child):
+        child.container = None
+
+    def refresh(self):
+        CALLS["rehint"] += 1
+        self.interface.intrinsic.width = at_least(self.interface._MIN_WIDTH)
+        self.interface.intrinsic.height = at_least(self.interface._MIN_HEIGHT)
+        self.rehint()
+
+    def rehint(self):
+        pass
+
+
+class Box(Widget):
+    def rehint(self):
+        self.interface.intrinsic.width = at_least(0)
+        self.interface.intrinsic.height = at_least(0)
+
+
+class Label(Widget):
+    text = ""
+
+    def get_text(self):
+        return self.text
+
+    def set_text(self, value):
+        CALLS["set_text"] += 1
+        self.text = value
+
+    def rehint(self):
+        # ~7 px на символ, 18 px на строку
+        lines = self.text.split("\n") or [""]
+        self.interface.intrinsic.width = at_least(7 * max(len(line) for line in lines))
+        self.interface.intrinsic.height = 18 * len(lines)
+
+
+class Button(Label):
+    icon = None
+
+    def get_icon(self):
+        return self.icon
+
+    def set_icon(self, icon):
+        self.icon = icon
+
+    def rehint(self):
+        self.interface.intrinsic.width = at_least(7 * len(self.text) + 20)
+        self.interface.intrinsic.height = 28
+
+
+class Selection(Widget):
+    # уведомления как у ComboBox в toga_winforms: на смену индекса и на clear()
+    def create(self):
+        self.items = []
+        self.selected = None
+
+    def _select(self, index):
+        if index != self.selected:
+            self.selected = index
+            self.interface.on_change()
+
+    def clear(self):
+        self.items = []
+        self.selected = None
+        self.interface.on_change()
+
+    def insert(self, index, item):
+        self.items.insert(index, item)
+        if self.selected is None:
+            self._select(0)
+
+    def change(self, item):
+        self.interface.refresh()
+
+    def remove(self, index, item):
+        del self.items[index]
+        if self.selected == index:
+            self.selected = None
+            if self.items:
+                self._select(max(0, index - 1))
+            else:
+                self.interface.on_change()
+
+    def select_item(self, index, item):
+        self._select(index)
+
+    def get_selected_index(self):
+        return self.selected
+
+    def rehint(self):
+        self.interface.intrinsic.width = at_least(120)
+        self.interface.intrinsic.height = 24
+
+
+class NumberInput(Widget):
+    def create(self):
+        self.value = None
+        self.readonly = False
+
+    def get_readonly(self):
+        return self.readonly
+
+    def set_readonly(self, value):
+        self.readonly = value
+
+    def set_step(self, step):
+        pass
+
+    def set_min_value(self, value):
+        pass
+
+    def set_max_value(self, value):
+        pass
+
+    def get_value(self):
+        return self.value
+
+    def set_value(self, value):
+        self.value = value
+
+    def rehint(self):
+        self.interface.intrinsic.width = at_least(120)
+        self.interface.intrinsic.height = 24
+
+
+class ScrollContainer(Widget):
+    # сам является контейнером для своего содержимого
+    def create(self):
+        self.width, self.height = 1000, 700
+        self.content = None
+        self.horizontal = self.vertical = True
+
+    def set_content(self, widget):
+        if self.content is not None:
+            self.content.container = None
+        self.content = widget
+        if widget is not None:
+            widget.container = self
+
+    def add_content(self, impl):
+        pass
+
+    def remove_content(self, impl):
+        pass
+
+    def refreshed(self):
+        CALLS["layout"] += 1
+
+    def set_bounds(self, x, y, width, height):
+        super().set_bounds(x, y, width, height)
+        if (self.width, self.height) != (width, height):
+            self.width, self.height = width, height
+            if self.content is not None:
+                self.content.interface.refresh()
+
+    def get_horizontal(self):
+        return self.horizontal
+
+    def set_horizontal(self, value):
+        self.horizontal = value
+
+    def get_vertical(self):
+        return self.vertical
+
+    def set_vertical(self, value):
+        self.vertical = value
+
+    def get_horizontal_position(self):
+        return 0
+
+    def get_vertical_position(self):
+        return 0
+
+    def get_max_horizontal_position(self):
+        return 0
+
+    def get_max_vertical_position(self):
+        return 0
+
+    def set_position(self, horizontal_position, vertical_position):
+        pass
+
+
+class OptionContainer(Widget):
+    uses_icons = False
+
+    def create(self):
+        self.options = []   # [text, container, enabled]
+        self.current = 0
+
+    def add_option(self, index, text, widget, icon):
+        page = Container()
+        page.set_content(widget.interface)
+        self.options.insert(index, [text, page, True])
+
+    def remove_option(self, index):
+        _, page, _ = self.options.pop(index)
+        page.set_content(None)
+
+    def set_option_enabled(self, index, enabled):
+        self.options[index][2] = enabled
+
+    def is_option_enabled(self, index):
+        return self.options[index][2]
+
+    def set_option_text(self, index, value):
+        self.options[index][0] = value
+
+    def get_option_text(self, index):
+        return self.options[index][0]
+
+    def set_option_icon(self, index, value):
+        pass
+
+    def get_option_icon(self, index):
+        return None
+
+    def get_current_tab_index(self):
+        return self.current
+
+    def set_current_tab_index(self, index):
+        self.current = index
+
+    def set_bounds(self, x, y, width, height):
+        super().set_bounds(x, y, width, height)
+        size = (width, max(0, height - 24))  # минус полоса вкладок
+        for _, page, _ in self.options:
+            if (page.width, page.height) != size:
+                page.width, page.height = size
+                if page.content is not None:
+                    page.content.refresh()
+
+
+class TextInput(NumberInput):
+    def create(self):
+        self.value = ""
+        self.readonly = False
+        self.placeholder = ""
+
+    def get_placeholder(self):
+        return self.placeholder
+
+    def set_placeholder(self, value):
+        self.placeholder = value
+
+    def is_valid(self):
+        return True
+
+    def set_error(self, error_message):
+        pass
+
+    def clear_error(self):
+        pass
+
+    def rehint(self):
+        self.interface.intrinsic.width = at_least(120)
+        self.interface.intrinsic.height = 24
+
+
+class Switch(Label):
+    value = False
+
+    def get_value(self):
+        return self.value
+
+    def set_value(self, value):
+        old, self.value = self.value, value
+        if old != value:
+            self.interface.on_change()
+
+    def rehint(self):
+        self.interface.intrinsic.width = at_least(7 * len(self.text) + 24)
+        self.interface.intrinsic.height = 24
+
+
+class Table(Widget):
+    # виртуальная таблица, как ListView в toga_winforms: читает len() и строки окна visible
+    visible = 30
+
+    def create(self):
+        self.size = 0
+        self.window = []
+
+    def _missing(self, row, accessor):
+        value = getattr(row, accessor, None)
+        return self.interface.missing_value if value is None else str(value)
+
+    def update_data(self):
+        CALLS["table_update"] += 1
+        data = self.interface.data
+        self.size = len(data)
+        self.window = [[self._missing(data[i], a) for a in self.interface.accessors]
+                       for i in range(min(self.size, self.visible))]
+
+    def change_source(self, source):
+        self.update_data()
+
+    def insert(self, index, item):
+        self.update_data()
+
+    def change(self, item):
+        self.update_data()
+
+    def remove(self, index, item):
+        self.update_data()
+
+    def clear(self):
+        self.update_data()
+
+    def get_selection(self):
+        return None
+
+    def scroll_to_row(self, index):
+        pass
+
+    def insert_column(self, index, heading, accessor):
+        self.update_data()
+
+    def remove_column(self, index):
+        self.update_data()
+
+    def rehint(self):
+        self.interface.intrinsic.width = at_least(self.interface._MIN_WIDTH)
+        self.interface.intrinsic.height = at_least(self.interface._MIN_HEIGHT)
+
+
+class Canvas(Widget):
+    # Paint не выполняется: считается только число запросов перерисовки; размер сообщается как WinForms Resize
+    def create(self):
+        self.size = None
+
+    def redraw(self):
+        CALLS["redraw"] += 1
+
+    def set_bounds(self, x, y, width, height):
+        super().set_bounds(x, y, width, height)
+        if self.size != (width, height):
+            self.size = (width, height)
+            self.interface.on_resize(width=width, height=height)
+
+    def measure_text(self, text, font, line_height):
+        return 7 * len(text), 18
+
+    def rehint(self):
+        self.interface.intrinsic.width = at_least(0)
+        self.interface.intrinsic.height = at_least(0)
@@ -0,0 +1,14 @@
+import os
+import sys
+from pathlib import Path
+
+# код приложения и вендоренные пакеты — как в собранном приложении
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "app" / "src"
+for p in (SRC / "app_packages", SRC / "app"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+# виджеты — на безоконном бэкенде бенчмарков (benchmarks/toga_stub)
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+os.environ["TOGA_BACKEND"] = "benchmarks.toga_stub"
@@ -0,0 +1,22 @@
+from rowstrength import batch
+
+
+def test_missing_input_is_one_line_error(tmp_path, capsys):
+    assert batch.main([str(tmp_path / "missing.csv")]) == 1
+    err = capsys.readouterr().err
+    assert err.count("\n") == 1 and "missing.csv" in err
+
+
+def test_unwritable_output_is_one_line_error(tmp_path, capsys):
+    src = tmp_path / "in.csv"
+    src.write_text("gender,bodyweight,distance,time\nmale,80,2000,06:30\n", encoding="utf-8")
+    assert batch.main([str(src), "-o", str(tmp_path / "no" / "out.csv")]) == 1
+    assert capsys.readouterr().err.count("\n") == 1
+
+
+def test_rows_are_written(tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    src.write_text("gender,bodyweight,distance,time\nmale,80,2000,06:30\nx,80,2000,06:30\n", encoding="utf-8")
+    assert batch.main([str(src), "-o", str(out)]) == 0
+    header, ok, bad = out.read_text(encoding="utf-8").splitlines()
+    assert ok.split(",")[4] == "84" and "unknown gender" in bad
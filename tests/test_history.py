@@ -0,0 +1,51 @@
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from rowstrength.history import HistoryStore
+
+
+def test_close_closes_readers_of_all_threads(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    conns = []
+
+    def read():
+        store.athletes()
+        conns.append(store._local.conn)
+
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    read()
+    assert len(set(map(id, conns))) == 4
+
+    store.close()
+    for conn in conns:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_session_filter_matches_wildcards_literally(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    result = SimpleNamespace(rep_max=100.0, erg_2k=None)
+    names = ["anna_k", "annabk", "50% team", "50 team", "back\\slash", "backslash", "ivan"]
+    for i, name in enumerate(names):
+        store.record_bar(name, "male", 80, "squat", 90, 3, result, date=f"2024-0{i + 1}-15")
+    try:
+        def found(text):
+            return sorted(r["athlete"] for r in store.sessions(store.session_ids(text)))
+
+        assert found("a_k") == ["anna_k"]
+        assert found("0%") == ["50% team"]
+        assert found("k\\s") == ["back\\slash"]
+        assert found("%") == ["50% team"]
+        assert found("_") == ["anna_k"]
+        assert found("ann") == ["anna_k", "annabk"]
+        assert found("2024-03") == ["50% team"]   # дата — по началу строки
+        assert len(found("")) == len(names)
+    finally:
+        store.close()
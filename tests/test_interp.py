@@ -0,0 +1,178 @@
+import math
+
+import pytest
+
+from rowstrength import engine
+from rowstrength.compiled import FIXED, MISSING
+from rowstrength.interp import Segments, RowingCurve
+
+GENDERS = ("female", "male")
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return engine.get_tables()
+
+
+@pytest.fixture(scope="module")
+def interp():
+    return engine.get_interpolator()
+
+
+def _indexes(rowing):
+    for g in GENDERS:
+        for d in engine.DISTANCES:
+            idx = rowing.index(g, d)
+            if idx is not None:
+                yield g, d, idx
+
+
+def _exercises(strength):
+    for g in GENDERS:
+        for bw in range(40, 141):
+            for ex in engine.EXERCISE_KEYS:
+                idx = strength.exercise(g, bw, ex)
+                if idx is not None:
+                    yield g, bw, ex, idx
+
+
+# -------- Segments --------
+def test_segments_knots_midpoints_and_range():
+    s = Segments([1, 2, 4], [10, 20, 0])
+    assert [s(x) for x in (1, 2, 4)] == [10, 20, 0]
+    assert s(1.5) == 15 and s(3) == 10
+    assert s(0.999) is None and s(4.001) is None
+    assert s.segment(4) == 2 and s.at(2, 4) == 0
+
+
+def test_segments_single_knot():
+    s = Segments([5], [7])
+    assert s(5) == 7 and s(6) is None
+
+
+# -------- Эргометр: точные строки таблицы --------
+def test_rowing_curve_reproduces_table(tables):
+    rowing, _ = tables
+    checked = 0
+    for g, d, idx in _indexes(rowing):
+        curve = RowingCurve(idx)
+        for i, t in enumerate(idx.times):
+            percent, eq = curve.at(t)
+            assert round(percent * FIXED) == idx.percents[i], (g, d, i)
+            for m, seconds in eq.items():
+                assert seconds == pytest.approx(idx.equivalents[m][i]), (g, d, m, i)
+            checked += 1
+    assert checked
+
+
+def test_rowing_curve_skips_missing_columns(tables):
+    rowing, _ = tables
+    for g, d, idx in _indexes(rowing):
+        curve = RowingCurve(idx)
+        for m, col in idx.equivalents.items():
+            assert (m in curve.equivalents) == (MISSING not in col), (g, d, m)
+
+
+def test_rowing_curve_midpoints_monotonic(tables):
+    rowing, _ = tables
+    for g, d, idx in _indexes(rowing):
+        curve = RowingCurve(idx)
+        ts = list(idx.times)
+        values = []
+        for a, b in zip(ts, ts[1:]):
+            values += [curve.at(a)[0], curve.at((a + b) / 2)[0]]
+        assert all(x >= y for x, y in zip(values, values[1:])), (g, d)
+        for a, b in zip(ts, ts[1:]):
+            lo, hi = curve.at(b), curve.at(a)
+            mid = curve.at((a + b) / 2)
+            for m, seconds in mid[1].items():
+                assert min(lo[1][m], hi[1][m]) <= seconds <= max(lo[1][m], hi[1][m])
+
+
+def test_rowing_curve_outside_table(tables):
+    rowing, _ = tables
+    for _, _, idx in _indexes(rowing):
+        curve = RowingCurve(idx)
+        assert curve.at(idx.times[0] - 0.1) is None
+        assert curve.at(idx.times[-1] + 0.1) is None
+
+
+# -------- Штанга: целые и дробные веса тела --------
+def test_kilo_reproduces_table(tables, interp):
+    _, strength = tables
+    for g, bw, ex, idx in _exercises(strength):
+        for p, k in zip(idx.percents, idx.kilos):
+            assert interp.kilo(g, bw, ex, p / FIXED) == pytest.approx(k / FIXED), (g, bw, ex, p)
+
+
+def test_percent_for_kilo_matches_table(tables, interp):
+    _, strength = tables
+    for g, bw, ex, idx in _exercises(strength):
+        for k in sorted(set(idx.kilos))[::7]:
+            expected = idx.percent_for_kilo(k)
+            got = interp.percent_for_kilo(g, bw, ex, k / FIXED)
+            assert got is not None and round(got * FIXED) == expected, (g, bw, ex, k)
+        assert interp.percent_for_kilo(g, bw, ex, min(idx.kilos) / FIXED - 1) is None
+
+
+def test_fractional_bodyweight_between_neighbours(tables, interp):
+    _, strength = tables
+    for g, bw, ex, idx in _exercises(strength):
+        if strength.exercise(g, bw + 1, ex) is None:
+            # соседнего веса нет: дробный вес вне таблицы
+            assert not interp.has_strength(g, bw + 0.5, ex)
+            assert interp.kilo(g, bw + 0.5, ex, idx.percents[0] / FIXED) is None
+            continue
+        for p in idx.percents[::11]:
+            k0, k1 = interp.kilo(g, bw, ex, p / FIXED), interp.kilo(g, bw + 1, ex, p / FIXED)
+            if k0 is None or k1 is None:
+                continue
+            mid = interp.kilo(g, bw + 0.5, ex, p / FIXED)
+            assert mid == pytest.approx((k0 + k1) / 2)
+
+
+# -------- engine: выбор точной строки и интерполяции --------
+def test_engine_interpolated_path_matches_exact_rows(tables):
+    # путь с десятыми/дробным весом в узле таблицы даёт тот же результат, что и точная строка
+    rowing, _ = tables
+    for g, d, idx in _indexes(rowing):
+        for i in range(0, len(idx), 17):
+            try:
+                exact = engine.erg_computed(g, 80, d, idx.time_at(i))
+            except engine.CalcError:
+                continue
+            res = engine._erg_interpolated(g, 80, d, float(idx.times[i]))
+            assert float(res.percent) == pytest.approx(float(exact.percent)), (g, d, i)
+            assert [(m, pytest.approx(s)) for m, s, _ in res.distances] == [(m, s) for m, s, _ in exact.distances]
+            assert [(ex, float(k)) for ex, k in res.kilos] == [(ex, float(k)) for ex, k in exact.kilos]
+
+
+def test_engine_tenths_on_last_row(tables):
+    rowing, _ = tables
+    for g, d, idx in _indexes(rowing):
+        last = idx.time_at(len(idx) - 1)
+        try:
+            exact = engine.erg_computed(g, 80, d, last)
+        except engine.CalcError:
+            continue
+        res = engine.erg_computed(g, 80, d, last, 5)
+        assert float(res.percent) == pytest.approx(float(exact.percent))
+        assert [m for m, _, _ in res.distances] == [m for m, _, _ in exact.distances]
+
+
+def test_engine_tenths_between_rows(tables):
+    rowing, _ = tables
+    idx = rowing.index("male", 2000)
+    i = len(idx) // 2
+    t0, t1 = idx.times[i], idx.times[i + 1]
+    res = engine.erg_computed("male", 80, 2000, idx.time_at(i), 5)
+    p = float(res.percent)
+    assert idx.percents[i + 1] / FIXED <= p <= idx.percents[i] / FIXED
+    if t1 - t0 == 1:
+        assert p == pytest.approx((idx.percents[i] + idx.percents[i + 1]) / 2 / FIXED, abs=0.01)
+    assert not math.isnan(p)
+
+
+def test_erg_equivalents_last_row_regression():
+    res = engine.erg_equivalents("male", 80, 2000, "08:50", 5)
+    assert res.percent == engine.erg_equivalents("male", 80, 2000, "08:50").percent
@@ -0,0 +1,246 @@
+import asyncio
+import random
+
+import pytest
+import toga
+from toga.style import Pack
+from toga.style.pack import COLUMN, ROW
+
+from benchmarks.toga_stub.factory import CALLS, Container, Widget as StubWidget
+from rowstrength import layout
+
+STEPS = 60
+
+
+@pytest.fixture
+def incremental():
+    layout.install_incremental()
+    yield
+    layout.uninstall_incremental()
+
+
+def _nodes(node):
+    yield node
+    for child in node.children:
+        yield from _nodes(child)
+
+
+def _snapshot(root):
+    return [(type(n).__name__, n.layout.content_width, n.layout.content_height, n.layout.absolute_content_left,
+             n.layout.absolute_content_top, n._impl.native_bounds) for n in _nodes(root)]
+
+
+def _style(rng):
+    style = Pack(direction=rng.choice((ROW, COLUMN)), flex=rng.choice((0, 0, 1, 2)), margin=rng.randrange(0, 9))
+    if rng.random() < 0.25:
+        style.width = rng.randrange(20, 300)
+    return style
+
+
+def _widget(rng, depth=0):
+    if depth < 3 and rng.random() < 0.4:
+        return toga.Box(children=[_widget(rng, depth + 1) for _ in range(rng.randrange(4))], style=_style(rng))
+    return toga.Label("x" * rng.randrange(0, 30), style=_style(rng))
+
+
+def _boxes(root):
+    return [n for n in _nodes(root) if isinstance(n, toga.Box)]
+
+
+def _mutate(rng, root, spare):
+    """Одна случайная правка дерева; spare — снятые поддеревья, которые можно вернуть."""
+    nodes, boxes = list(_nodes(root)), _boxes(root)
+    kind = rng.randrange(8)
+    box = rng.choice(boxes)
+    if kind == 0:
+        box.add(_widget(rng))
+    elif kind == 1:
+        box.insert(rng.randrange(len(box.children) + 1), _widget(rng))
+    elif kind == 2 and box.children:
+        child = rng.choice(box.children)
+        box.remove(child)
+        spare.append(child)
+    elif kind == 3 and spare:
+        box.insert(rng.randrange(len(box.children) + 1), spare.pop(rng.randrange(len(spare))))
+    elif kind == 4 and rng.random() < 0.5:
+        spare.extend(box.children)
+        box.clear()
+    elif kind == 5:
+        node = rng.choice(nodes)
+        name = rng.choice(("direction", "flex", "margin_left", "margin_top", "width", "height", "color"))
+        value = {"direction": rng.choice((ROW, COLUMN)), "flex": rng.randrange(3), "width": rng.randrange(20, 300),
+                 "height": rng.randrange(10, 80), "color": rng.choice(("red", "blue"))}.get(name, rng.randrange(12))
+        if rng.random() < 0.2 and name not in ("direction", "color"):
+            del node.style[name]
+        else:
+            setattr(node.style, name, value)
+    elif kind == 6:
+        labels = [n for n in nodes if isinstance(n, toga.Label)]
+        if labels:
+            rng.choice(labels).text = "\n".join("y" * rng.randrange(40) for _ in range(rng.randrange(1, 3)))
+    elif kind == 7:
+        node = rng.choice(nodes)
+        node.style.visibility = rng.choice(("visible", "hidden"))
+
+
+def _run(seed, between=None):
+    """Снимки раскладки после каждой правки; between(step) — вмешательство между шагами."""
+    rng = random.Random(seed)
+    root = toga.Box(children=[_widget(rng) for _ in range(4)], style=Pack(direction=COLUMN, margin=10))
+    container = Container(1000, 750)
+    container.set_content(root)
+    root.refresh()
+    spare, snapshots = [], [_snapshot(root)]
+    for step in range(STEPS):
+        if between is not None:
+            between(step, root)
+        _mutate(rng, root, spare)
+        snapshots.append(_snapshot(root))
+    return snapshots
+
+
+def _reference(seed, between=None):
+    installed = bool(layout._pack)
+    layout.uninstall_incremental()
+    try:
+        return _run(seed, between)
+    finally:
+        if installed:
+            layout.install_incremental()
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_incremental_matches_full_layout(incremental, seed):
+    assert _run(seed) == _reference(seed)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_reinstall_invalidates_remembered_layout(incremental, seed):
+    # между шагами раскладка идёт без патчей: запомненное узлами устаревает, эпоха должна это учесть
+    def toggle(step, root):
+        if step % 10 == 3:
+            layout.uninstall_incremental()
+        elif step % 10 == 6:
+            layout.install_incremental()
+
+    assert _run(seed, toggle) == _reference(seed)
+
+
+def test_dpi_change_moves_native_bounds(incremental, monkeypatch):
+    def rescale(step, root):
+        if step in (20, 40):
+            # смена монитора: логическая раскладка та же, нативные координаты — другие
+            monkeypatch.setattr(StubWidget, "dpi_scale", 1.5 if step == 20 else 1.25)
+            root.refresh()
+
+    inc = _run(7, rescale)
+    monkeypatch.setattr(StubWidget, "dpi_scale", 1.0)
+    assert inc == _reference(7, rescale)
+    assert inc[21] != inc[20]
+
+
+def test_uninstall_restores_toga_methods():
+    originals = [getattr(cls, name) for cls, name, _ in layout._PATCHES]
+    layout.install_incremental()
+    assert [getattr(cls, name) for cls, name, _ in layout._PATCHES] == [f for _, _, f in layout._PATCHES]
+    layout.uninstall_incremental()
+    assert [getattr(cls, name) for cls, name, _ in layout._PATCHES] == originals
+
+
+# отложенная раскладка: transaction(), enable_deferred_layout(), flush_layout()
+def _attached():
+    root = toga.Box(children=[toga.Label("a")], style=Pack(direction=COLUMN))
+    Container(400, 300).set_content(root)
+    root.refresh()
+    return root
+
+
+@pytest.fixture
+def deferred():
+    layout.enable_deferred_layout()
+    yield
+    layout.disable_deferred_layout()
+
+
+def test_deferred_layout_once_per_loop_iteration(deferred):
+    root = _attached()
+
+    async def main():
+        start = CALLS["layout"]
+        root.add(toga.Label("0"))
+        handle = layout._scheduled
+        for i in range(1, 5):
+            root.add(toga.Label(str(i)))
+        root.children[0].text = "longer text"
+        assert CALLS["layout"] == start and layout._scheduled is handle   # один call_soon на итерацию
+        await asyncio.sleep(0)
+        assert CALLS["layout"] == start + 1 and layout._scheduled is None
+        assert root.children[-1].layout.absolute_content_top > root.children[0].layout.absolute_content_top
+        root.remove(root.children[-1])
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert CALLS["layout"] == start + 2
+
+    asyncio.run(main())
+
+
+def test_deferred_without_running_loop_lays_out_now(deferred):
+    root = _attached()
+    start = CALLS["layout"]
+    root.add(toga.Label("b"))
+    assert CALLS["layout"] == start + 1 and layout._scheduled is None
+
+
+def test_flush_layout_inside_transaction():
+    root = _attached()
+    start = CALLS["layout"]
+    with layout.transaction():
+        root.add(toga.Label("b"))
+        assert CALLS["layout"] == start
+        layout.flush_layout()
+        assert CALLS["layout"] == start + 1
+        assert root.children[1].layout.absolute_content_top > root.children[0].layout.absolute_content_top
+        layout.flush_layout()   # нечего раскладывать
+        assert CALLS["layout"] == start + 1
+        root.children[1].text = "c"
+    assert CALLS["layout"] == start + 2
+
+
+def test_detached_roots_are_skipped(monkeypatch):
+    layout._install()
+    refreshed, widget_refresh = [], layout._widget_refresh
+
+    def record(widget):
+        refreshed.append(widget)
+        widget_refresh(widget)
+
+    monkeypatch.setattr(layout, "_widget_refresh", record)
+    root, detached = _attached(), _attached()
+    loose = toga.Box(children=[toga.Label("x")])   # никогда не был в окне
+    refreshed.clear()
+    with layout.transaction():
+        root.add(toga.Label("b"))
+        detached.add(toga.Label("b"))
+        loose.add(toga.Label("y"))
+        detached._impl.container.set_content(None)
+    assert refreshed == [root]
+    assert not layout._pending
+
+
+def test_disable_cancels_scheduled_layout():
+    root = _attached()
+
+    async def main():
+        layout.enable_deferred_layout()
+        try:
+            root.add(toga.Label("b"))
+            handle = layout._scheduled
+            start = CALLS["layout"]
+        finally:
+            layout.disable_deferred_layout()
+        assert handle.cancelled() and layout._scheduled is None
+        assert CALLS["layout"] == start + 1   # отложенное разложено сразу, без цикла
+        await asyncio.sleep(0)
+        assert CALLS["layout"] == start + 1
+
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+import pytest
+
+from rowstrength import engine, lookup
+
+
+@pytest.fixture
+def package_lookup():
+    res = lookup.open_package_lookup()
+    if res is None:
+        pytest.skip("data/data_lookup.bin is not built")
+    yield res
+    res.close()
+
+
+def test_lookup_records_tables_digest(package_lookup):
+    rowing, _ = engine.get_tables()
+    assert package_lookup.tables_digest == rowing.digest
+
+
+def test_lookup_from_other_tables_is_ignored(monkeypatch, package_lookup, capsys):
+    stale = lookup.ErgLookup(bytes(package_lookup._mv))
+    stale.tables_digest = "0" * 64
+    monkeypatch.setattr(lookup, "open_package_lookup", lambda: stale)
+    monkeypatch.setattr(engine, "_lookup", None)
+    assert engine.get_lookup() is None
+    assert "ignored" in capsys.readouterr().err
+    engine.erg_equivalents.cache_clear()
+    res = engine.erg_equivalents("male", 80, 2000, "07:00")
+    assert res == engine.erg_computed("male", 80.0, 2000, "07:00")
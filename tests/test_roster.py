@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+from rowstrength.roster import PagedSource, RosterRow
+
+
+class Provider:
+    def __init__(self, gate=None, failures=0):
+        self.threads = []
+        self.gate = gate
+        self.failures = failures
+
+    def keys(self, text, order, descending):
+        return list(range(250))
+
+    def rows(self, keys):
+        self.threads.append(threading.get_ident())
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise OSError("database is locked")
+        return [RosterRow(k, athlete=f"a{k}") for k in keys]
+
+
+class Listener:
+    def __init__(self):
+        self.cleared = 0
+
+    def clear(self):
+        self.cleared += 1
+
+
+def _source(provider):
+    source = PagedSource(provider, page_size=100)
+    source.set_keys(range(250))
+    listener = Listener()
+    source.add_listener(listener)
+    return source, listener
+
+
+def test_page_is_read_directly_without_event_loop():
+    provider = Provider()
+    source, _ = _source(provider)
+    assert source[150].athlete == "a150"
+    assert provider.threads == [threading.get_ident()]
+
+
+def test_page_miss_is_prefetched_in_executor():
+    provider = Provider()
+    source, listener = _source(provider)
+
+    async def scenario():
+        first = source[150]
+        assert first.key == 150 and first.athlete is None
+        source[160]   # та же страница: второй запрос не ставится
+        while not listener.cleared:
+            await asyncio.sleep(0.01)
+        return source[150]
+
+    assert asyncio.run(scenario()).athlete == "a150"
+    assert len(provider.threads) == 1 and provider.threads[0] != threading.get_ident()
+
+
+def test_prefetch_after_new_keys_is_dropped():
+    gate = threading.Event()
+    provider = Provider(gate)
+    source, listener = _source(provider)
+
+    async def scenario():
+        source[0]
+        await asyncio.sleep(0.01)
+        source.set_keys(range(10))   # пока страница читается, порядок сменился
+        cleared = listener.cleared
+        gate.set()
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+        assert listener.cleared == cleared
+        assert not source._pages
+
+    asyncio.run(scenario())
+
+
+def test_failed_prefetch_is_logged_and_retried(capsys):
+    provider = Provider(failures=1)
+    source, listener = _source(provider)
+
+    async def scenario():
+        assert source[0].athlete is None
+        while source._loading:
+            await asyncio.sleep(0.01)
+        assert listener.cleared == 0 and not source._pages
+        assert source[0].athlete is None   # страница снова запрошена
+        while not listener.cleared:
+            await asyncio.sleep(0.01)
+        return source[0]
+
+    assert asyncio.run(scenario()).athlete == "a0"
+    assert len(provider.threads) == 2
+    assert "roster: page 0 not loaded: OSError('database is locked')" in capsys.readouterr().err
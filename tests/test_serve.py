@@ -0,0 +1,47 @@
+import json
+import asyncio
+
+import pytest
+
+from rowstrength import serve
+
+
+@pytest.mark.parametrize("value", ["-5", "+5", "1_000", "abc", "", str(serve.MAX_BODY + 1), "9" * 40])
+def test_parse_head_rejects_bad_content_length(value):
+    head = f"POST /erg HTTP/1.1\r\nContent-Length: {value}\r\n\r\n".encode()
+    with pytest.raises(serve.BadRequest):
+        serve._parse_head(head)
+
+
+def test_parse_head_content_length():
+    head = b"POST /erg HTTP/1.1\r\nContent-Length: 12\r\nConnection: close\r\n\r\n"
+    assert serve._parse_head(head) == ("POST", "/erg", False, 12)
+
+
+def _exchange(request: bytes) -> bytes:
+    async def run():
+        server = await asyncio.start_server(serve.Service().connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            await writer.drain()
+            data = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return data
+    return asyncio.run(run())
+
+
+def test_negative_content_length_gets_400():
+    data = _exchange(b"POST /erg HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+    status, _, body = data.partition(b"\r\n\r\n")
+    assert status.startswith(b"HTTP/1.1 400")
+    assert json.loads(body) == {"error": "bad Content-Length"}
+
+
+def test_erg_query_round_trip():
+    body = json.dumps({"gender": "male", "bodyweight": 80, "distance": 2000, "time": "07:00"}).encode()
+    data = _exchange(b"POST /erg HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+    status, _, out = data.partition(b"\r\n\r\n")
+    assert status.startswith(b"HTTP/1.1 200")
+    assert json.loads(out)["percent"] == "55"
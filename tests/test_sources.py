@@ -0,0 +1,408 @@
+import random
+
+import pytest
+from toga.sources import ListSource
+
+from rowstrength.sources import BatchListSource, BatchTreeSource, ColumnarListSource
+
+VALUES = [1, 2.5, True, "x", "yyy", None, 2 ** 70, -7, 0.0, (1, "a"), float("inf")]
+NAMES = ["a", "b", "c", "extra", "_private"]
+
+
+def _snap(row):
+    out = []
+    for name in NAMES:
+        try:
+            out.append((name, repr(getattr(row, name))))
+        except AttributeError:
+            out.append((name, "<missing>"))
+    return tuple(out)
+
+
+class Log:
+    def __init__(self):
+        self.events = []
+
+    def insert(self, index, item, parent=None):
+        self.events.append(("insert", index, _snap(item)))
+
+    def remove(self, index, item, parent=None):
+        self.events.append(("remove", index, _snap(item)))
+
+    def change(self, item):
+        self.events.append(("change", _snap(item)))
+
+    def clear(self):
+        self.events.append(("clear",))
+
+
+# -------- ColumnarListSource против ListSource --------
+def _data(rng):
+    kind = rng.randrange(3)
+    if kind == 0:
+        return tuple(rng.choice(VALUES) for _ in range(rng.randrange(4)))
+    if kind == 1:
+        return {n: rng.choice(VALUES) for n in rng.sample(NAMES[:4], rng.randrange(4))}
+    return rng.choice(VALUES[:6])
+
+
+def _same(sources, rng, fn):
+    # одинаковая операция над обоими источниками (одни и те же случайные числа)
+    state = rng.getstate()
+    results = []
+    for source, held in sources:
+        rng.setstate(state)
+        try:
+            results.append(fn(source, held))
+        except AttributeError:
+            results.append("AttributeError")
+    assert results[0] == results[1]
+
+
+def _op(rng, source, held):
+    n = len(source)
+    kind = rng.randrange(11)
+    if kind == 0:
+        source.append(_data(rng))
+    elif kind == 1:
+        source.insert(rng.randrange(-n - 1, n + 2), _data(rng))
+    elif kind == 2 and n:
+        i = rng.randrange(-n, n)
+        held.append(source[i])   # строка остаётся у вызывающего после удаления
+        del source[i]
+    elif kind == 3 and n:
+        setattr(source[rng.randrange(n)], rng.choice(NAMES), rng.choice(VALUES))
+    elif kind == 4 and n:
+        delattr(source[rng.randrange(n)], rng.choice(NAMES))
+    elif kind == 5 and n:
+        i = rng.randrange(-n, n)
+        held.append(source[i])   # и после замены
+        source[i] = _data(rng)
+    elif kind == 6 and rng.random() < .1:
+        held.extend(source)
+        source.clear()
+    elif kind == 7 and n:
+        row = source[rng.randrange(n)]
+        held.append(row)
+        source.remove(row)
+    elif kind == 8 and held:
+        setattr(rng.choice(held), rng.choice(NAMES), rng.choice(VALUES))
+    elif kind == 9 and held:
+        delattr(rng.choice(held), rng.choice(NAMES))
+    elif kind == 10 and held:
+        return _snap(rng.choice(held))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_columnar_matches_list_source(seed):
+    rng = random.Random(seed)
+    for _ in range(60):
+        init = [_data(rng) for _ in range(rng.randrange(6))]
+        plain, columnar = ListSource(["a", "b", "c"], init), ColumnarListSource(["a", "b", "c"], init)
+        logs = Log(), Log()
+        plain.add_listener(logs[0])
+        columnar.add_listener(logs[1])
+        sources = ((plain, []), (columnar, []))
+        for _ in range(30):
+            _same(sources, rng, lambda source, held: _op(rng, source, held))
+            assert [_snap(r) for r in plain] == [_snap(r) for r in columnar]
+            assert [_snap(r) for r in sources[0][1]] == [_snap(r) for r in sources[1][1]]
+            assert logs[0].events == logs[1].events
+            for query in (1, "x", {"b": None}, (True,)):
+                found = []
+                for source in (plain, columnar):
+                    try:
+                        found.append(_snap(source.find(query)))
+                    except ValueError:
+                        found.append(None)
+                assert found[0] == found[1]
+
+
+def test_removed_and_replaced_rows_stay_readable():
+    for cls in (ListSource, ColumnarListSource):
+        source = cls(["name", "kg"], [("a", 1), ("b", 2.5), ("c", 3)])
+        removed, replaced = source[1], source[0]
+        del source[1]
+        source[0] = ("z", 9)
+        assert (removed.name, removed.kg) == ("b", 2.5), cls
+        assert (replaced.name, replaced.kg) == ("a", 1), cls
+        del removed.name
+        assert not hasattr(removed, "name")
+        cleared = source[0]
+        source.clear()
+        assert (cleared.name, cleared.kg) == ("z", 9)
+
+
+def test_columnar_rows_are_views():
+    source = ColumnarListSource(["a"], [1, 2])
+    assert source[0] is not source[0]
+    assert source[0] == source[0] and hash(source[0]) == hash(source[0])
+    assert source[0] != source[1]
+    assert source.index(source[1]) == 1
+
+
+# -------- Индексы: тот же источник с add_index() и без --------
+def _value(rng):
+    # небольшой набор, чтобы find() находил; изредка — значение без hash
+    return [rng.randrange(3)] if rng.random() < 0.05 else rng.randrange(4)
+
+
+def _query(rng):
+    return rng.choice([_value(rng), {"a": _value(rng)}, {"a": _value(rng), "b": rng.randrange(3)},
+                       (_value(rng), rng.randrange(3)), {"b": rng.randrange(3)}, {"c": 1}, {"a": [1]}])
+
+
+def _position(source, row):
+    return None if row is None else source.index(row)
+
+
+def _find(source, query, start):
+    try:
+        return _position(source, source.find(query, None if start is None else source[start]))
+    except ValueError:
+        return None
+
+
+def _assert_same(plain, indexed, rng):
+    assert len(plain) == len(indexed)
+    for i in range(len(plain)):
+        assert (getattr(plain[i], "a", None), getattr(plain[i], "b", None)) == \
+               (getattr(indexed[i], "a", None), getattr(indexed[i], "b", None))
+        assert indexed.index(indexed[i]) == plain.index(plain[i]) == i
+    for _ in range(8):
+        query = _query(rng)
+        start = rng.randrange(len(plain)) if plain and rng.random() < 0.5 else None
+        assert _find(indexed, query, start) == _find(plain, query, start), (query, start)
+
+
+def _list_op(rng, source):
+    n = len(source)
+    kind = rng.randrange(11)
+    if kind == 0:
+        source.append((_value(rng), rng.randrange(3)))
+    elif kind == 1:
+        source.insert(rng.randrange(-n - 2, n + 3), (_value(rng), rng.randrange(3)))   # в том числе за краями
+    elif kind == 2 and n:
+        del source[rng.randrange(-n, n)]
+    elif kind == 3:
+        source.extend([(_value(rng), 0) for _ in range(rng.randrange(4))])
+    elif kind == 4 and rng.random() < 0.2:
+        source.replace_all([(i % 4, 1) for i in range(rng.randrange(5))])
+    elif kind == 5 and n:
+        setattr(source[rng.randrange(n)], rng.choice("ab"), _value(rng))
+    elif kind == 6 and n:
+        source[rng.randrange(-n, n)] = (_value(rng), rng.randrange(3))
+    elif kind == 7 and n:
+        source.remove(source[rng.randrange(n)])
+    elif kind == 8 and n:
+        row = source[rng.randrange(n)]
+        source.remove(row)
+        row.a = 99   # удалённая строка меняется: индекс её не возвращает
+    elif kind == 9 and rng.random() < 0.1:
+        source.clear()
+    elif kind == 10 and n:
+        with source.batch():
+            source.insert(rng.randrange(n + 1), (_value(rng), 2))
+            setattr(source[rng.randrange(n)], "a", _value(rng))
+            del source[rng.randrange(n)]
+
+
+def _same_ops(rng, sources, op):
+    state = rng.getstate()
+    for source in sources:
+        rng.setstate(state)
+        op(rng, source)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_list_index_matches_scan(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        data = [(_value(rng), rng.randrange(3)) for _ in range(rng.randrange(6))]
+        plain, indexed = BatchListSource(["a", "b"], data), BatchListSource(["a", "b"], data)
+        early = rng.random() < 0.5
+        if early:
+            indexed.add_index("a", "b") if rng.random() < 0.7 else indexed.add_index("a")
+        for step in range(30):
+            if not early and step == 10:
+                indexed.add_index("b", "a")   # индексы по уже изменённым строкам
+            _same_ops(rng, (plain, indexed), _list_op)
+            _assert_same(plain, indexed, rng)
+
+
+def test_positions_only_index():
+    source = BatchListSource(["a"], list(range(10)))
+    source.add_index()
+    source.insert(3, 100)
+    del source[0]
+    assert [source.index(source[i]) for i in range(len(source))] == list(range(10))
+    assert source.find(100) is source[2]
+    with pytest.raises(ValueError):
+        source.index(BatchListSource(["a"], [1])[0])
+
+
+def _tree_op(rng, source):
+    n = len(source)
+    kind = rng.randrange(8)
+    if kind == 0:
+        source.append((_value(rng), rng.randrange(3)))
+    elif kind == 1:
+        source.insert(rng.randrange(-n - 1, n + 2), (_value(rng), 1))
+    elif kind == 2 and n:
+        source.remove(source[rng.randrange(n)])
+    elif kind == 3 and n:
+        source[rng.randrange(-n, n)] = (_value(rng), 2)
+    elif kind == 4 and n:
+        source[rng.randrange(n)].append((rng.randrange(4), 0))   # дети не индексируются
+    elif kind == 5 and n:
+        setattr(source[rng.randrange(n)], "a", _value(rng))
+    elif kind == 6:
+        source.extend([((1, 1), None)] * rng.randrange(3))
+    elif kind == 7 and n and rng.random() < 0.2:
+        source.replace_all([((i, 0), None) for i in range(rng.randrange(4))])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_tree_root_index_matches_scan(seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        data = [((rng.randrange(4), rng.randrange(3)), None) for _ in range(rng.randrange(5))]
+        plain, indexed = BatchTreeSource(["a", "b"], data), BatchTreeSource(["a", "b"], data)
+        indexed.add_index("a", "b")
+        for _ in range(20):
+            _same_ops(rng, (plain, indexed), _tree_op)
+            _assert_same(plain, indexed, rng)
+
+
+# -------- Пакетные уведомления --------
+class RangeLog(Log):
+    def insert_range(self, index, items, parent=None):
+        self.events.append(("insert_range", parent, index, [_snap(item) for item in items]))
+
+    def reset(self):
+        self.events.append(("reset",))
+
+
+def _listened(source):
+    ranged, legacy = RangeLog(), Log()
+    source.add_listener(ranged)
+    source.add_listener(legacy)
+    return ranged, legacy
+
+
+def _row(a, b="x"):
+    return _snap(BatchListSource(["a", "b"], [(a, b)])[0])
+
+
+def test_extend_is_one_insert_range():
+    source = BatchListSource(["a", "b"], [(0, "x")])
+    ranged, legacy = _listened(source)
+    source.extend([(1, "x"), (2, "x")])
+    assert ranged.events == [("insert_range", None, 1, [_row(1), _row(2)])]
+    assert legacy.events == [("insert", 1, _row(1)), ("insert", 2, _row(2))]
+
+
+def test_contiguous_inserts_in_batch_become_insert_range():
+    source = BatchListSource(["a", "b"], [(0, "x"), (9, "x")])
+    ranged, legacy = _listened(source)
+    with source.batch():
+        source.insert(1, (1, "x"))
+        with source.batch():   # вложенный блок сливается с внешним
+            source.insert(2, (2, "x"))
+    assert ranged.events == [("insert_range", None, 1, [_row(1), _row(2)])]
+    assert legacy.events == [("insert", 1, _row(1)), ("insert", 2, _row(2))]
+
+
+def test_other_batches_become_reset_and_replay_in_order():
+    source = BatchListSource(["a", "b"], [(0, "x"), (1, "x")])
+    ranged, legacy = _listened(source)
+    with source.batch():
+        source.append((2, "x"))
+        source[0].b = "y"
+        del source[1]
+        source.insert(0, (3, "x"))
+    assert ranged.events == [("reset",)]
+    # старый слушатель — прежние события по одному, в исходном порядке (строки — в их итоговом виде)
+    assert [e[:2] for e in legacy.events] == [("insert", 2), ("change", _row(0, "y")), ("remove", 1), ("insert", 0)]
+
+    ranged.events.clear()
+    legacy.events.clear()
+    source.replace_all([(5, "x")])
+    assert ranged.events == [("reset",)]
+    assert legacy.events == [("clear",), ("insert", 0, _row(5))]
+
+
+def test_inserts_out_of_order_become_reset():
+    source = BatchListSource(["a", "b"], [(0, "x")])
+    ranged, legacy = _listened(source)
+    with source.batch():
+        source.append((1, "x"))
+        source.insert(0, (2, "x"))
+    assert ranged.events == [("reset",)]
+    assert legacy.events == [("insert", 1, _row(1)), ("insert", 0, _row(2))]
+
+
+def test_tree_inserts_under_different_parents_become_reset():
+    # индексы 0 и 1 подряд, но у разных родителей
+    source = BatchTreeSource(["a", "b"], [((0, "x"), None), ((1, "x"), [((5, "x"), None)])])
+    ranged, legacy = _listened(source)
+    with source.batch():
+        source[0].append((2, "x"))
+        source[1].append((3, "x"))
+    assert ranged.events == [("reset",)]
+    assert [e[:2] for e in legacy.events] == [("insert", 0), ("insert", 1)]
+
+
+def test_repeated_changes_collapse():
+    source = BatchListSource(["a", "b"], [(0, "x"), (1, "x")])
+    ranged, legacy = _listened(source)
+    with source.batch():
+        first, second = source[0], source[1]
+        first.b = "y"
+        second.b = "y"
+        first.b = "z"
+    expected = [("change", _row(0, "z")), ("change", _row(1, "y"))]
+    assert ranged.events == legacy.events == expected
+
+
+def test_columnar_changes_collapse_by_row():
+    # у ColumnarListSource строка — новое представление при каждом обращении
+    source = ColumnarListSource(["a", "b"], [(0, "x")])
+    ranged, _ = _listened(source)
+    with source.batch():
+        source[0].b = "y"
+        source[0].b = "z"
+    assert ranged.events == [("change", _row(0, "z"))]
+
+
+def test_tree_children_extend_is_insert_range_with_parent():
+    source = BatchTreeSource(["a", "b"], [((0, "x"), None)])
+    ranged, legacy = _listened(source)
+    root = source[0]
+    source.extend([((1, "x"), None), ((2, "x"), None)], parent=root)
+    assert ranged.events == [("insert_range", root, 0, [_row(1), _row(2)])]
+    assert [e[:2] for e in legacy.events] == [("insert", 0), ("insert", 1)]
+
+
+def test_install_range_listeners_adds_only_missing_methods():
+    from types import SimpleNamespace
+
+    from rowstrength.sources import install_range_listeners
+
+    class Table:
+        def __init__(self):
+            self.updates = 0
+
+        def update_data(self):
+            self.updates += 1
+
+    class DetailedList(Table):
+        def insert_range(self, index, items, parent=None):
+            self.own = True
+
+    install_range_listeners(SimpleNamespace(Table=Table, DetailedList=DetailedList))
+    table, detailed = Table(), DetailedList()
+    table.insert_range(index=0, items=[])
+    table.reset()
+    detailed.insert_range(index=0, items=[])
+    assert table.updates == 2 and detailed.own and detailed.updates == 0
@@ -0,0 +1,99 @@
+import json
+import sys
+import threading
+
+import pytest
+import toga
+import toga.handlers
+from toga.style import Pack
+from toga.style.applicator import TogaApplicator
+from toga.widgets import button, selection   # noqa: F401 — импортируют wrapped_handler по имени
+
+from benchmarks.toga_stub.factory import Container
+from rowstrength import layout, tracing
+
+
+@pytest.fixture
+def clean():
+    yield
+    tracing.uninstall()
+    layout.uninstall_incremental()
+
+
+def _holders(func):
+    return {name for name, module in list(sys.modules.items()) if getattr(module, "wrapped_handler", None) is func}
+
+
+def test_install_uninstall_round_trip(clean):
+    original = toga.handlers.wrapped_handler
+    layout_, set_bounds = Pack.layout, TogaApplicator.set_bounds
+    holders = _holders(original)
+    assert {"toga.handlers", "toga.widgets.button", "toga.widgets.selection"} <= holders
+
+    tracer = tracing.install()
+    assert tracing.install() is tracer   # повторный install — тот же трассировщик
+    traced = toga.handlers.wrapped_handler
+    assert traced is not original and _holders(traced) == holders and not _holders(original)
+
+    def on_press(widget):
+        pass
+
+    toga.Button("a", on_press=on_press).on_press()
+    assert [e[0] for e in tracer.events] == [on_press.__qualname__]
+
+    tracing.uninstall()
+    assert _holders(original) == holders and not _holders(traced)
+    assert Pack.layout is layout_ and TogaApplicator.set_bounds is set_bounds
+    assert tracing.current() is None
+    toga.Button("b", on_press=on_press).on_press()
+    assert len(tracer.events) == 1
+
+
+def test_tracing_wraps_incremental_layout(clean):
+    layout_, set_bounds = Pack.layout, TogaApplicator.set_bounds
+    layout.install_incremental()
+    tracer = tracing.install()
+    assert Pack.layout is not layout._inc_layout and TogaApplicator.set_bounds is not layout._inc_set_bounds
+
+    root = toga.Box(children=[toga.Label("x"), toga.Box(children=[toga.Label("y")])], style=Pack(direction="column"))
+    Container(400, 300).set_content(root)
+    root.refresh()
+    # set_bounds дочерних узлов — внутри спана корня, отдельных спанов нет
+    assert [e[0] for e in tracer.events] == ["Pack.layout", "TogaApplicator.set_bounds"]
+    assert root._layout_key[4] == layout._epoch   # раскладку сделал инкрементальный патч
+
+    tracing.uninstall()
+    assert Pack.layout is layout._inc_layout and TogaApplicator.set_bounds is layout._inc_set_bounds
+    layout.uninstall_incremental()
+    assert Pack.layout is layout_ and TogaApplicator.set_bounds is set_bounds
+
+
+def test_chrome_trace_shape(tmp_path):
+    tracer = tracing.Tracer(capacity=3)
+    for i in range(3):
+        with tracer.span(f"s{i}", n=i):
+            pass
+    thread = threading.Thread(target=lambda: tracer.span("worker", "io").__enter__().__exit__(), name="worker-1")
+    thread.start()
+    thread.join()
+
+    trace = tracer.chrome_trace()
+    assert trace["displayTimeUnit"] == "ms"
+    meta = [e for e in trace["traceEvents"] if e["ph"] == "M"]
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert meta[0]["name"] == "process_name" and meta[0]["args"] == {"name": "RowStrength"}
+    threads = {e["tid"]: e["args"]["name"] for e in meta[1:]}
+    assert {e["name"] for e in meta[1:]} == {"thread_name"} and set(threads) == {e["tid"] for e in spans}
+    # кольцевой буфер: самый старый спан вытеснен
+    assert [e["name"] for e in spans] == ["s1", "s2", "worker"]
+    assert [e.get("args") for e in spans] == [{"n": 1}, {"n": 2}, None] and "args" not in spans[2]
+    assert [e["cat"] for e in spans] == ["app", "app", "io"]
+    assert spans[0]["tid"] == threading.get_ident() and spans[2]["tid"] != spans[0]["tid"]
+    for e in spans:
+        assert set(e) <= {"name", "cat", "ph", "pid", "tid", "ts", "dur", "args"}
+        assert e["ts"] >= 0 and e["dur"] >= 0
+    assert spans[0]["ts"] <= spans[1]["ts"] <= spans[2]["ts"]
+
+    path = tmp_path / "trace.json"
+    tracer.write(path)
+    assert json.loads(path.read_text(encoding="utf-8")) == json.loads(json.dumps(trace))